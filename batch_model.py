@@ -0,0 +1,306 @@
+"""
+Векторизованная модель для одновременной симуляции тысяч полей.
+
+BatchGameModel хранит N полей одним массивом битовых масок (N, height):
+бит x строки - занятая клетка в столбце x, как и в GameModel. Ходы, падение,
+фиксация и очистка линий применяются ко всем полям сразу операциями NumPy
+по тем же правилам, что и GameModel (таблица очков, 5 линий на уровень,
+формула скорости).
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from typing import Optional
+import numpy as np
+from model import TICK_MS
+from tetromino_factory import TetrominoFactory
+
+# Очки за 0..4 линии (как в GameModel._clear_lines)
+LINE_POINTS = np.array([0, 40, 100, 300, 1200], dtype=np.int64)
+
+
+class BatchGameModel:
+    """
+    N независимых игр одного размера поля и фигур.
+
+    Действия задаются массивом кодов по одному на поле (см. NOOP..HARD_DROP).
+    Закончившиеся поля замораживаются: действия и гравитация к ним не применяются.
+    """
+    NOOP, LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP = range(6)
+
+    def __init__(self, n: int, width: int = 10, height: int = 20, piece_size: int = 4,
+                 seed: Optional[int] = None, tick_ms: int = TICK_MS):
+        self.n = n
+        self.width = width
+        self.height = height
+        self.piece_size = piece_size
+        self.tick_ms = tick_ms
+        self.full_row_mask = (1 << width) - 1
+        self.rng = np.random.default_rng(seed)
+
+        self._build_piece_tables(TetrominoFactory(piece_size))
+        self.reset()
+
+    def _build_piece_tables(self, factory: TetrominoFactory):
+        """Таблицы масок по (тип фигуры, поворот) из предвычисленных состояний фабрики"""
+        self.shape_types = factory.get_available_shapes()
+        count = len(self.shape_types)
+        size = max(len(factory.rotations[t][0].shape) for t in self.shape_types)
+
+        self._masks = np.zeros((count, 4, size), dtype=np.int64)
+        self._min_col = np.zeros((count, 4), dtype=np.int64)
+        self._max_col = np.zeros((count, 4), dtype=np.int64)
+        self._state_count = np.zeros(count, dtype=np.int64)
+        self._spawn_x = np.zeros(count, dtype=np.int64)
+        self._spawn_y = np.zeros(count, dtype=np.int64)
+        kicks = None
+        for t, shape_type in enumerate(self.shape_types):
+            states = factory.rotations[shape_type]
+            self._state_count[t] = len(states)
+            matrix_width = len(states[0].shape[0])
+            self._spawn_x[t] = (self.width - matrix_width) // 2
+            self._spawn_y[t] = -matrix_width
+            for r, state in enumerate(states):
+                self._masks[t, r, :len(state.row_masks)] = state.row_masks
+                self._min_col[t, r] = state.min_col
+                self._max_col[t, r] = state.max_col
+                kicks = state.kicks
+        self._kicks = kicks
+        self._mask_rows = size
+
+    def reset(self, boards: Optional[np.ndarray] = None):
+        """
+        Начать заново все поля или только отмеченные.
+
+        Args:
+            boards: Булев массив (N,) полей для сброса (None - все)
+        """
+        if boards is None or not hasattr(self, 'rows'):
+            n, h = self.n, self.height
+            self.rows = np.zeros((n, h), dtype=np.int64)
+            self.piece_type = np.zeros(n, dtype=np.int64)
+            self.rotation = np.zeros(n, dtype=np.int64)
+            self.x = np.zeros(n, dtype=np.int64)
+            self.y = np.zeros(n, dtype=np.int64)
+            self.score = np.zeros(n, dtype=np.int64)
+            self.level = np.ones(n, dtype=np.int64)
+            self.lines_cleared = np.zeros(n, dtype=np.int64)
+            self.speed = np.full(n, 500, dtype=np.int64)
+            self.gravity_time = np.zeros(n, dtype=np.int64)
+            self.pieces_placed = np.zeros(n, dtype=np.int64)
+            self.game_over = np.zeros(n, dtype=bool)
+            self._bag = np.zeros((n, len(self.shape_types)), dtype=np.int64)
+            self._bag_pos = np.full(n, len(self.shape_types), dtype=np.int64)
+            boards = np.ones(n, dtype=bool)
+        else:
+            self.rows[boards] = 0
+            self.score[boards] = 0
+            self.level[boards] = 1
+            self.lines_cleared[boards] = 0
+            self.speed[boards] = 500
+            self.gravity_time[boards] = 0
+            self.pieces_placed[boards] = 0
+            self.game_over[boards] = False
+            self._bag_pos[boards] = len(self.shape_types)
+        self._spawn(np.nonzero(boards)[0])
+
+    # ---- Генерация фигур ----
+
+    def _next_types(self, idx: np.ndarray) -> np.ndarray:
+        """Следующие типы фигур из перемешанных очередей (как в TetrominoFactory)"""
+        empty = idx[self._bag_pos[idx] >= len(self.shape_types)]
+        if len(empty):
+            order = np.tile(np.arange(len(self.shape_types)), (len(empty), 1))
+            self._bag[empty] = self.rng.permuted(order, axis=1)
+            self._bag_pos[empty] = 0
+        types = self._bag[idx, self._bag_pos[idx]]
+        self._bag_pos[idx] += 1
+        return types
+
+    def _spawn(self, idx: np.ndarray):
+        if not len(idx):
+            return
+        types = self._next_types(idx)
+        self.piece_type[idx] = types
+        self.rotation[idx] = 0
+        self.x[idx] = self._spawn_x[types]
+        self.y[idx] = self._spawn_y[types]
+        over = self._collides(idx, types, self.rotation[idx], self.x[idx], self.y[idx], walls=False)
+        over |= self.rows[idx, 0] != 0
+        self.game_over[idx] |= over
+
+    # ---- Столкновения ----
+
+    def _collides(self, idx, types, rotations, xs, ys, walls=True) -> np.ndarray:
+        """
+        Проверка столкновений для полей idx с фигурой (types, rotations) в (xs, ys).
+
+        Returns:
+            Булев массив по полям idx
+        """
+        hit = np.zeros(len(idx), dtype=bool)
+        if walls:
+            hit |= xs + self._min_col[types, rotations] < 0
+            hit |= xs + self._max_col[types, rotations] >= self.width
+        left = np.maximum(xs, 0)
+        right = np.maximum(-xs, 0)
+        masks = self._masks[types, rotations]
+        for i in range(self._mask_rows):
+            mask = masks[:, i]
+            occupied = mask != 0
+            yy = ys + i
+            shifted = (mask << left) >> right
+            hit |= occupied & (yy >= self.height)
+            visible = occupied & (yy >= 0) & (yy < self.height)
+            field_rows = self.rows[idx, np.clip(yy, 0, self.height - 1)]
+            hit |= visible & ((field_rows & shifted) != 0)
+        return hit
+
+    # ---- Действия ----
+
+    def _move(self, idx: np.ndarray, dx: int, dy: int) -> np.ndarray:
+        """Сдвиг фигур на полях idx; возвращает булев массив успешных сдвигов"""
+        if not len(idx):
+            return np.zeros(0, dtype=bool)
+        ok = ~self._collides(idx, self.piece_type[idx], self.rotation[idx],
+                             self.x[idx] + dx, self.y[idx] + dy)
+        moved = idx[ok]
+        self.x[moved] += dx
+        self.y[moved] += dy
+        return ok
+
+    def _rotate(self, idx: np.ndarray):
+        """Поворот с перебором сдвигов из таблицы wall kick (как в GameModel.rotate_piece)"""
+        if not len(idx):
+            return
+        types = self.piece_type[idx]
+        new_rotation = (self.rotation[idx] + 1) % self._state_count[types]
+        pending = np.ones(len(idx), dtype=bool)
+        for dx in self._kicks:
+            sub = np.nonzero(pending)[0]
+            if not len(sub):
+                break
+            boards = idx[sub]
+            xs = self.x[boards] + dx
+            ok = ~self._collides(boards, types[sub], new_rotation[sub], xs, self.y[boards])
+            done = boards[ok]
+            self.rotation[done] = new_rotation[sub][ok]
+            self.x[done] = xs[ok]
+            pending[sub[ok]] = False
+
+    def _hard_drop(self, idx: np.ndarray) -> np.ndarray:
+        """Мгновенное падение; возвращает число пройденных строк по полям idx"""
+        rows = np.zeros(len(idx), dtype=np.int64)
+        falling = np.arange(len(idx))
+        while len(falling):
+            ok = self._move(idx[falling], 0, 1)
+            rows[falling[ok]] += 1
+            falling = falling[ok]
+        self._lock(idx)
+        return rows
+
+    def _lock(self, idx: np.ndarray):
+        """Фиксация фигур на полях idx, очистка линий и появление новых фигур"""
+        if not len(idx):
+            return
+        types = self.piece_type[idx]
+        xs = self.x[idx]
+        ys = self.y[idx]
+        left = np.maximum(xs, 0)
+        right = np.maximum(-xs, 0)
+        masks = self._masks[types, self.rotation[idx]]
+        for i in range(self._mask_rows):
+            mask = masks[:, i]
+            yy = ys + i
+            visible = (mask != 0) & (yy >= 0)
+            self.rows[idx[visible], yy[visible]] |= (mask[visible] << left[visible]) >> right[visible]
+        self.pieces_placed[idx] += 1
+        self._clear_lines(idx)
+        self._spawn(idx)
+
+    def _clear_lines(self, idx: np.ndarray):
+        """Очистка заполненных строк и начисление очков по правилам GameModel._clear_lines"""
+        full = self.rows[idx] == self.full_row_mask
+        lines = full.sum(axis=1)
+        cleared = lines > 0
+        if not cleared.any():
+            return
+        boards = idx[cleared]
+        full = full[cleared]
+        lines = lines[cleared]
+
+        # Заполненные строки уходят наверх (стабильная сортировка), затем обнуляются
+        order = np.argsort(~full, axis=1, kind='stable')
+        rows = np.take_along_axis(self.rows[boards], order, axis=1)
+        rows[np.arange(self.height) < lines[:, None]] = 0
+        self.rows[boards] = rows
+
+        self.score[boards] += LINE_POINTS[np.minimum(lines, 4)] * self.level[boards]
+        self.lines_cleared[boards] += lines
+        old_level = self.level[boards]
+        new_level = self.lines_cleared[boards] // 5 + 1
+        self.score[boards] += np.maximum(new_level - old_level, 0) * 500
+        self.level[boards] = new_level
+        self.speed[boards] = np.maximum(50, 500 - (new_level - 1) * 50)
+
+    # ---- Публичный интерфейс ----
+
+    def step(self, actions: Optional[np.ndarray] = None):
+        """
+        Один шаг всех полей: действия, затем гравитация на tick_ms.
+
+        Очки за ускоренное падение (1 за строку) и мгновенное (2 за строку)
+        начисляются так же, как в GameController.
+
+        Args:
+            actions: Массив (N,) кодов действий (None - без действий)
+        """
+        if actions is not None:
+            actions = np.asarray(actions)
+            for code, dx in ((self.LEFT, -1), (self.RIGHT, 1)):
+                self._move(np.nonzero((actions == code) & ~self.game_over)[0], dx, 0)
+            self._rotate(np.nonzero((actions == self.ROTATE) & ~self.game_over)[0])
+            idx = np.nonzero((actions == self.SOFT_DROP) & ~self.game_over)[0]
+            self.score[idx] += self._move(idx, 0, 1)
+            idx = np.nonzero((actions == self.HARD_DROP) & ~self.game_over)[0]
+            # Сначала падение (оно начисляет очки за линии), затем очки за строки падения
+            rows = self._hard_drop(idx)
+            self.score[idx] += rows * 2
+
+        active = ~self.game_over
+        self.gravity_time[active] += self.tick_ms
+        due = np.nonzero(active & (self.gravity_time >= self.speed))[0]
+        if len(due):
+            self.gravity_time[due] -= self.speed[due]
+            landed = due[~self._move(due, 0, 1)]
+            self._lock(landed)
+
+    def place(self, rotations: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """
+        Поставить текущие фигуры в заданный поворот и столбец и бросить вниз.
+
+        Удобно для оценки ботов: одна расстановка фигуры на всех полях за вызов.
+        Недопустимая для поля расстановка (стена или занятые клетки)
+        заменяется бросанием фигуры с текущей позиции.
+
+        Returns:
+            Булев массив (N,) полей, где расстановка была допустима
+        """
+        idx = np.nonzero(~self.game_over)[0]
+        types = self.piece_type[idx]
+        rotations = np.asarray(rotations)[idx] % self._state_count[types]
+        columns = np.asarray(columns)[idx]
+        valid = ~self._collides(idx, types, rotations, columns, self.y[idx])
+        ok_boards = idx[valid]
+        self.rotation[ok_boards] = rotations[valid]
+        self.x[ok_boards] = columns[valid]
+        rows = self._hard_drop(idx)
+        self.score[idx] += rows * 2
+        result = np.zeros(self.n, dtype=bool)
+        result[ok_boards] = True
+        return result
+
+    def boards(self) -> np.ndarray:
+        """Занятость клеток всех полей массивом (N, height, width) uint8"""
+        bits = np.arange(self.width, dtype=np.int64)
+        return ((self.rows[:, :, None] >> bits) & 1).astype(np.uint8)
@@ -0,0 +1,151 @@
+"""
+Проверки BatchGameModel: поля пакета совпадают с GameModel при тех же фигурах.
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import random
+import unittest
+
+import numpy as np
+
+from batch_model import BatchGameModel
+from bot import Board, HeuristicBot
+from model import GameModel
+from model_test import fill_rows
+
+
+class BatchGameModelTest(unittest.TestCase):
+    """Поля BatchGameModel ведут себя как GameModel, если им выдавать те же фигуры"""
+
+    def greedy_placement(self, bot: HeuristicBot, model: GameModel):
+        """Лучшее бросание фигуры с места появления (без сдвигов под навесы, как BatchGameModel.place)"""
+        piece = model.current_piece
+        board = Board.from_model(model)
+        best = (float('-inf'), 0, piece.x)
+        for rotation, state in enumerate(piece.states):
+            for x in range(-state.min_col, model.width - state.max_col):
+                if board.fits(state, x, piece.y):
+                    score = bot.evaluate(board, state, x, piece.y).score
+                    if score > best[0]:
+                        best = (score, rotation, x)
+        return best[1], best[2]
+
+    def play_both(self, width: int, height: int, piece_size: int, seeds, pieces: int):
+        models = [GameModel(width, height, piece_size, seed=seed) for seed in seeds]
+        batch = BatchGameModel(len(models), width, height, piece_size, seed=0)
+        bot = HeuristicBot()
+        bot.select_weights(width, height, piece_size)
+        for _ in range(pieces):
+            if all(model.game_over for model in models):
+                break
+            rotations = np.zeros(len(models), dtype=np.int64)
+            columns = np.zeros(len(models), dtype=np.int64)
+            for b, model in enumerate(models):
+                batch.game_over[b] = model.game_over
+                if model.game_over:
+                    continue
+                # Фигура из генератора GameModel подставляется в поле пакета
+                piece = model.current_piece
+                batch.piece_type[b] = batch.shape_types.index(piece.shape_type)
+                batch.rotation[b] = piece.rotation
+                batch.x[b] = piece.x
+                batch.y[b] = piece.y
+                rotations[b], columns[b] = self.greedy_placement(bot, model)
+                piece.set_rotation(int(rotations[b]))
+                piece.x = int(columns[b])
+                rows = model.hard_drop()
+                model.score += rows * 2
+            batch.place(rotations, columns)
+
+            for b, model in enumerate(models):
+                if model.game_over:
+                    continue
+                self.assertEqual(tuple(int(row) for row in batch.rows[b]), model.rows)
+                self.assertEqual((int(batch.score[b]), int(batch.lines_cleared[b]), int(batch.level[b]),
+                                  int(batch.speed[b]), int(batch.pieces_placed[b])),
+                                 (model.score, model.lines_cleared, model.level,
+                                  model.speed, model.pieces_placed))
+        return sum(model.lines_cleared for model in models)
+
+    def test_matches_game_model(self):
+        for width, height, piece_size in ((10, 20, 4), (12, 24, 5)):
+            with self.subTest(field=f"{width}x{height}", piece_size=piece_size):
+                lines = self.play_both(width, height, piece_size, seeds=(1, 2, 3), pieces=150)
+                self.assertGreater(lines, 20)  # Сравнение имеет смысл только с очисткой линий
+
+    def test_multi_line_clear(self):
+        model = GameModel(10, 20, 4, seed=1)
+        gaps = {19: {0}, 18: {0}, 17: {0, 5}, 16: {0}, 15: {0, 7}}
+        fill_rows(model, gaps)
+        batch = BatchGameModel(1, 10, 20, 4, seed=0)
+        batch.rows[0] = model.rows
+
+        piece = model.current_piece = model.factory.create_tetromino('I')
+        piece.x = (model.width - piece.get_width()) // 2
+        piece.y = -piece.get_width()
+        batch.piece_type[0] = batch.shape_types.index('I')
+        batch.rotation[0] = 0
+        batch.x[0] = piece.x
+        batch.y[0] = piece.y
+
+        column = -piece.states[1].min_col
+        batch.place(np.array([1]), np.array([column]))
+        piece.set_rotation(1)
+        piece.x = column
+        rows = model.hard_drop()
+        model.score += rows * 2
+
+        self.assertEqual(model.lines_cleared, 3)
+        self.assertEqual(model.score, 300 + rows * 2)
+        self.assertEqual(tuple(int(row) for row in batch.rows[0]), model.rows)
+        self.assertEqual((int(batch.score[0]), int(batch.lines_cleared[0])), (model.score, model.lines_cleared))
+
+    def test_step_rules_match_game_model(self):
+        """Ходы, повороты и гравитация по тикам с одинаковыми фигурами"""
+        rng = random.Random(7)
+        model = GameModel(10, 20, 4, seed=5)
+        batch = BatchGameModel(1, 10, 20, 4, seed=0)
+        codes = {'left': batch.LEFT, 'right': batch.RIGHT, 'rotate': batch.ROTATE,
+                 'soft_drop': batch.SOFT_DROP, 'hard_drop': batch.HARD_DROP}
+        placed = -1
+        for _ in range(20000):
+            if model.game_over:
+                break
+            if placed != model.pieces_placed:
+                # Новая фигура - даём пакету ту же
+                placed = model.pieces_placed
+                piece = model.current_piece
+                batch.piece_type[0] = batch.shape_types.index(piece.shape_type)
+                batch.rotation[0] = piece.rotation
+                batch.x[0] = piece.x
+                batch.y[0] = piece.y
+                batch.game_over[0] = False
+            action = rng.choice(('left', 'right', 'rotate', 'soft_drop', None, None, None, None))
+            if rng.random() < 0.01:
+                action = 'hard_drop'
+            if action == 'left':
+                model.move(-1, 0)
+            elif action == 'right':
+                model.move(1, 0)
+            elif action == 'rotate':
+                model.rotate_piece()
+            elif action == 'soft_drop':
+                model.score += model.move(0, 1)
+            elif action == 'hard_drop':
+                rows = model.hard_drop()
+                model.score += rows * 2
+            model.advance(batch.tick_ms)
+            batch.step(np.array([codes.get(action, batch.NOOP)]))
+
+            self.assertEqual(tuple(int(row) for row in batch.rows[0]), model.rows)
+            self.assertEqual((int(batch.score[0]), int(batch.gravity_time[0]), int(batch.pieces_placed[0])),
+                             (model.score, model.gravity_time, model.pieces_placed))
+            if model.pieces_placed == placed:
+                self.assertEqual((int(batch.rotation[0]), int(batch.x[0]), int(batch.y[0])),
+                                 (model.current_piece.rotation, model.current_piece.x, model.current_piece.y))
+        self.assertGreater(model.pieces_placed, 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
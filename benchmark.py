@@ -0,0 +1,291 @@
+"""
+Набор бенчмарков горячих путей модели, фабрики фигур и отрисовки.
+
+Каждый замер прогоняется для всех размеров поля и фигур 4-7 на одном
+и том же детерминированном состоянии (фиксированные зёрна), поэтому
+результаты разных запусков и разных машин сравнимы между собой.
+Отрисовка идёт в невидимое окно (SDL_VIDEODRIVER=dummy).
+
+    python benchmark.py --output results.json
+    python benchmark.py --save-baseline benchmarks/baseline.json
+    python benchmark.py --compare benchmarks/baseline.json --threshold 1.25
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import copy
+import datetime
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pygame
+from model import GameModel
+from tetromino_factory import TetrominoFactory
+
+FIELD_SIZES = [(10, 20), (12, 24), (15, 30)]
+PIECE_SIZES = [4, 5, 6, 7]
+SEED = 12345
+REPEAT = 5
+MIN_TIME = 0.02  # Минимальная длительность одного прогона, с
+
+
+def make_midgame_model(width: int, height: int, piece_size: int, seed: int = SEED) -> GameModel:
+    """
+    Модель в типичном состоянии середины партии.
+
+    Нижняя треть поля заполнена «мусорными» строками с одной дыркой,
+    текущая фигура стоит над ними в точке появления.
+    """
+    rng = random.Random(seed)
+    model = GameModel(width, height, piece_size, "bench", session_id="bench", seed=seed)
+    colors = [(0, 255, 255), (255, 0, 0), (0, 255, 0), (128, 0, 128)]
+    for y in range(height - height // 3, height):
+        hole = rng.randrange(width)
+        model.field[y] = [0 if x == hole else rng.choice(colors) for x in range(width)]
+    model._rebuild_bitboard()
+    model.current_piece.y = 0
+    return model
+
+
+def time_stateless(func: Callable[[], Any], repeat: int, min_time: Optional[float] = None) -> List[float]:
+    """
+    Время одного вызова (мкс) в каждом из repeat прогонов.
+
+    Число вызовов в прогоне удваивается, пока прогон не займёт min_time.
+    """
+    timer = timeit.Timer(func)
+    min_time = MIN_TIME if min_time is None else min_time
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return [t / number * 1e6 for t in timer.repeat(repeat, number)]
+
+
+def time_stateful(prepare: Callable[[], Any], op: Callable[[Any], Any],
+                  repeat: int, number: int = 200) -> List[float]:
+    """
+    Для операций, меняющих состояние: prepare() вне замера, op(state) - в замере.
+
+    Returns:
+        Среднее время op (мкс) в каждом из repeat прогонов
+    """
+    perf_counter = time.perf_counter
+    results = []
+    for _ in range(repeat):
+        total = 0.0
+        for _ in range(number):
+            state = prepare()
+            start = perf_counter()
+            op(state)
+            total += perf_counter() - start
+        results.append(total / number * 1e6)
+    return results
+
+
+def _bench_check_collision(model: GameModel, repeat: int) -> List[float]:
+    piece = model.current_piece
+    return time_stateless(lambda: model._check_collision(piece, 0, 1), repeat)
+
+
+def _bench_rotate_piece(model: GameModel, repeat: int) -> List[float]:
+    return time_stateless(model.rotate_piece, repeat)
+
+
+def _bench_hard_drop(model: GameModel, repeat: int) -> List[float]:
+    return time_stateful(lambda: copy.deepcopy(model), GameModel.hard_drop, repeat, number=50)
+
+
+def _bench_clear_lines(model: GameModel, repeat: int) -> List[float]:
+    # Четыре нижние строки заполнены - замер самого дорогого случая, очистки тетриса
+    full_rows = model._rows[:-4] + [model._full_row_mask] * 4
+    full_field = model.field[:-4] + [[(255, 0, 0)] * model.width for _ in range(4)]
+
+    def prepare():
+        model._rows = full_rows[:]
+        model.field = full_field[:]
+        return model
+
+    return time_stateful(prepare, GameModel._clear_lines, repeat)
+
+
+def _bench_ghost_position(model: GameModel, repeat: int) -> List[float]:
+    def ghost():
+        model._ghost_distance = None  # Как после сдвига фигуры: кэш сброшен
+        model.get_ghost_position()
+    return time_stateless(ghost, repeat)
+
+
+def _bench_create_random(model: GameModel, repeat: int) -> List[float]:
+    factory = TetrominoFactory(model.piece_size, SEED)
+    return time_stateless(factory.create_random, repeat)
+
+
+def _bench_next_preview(model: GameModel, repeat: int) -> List[float]:
+    factory = TetrominoFactory(model.piece_size, SEED)
+    return time_stateless(factory.get_next_preview, repeat)
+
+
+_views: Dict[Tuple[int, int], Any] = {}
+
+
+def _get_view(width: int, height: int):
+    """Один вид на размер поля: окно создаётся заново только при смене размера"""
+    view = _views.get((width, height))
+    if view is None:
+        from utils import ConfigManager
+        from view import GameView
+        _views.clear()
+        view = _views[(width, height)] = GameView(width, height, ConfigManager())
+    return view
+
+
+def _bench_draw_field(model: GameModel, repeat: int) -> List[float]:
+    view = _get_view(model.width, model.height)
+    return time_stateless(lambda: view.draw_field(model.field), repeat)
+
+
+def _bench_draw_piece(model: GameModel, repeat: int) -> List[float]:
+    view = _get_view(model.width, model.height)
+    piece = model.current_piece
+    return time_stateless(lambda: view.draw_piece(piece), repeat)
+
+
+def _bench_draw_board(model: GameModel, repeat: int) -> List[float]:
+    # Частичная перерисовка кадра, в котором фигура сдвинулась на клетку
+    view = _get_view(model.width, model.height)
+    piece = model.current_piece
+    view.invalidate()
+    view.begin_frame()
+    view.draw_board(model.field, piece, model.get_ghost_position())
+
+    def frame():
+        piece.x ^= 1
+        model._ghost_distance = None
+        view.begin_frame()
+        view.draw_board(model.field, piece, model.get_ghost_position())
+    return time_stateless(frame, repeat)
+
+
+# Имя замера -> функция (модель, число прогонов) -> время вызова в мкс по прогонам
+BENCHMARKS: Dict[str, Callable[[GameModel, int], List[float]]] = {
+    'model.check_collision': _bench_check_collision,
+    'model.rotate_piece': _bench_rotate_piece,
+    'model.hard_drop': _bench_hard_drop,
+    'model.clear_lines': _bench_clear_lines,
+    'model.get_ghost_position': _bench_ghost_position,
+    'factory.create_random': _bench_create_random,
+    'factory.get_next_preview': _bench_next_preview,
+    'view.draw_field': _bench_draw_field,
+    'view.draw_piece': _bench_draw_piece,
+    'view.draw_board': _bench_draw_board,
+}
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeat: int = REPEAT,
+                   field_sizes=FIELD_SIZES, piece_sizes=PIECE_SIZES) -> Dict[str, Any]:
+    """
+    Прогнать замеры.
+
+    Returns:
+        {'meta': {...}, 'results': {"имя[ШxВ/фигуры]": {'min_us', 'median_us', 'stdev_us'}}}
+    """
+    names = names or list(BENCHMARKS)
+    results = {}
+    for width, height in field_sizes:
+        for piece_size in piece_sizes:
+            for name in names:
+                model = make_midgame_model(width, height, piece_size)
+                times = BENCHMARKS[name](model, repeat)
+                results[f"{name}[{width}x{height}/{piece_size}]"] = {
+                    'min_us': min(times),
+                    'median_us': statistics.median(times),
+                    'stdev_us': statistics.pstdev(times),
+                }
+    return {
+        'meta': {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'min_time': MIN_TIME,
+        },
+        'results': results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 1.25,
+            min_delta_us: float = 0.5) -> List[Tuple[str, float, float, float]]:
+    """
+    Сравнить с базовой линией по минимальному времени.
+
+    Args:
+        threshold: Допустимое отношение текущего времени к базовому
+        min_delta_us: Разница меньше этой не считается регрессией
+                      (у замеров в доли микросекунды шум сравним с самим временем)
+
+    Returns:
+        Список (замер, базовое, текущее, отношение) для регрессий
+    """
+    regressions = []
+    for key, result in current['results'].items():
+        base = baseline['results'].get(key)
+        if not base:
+            continue
+        ratio = result['min_us'] / base['min_us'] if base['min_us'] else 1.0
+        if ratio > threshold and result['min_us'] - base['min_us'] > min_delta_us:
+            regressions.append((key, base['min_us'], result['min_us'], ratio))
+    return regressions
+
+
+def main():
+    global MIN_TIME
+    parser = argparse.ArgumentParser(description="Бенчмарки Тетриса")
+    parser.add_argument('--filter', default=None, help="Только замеры, в имени которых есть подстрока")
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--min-time', type=float, default=MIN_TIME,
+                        help="Минимальная длительность одного прогона, с")
+    parser.add_argument('--output', default=None, help="Файл JSON для результатов")
+    parser.add_argument('--save-baseline', default=None, help="Сохранить результаты как базовую линию")
+    parser.add_argument('--compare', default=None, help="Сравнить с базовой линией из файла")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Во сколько раз замер может быть медленнее базовой линии")
+    parser.add_argument('--min-delta', type=float, default=0.5,
+                        help="Разница в мкс, которая не считается регрессией")
+    args = parser.parse_args()
+
+    MIN_TIME = args.min_time
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    report = run_benchmarks(names, args.repeat)
+
+    for key, result in report['results'].items():
+        print(f"{key:<44} min {result['min_us']:>10.2f} мкс   median {result['median_us']:>10.2f} мкс")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta)
+        for key, base, current, ratio in regressions:
+            print(f"РЕГРЕССИЯ {key}: {base:.2f} -> {current:.2f} мкс (x{ratio:.2f})")
+        if regressions:
+            sys.exit(1)
+        print(f"Регрессий нет (порог x{args.threshold})")
+
+
+if __name__ == "__main__":
+    main()
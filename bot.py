@@ -0,0 +1,422 @@
+"""
+Эвристический автоматический игрок.
+
+Для каждой новой фигуры перебираются все достижимые конечные положения
+(поворот, столбец): поиск в ширину по сдвигам и поворотам на текущей высоте
+фигуры с той же проверкой столкновений и тем же wall kick, что в GameModel.
+Каждое положение оценивается взвешенной суммой признаков поля после
+фиксации: очищенные линии, суммарная высота, дыры и неровность.
+Лучшее положение превращается в действия left/right/rotate/hard_drop.
+
+Признаки считаются по битовому полю модели и карте высот, повороты берутся
+из предвычисленных RotationState, поэтому фигуры не поворачиваются
+матрицами при переборе.
+
+Оценки положений запоминаются в ограниченном LRU-кэше (PlacementCache)
+по ключу (поле, состояние поворота, x, y), поэтому просмотр на фигуру
+вперёд (next_piece) не пересчитывает одни и те же положения: ветки
+перебора и соседние ходы часто приходят к одинаковым полям.
+
+Веса, подобранные tuner.py для конкретного размера поля и фигур, читаются
+из WEIGHTS_FILE; для остальных размеров используются DEFAULT_WEIGHTS.
+"""
+import json
+import os
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from model import GameModel
+from tetromino_factory import RotationState
+
+# Веса признаков по умолчанию (классическая настройка для поля 10x20)
+DEFAULT_WEIGHTS = {
+    'lines': 0.760666,
+    'height': -0.510066,
+    'holes': -0.35663,
+    'bumpiness': -0.184483,
+}
+FEATURES = tuple(DEFAULT_WEIGHTS)
+LOSS_SCORE = float('-inf')  # Оценка положения, после которого игра окончена
+WEIGHTS_FILE = "data/bot_weights.json"
+
+CACHE_SIZE = 50_000  # Записей в кэше оценок (каждая хранит поле после хода)
+
+# Поворот, столбец фигуры и действия, которые к ним приводят
+Placement = Tuple[int, int, Tuple[str, ...]]
+
+
+def weights_key(width: int, height: int, piece_size: int) -> str:
+    """Ключ весов в WEIGHTS_FILE вида 10x20/4"""
+    return f"{width}x{height}/{piece_size}"
+
+
+def load_tuned_weights(path: str = WEIGHTS_FILE) -> Dict[str, Dict[str, float]]:
+    """Все подобранные веса из файла (пустой словарь, если файла нет или он повреждён)"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка загрузки весов бота: {e}")
+        return {}
+
+
+def board_features(rows: List[int], width: int, height: int) -> Tuple[List[int], int]:
+    """
+    Высоты столбцов и число дыр по битовому полю.
+
+    Дыра - пустая клетка, над которой в том же столбце есть занятая.
+    """
+    heights = [0] * width
+    covered = 0  # Столбцы, в которых сверху уже встретилась занятая клетка
+    holes = 0
+    for y, row in enumerate(rows):
+        if covered:
+            holes += (covered & ~row).bit_count()
+        new = row & ~covered
+        while new:
+            low = new & -new
+            heights[low.bit_length() - 1] = height - y
+            new ^= low
+        covered |= row
+    return heights, holes
+
+
+def _column_profile(state: RotationState) -> Tuple[Tuple[int, int, int, int], ...]:
+    """Для каждого столбца фигуры: (столбец, верхняя строка, нижняя строка, пустые клетки между ними)"""
+    rows_by_col: Dict[int, List[int]] = {}
+    for i, j in state.cells:
+        rows_by_col.setdefault(j, []).append(i)
+    return tuple((j, min(rows), max(rows), max(rows) - min(rows) + 1 - len(rows))
+                 for j, rows in sorted(rows_by_col.items()))
+
+
+class Board:
+    """
+    Поле для перебора: битовые строки (кортеж - он же ключ кэша), высоты и дыры.
+
+    Не связано с GameModel, поэтому годится и для полей «после хода»
+    при просмотре вперёд.
+    """
+    __slots__ = ('rows', 'heights', 'holes', 'width', 'height', 'full')
+
+    def __init__(self, rows: Tuple[int, ...], width: int, height: int,
+                 heights: Optional[List[int]] = None, holes: Optional[int] = None):
+        self.rows = rows
+        self.width = width
+        self.height = height
+        self.full = (1 << width) - 1
+        if heights is None:
+            heights, holes = board_features(rows, width, height)
+        self.heights = heights
+        self.holes = holes
+
+    @classmethod
+    def from_model(cls, model: GameModel) -> 'Board':
+        """Поле модели; высоты и дыры модель ведёт сама, поле заново не сканируется"""
+        return cls(model.rows, model.width, model.height,
+                   list(model.column_heights), model.holes)
+
+    def fits(self, state: RotationState, x: int, y: int) -> bool:
+        """То же, что GameModel._check_collision, но для произвольного состояния"""
+        if x + state.min_col < 0 or x + state.max_col >= self.width:
+            return False
+        rows = self.rows
+        height = self.height
+        for i, mask in state.mask_rows:
+            row = y + i
+            if row >= height:
+                return False
+            if row >= 0 and rows[row] & (mask << x if x >= 0 else mask >> -x):
+                return False
+        return True
+
+    def landing_y(self, state: RotationState, x: int, y: int) -> Tuple[int, bool]:
+        """
+        Строка, на которой фигура остановится после hard_drop.
+
+        Returns:
+            (y, True если фигура падала над всеми столбцами - тогда признаки можно считать по приращениям)
+        """
+        heights = self.heights
+        height = self.height
+        distance = height - y
+        for j, bottom in state.col_bottoms:
+            low = y + bottom
+            top = height - heights[x + j]
+            if low >= top:
+                # Фигура под навесом - идём по битовому полю, как GameModel.ghost_distance
+                distance = 0
+                while self.fits(state, x, y + distance + 1):
+                    distance += 1
+                return y + distance, False
+            distance = min(distance, top - 1 - low)
+        return y + distance, True
+
+
+class Evaluation:
+    """Результат хода: оценка, высота падения, линии и поле после хода (None - проигрыш)"""
+    __slots__ = ('score', 'landing_y', 'lines', 'board')
+
+    def __init__(self, score: float, landing_y: int, lines: int, board: Optional[Board]):
+        self.score = score
+        self.landing_y = landing_y
+        self.lines = lines
+        self.board = board
+
+
+class PlacementCache:
+    """
+    Ограниченный LRU-кэш оценок и результатов поиска положений.
+
+    Ключ содержит само поле (кортеж битовых строк), поэтому совпадение
+    ключей означает совпадение полей - коллизий хэша здесь быть не может.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._data),
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+class HeuristicBot:
+    """
+    Бот с поиском лучшего положения фигуры.
+
+    Используется как политика HeadlessGame (вызывается на каждом тике
+    и отдаёт все действия для новой фигуры сразу) или напрямую
+    с GameModel через play(). С lookahead=True каждое положение текущей
+    фигуры оценивается по лучшему положению следующей (model.next_piece).
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, weights_file: str = WEIGHTS_FILE,
+                 lookahead: bool = False, cache_size: int = CACHE_SIZE):
+        """
+        Args:
+            weights: Веса признаков; None - подобранные для размера поля из weights_file
+            weights_file: Файл с весами от tuner.py
+            lookahead: Учитывать следующую фигуру
+            cache_size: Размер кэша оценок (записей)
+        """
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+        self._fixed_weights = weights is not None
+        self.weights_file = weights_file
+        self._weights_key = None  # Для какого размера поля и фигур выбраны веса
+        self.lookahead = lookahead
+        self.cache = PlacementCache(cache_size)
+        self._profiles: Dict[RotationState, tuple] = {}
+        self._piece = None  # Фигура, для которой уже выданы действия
+        self.placements_evaluated = 0
+
+    def __call__(self, game) -> Iterable[str]:
+        model = game.model
+        if model.game_over or model.paused or model.current_piece is self._piece:
+            return ()
+        self._piece = model.current_piece
+        return self.plan(model)
+
+    def play(self, model: GameModel) -> int:
+        """
+        Поставить текущую фигуру в лучшее положение через move/rotate_piece/hard_drop.
+
+        Returns:
+            На сколько строк фигура упала при hard_drop
+        """
+        rows = 0
+        for action in self.plan(model):
+            if action == 'left':
+                model.move(-1, 0)
+            elif action == 'right':
+                model.move(1, 0)
+            elif action == 'rotate':
+                model.rotate_piece()
+            elif action == 'hard_drop':
+                rows = model.hard_drop()
+        return rows
+
+    def plan(self, model: GameModel) -> List[str]:
+        """Действия, приводящие текущую фигуру в лучшее положение, с hard_drop в конце"""
+        piece = model.current_piece
+        if piece is None or model.game_over:
+            return []
+        self.select_weights(model.width, model.height, model.piece_size)
+        next_states = model.next_piece.states if self.lookahead else None
+        best = self.best_placement(Board.from_model(model), piece.states, piece.rotation,
+                                   piece.x, piece.y, next_states)
+        return list(best[4]) + ['hard_drop']
+
+    def best_placement(self, board: Board, states: tuple, rotation: int, x: int, y: int,
+                       next_states: Optional[tuple] = None) -> Tuple[float, int, int, int, Tuple[str, ...]]:
+        """
+        Лучшее положение фигуры, стоящей на поле board в (rotation, x, y).
+
+        Args:
+            next_states: Состояния следующей фигуры для просмотра вперёд (None - без него)
+
+        Returns:
+            (оценка, поворот, x, строка после падения, действия до hard_drop)
+        """
+        best = None
+        for rotation, x, path in self.reachable(board, states, rotation, x, y):
+            result = self.evaluate(board, states[rotation], x, y)
+            score = result.score
+            if next_states is not None and result.board is not None:
+                score = self.weights['lines'] * result.lines + self.best_score(result.board, next_states)
+            if best is None or score > best[0]:
+                best = (score, rotation, x, result.landing_y, path)
+        return best
+
+    def best_score(self, board: Board, states: tuple) -> float:
+        """Лучшая оценка фигуры, которая появится на поле board (как в GameModel._spawn_piece)"""
+        size = len(states[0].shape[0])
+        x = (board.width - size) // 2
+        y = -size
+        if not board.fits(states[0], x, y):
+            return LOSS_SCORE
+        best = LOSS_SCORE
+        for rotation, x, _ in self.reachable(board, states, 0, x, y):
+            score = self.evaluate(board, states[rotation], x, y).score
+            if score > best:
+                best = score
+        return best
+
+    def select_weights(self, width: int, height: int, piece_size: int):
+        """Взять подобранные веса для размера поля и фигур (файл читается при смене размера)"""
+        if self._fixed_weights:
+            return
+        key = weights_key(width, height, piece_size)
+        if key != self._weights_key:
+            self._weights_key = key
+            weights = dict(DEFAULT_WEIGHTS)
+            weights.update(load_tuned_weights(self.weights_file).get(key, {}))
+            if weights != self.weights:
+                self.weights = weights
+                self.cache.clear()  # Оценки в кэше посчитаны с другими весами
+
+    def reachable(self, board: Board, states: tuple, rotation: int, x: int, y: int) -> List[Placement]:
+        """
+        Все положения (поворот, столбец), достижимые сдвигами и поворотами на высоте y.
+
+        Returns:
+            Список (поворот, x, кратчайшая последовательность действий)
+        """
+        key = ('reachable', board.rows, states, rotation, x, y)
+        placements = self.cache.get(key)
+        if placements is not None:
+            return placements
+        start = (rotation, x)
+        paths = {start: ()}
+        queue = deque([start])
+        fits = board.fits
+        while queue:
+            rotation, x = current = queue.popleft()
+            path = paths[current]
+            state = states[rotation]
+            for dx, action in ((-1, 'left'), (1, 'right')):
+                target = (rotation, x + dx)
+                if target not in paths and fits(state, x + dx, y):
+                    paths[target] = path + (action,)
+                    queue.append(target)
+            # Поворот с теми же сдвигами (wall kick), что в GameModel.rotate_piece
+            next_rotation = (rotation + 1) % len(states)
+            next_state = states[next_rotation]
+            for dx in state.kicks:
+                if fits(next_state, x + dx, y):
+                    target = (next_rotation, x + dx)
+                    if target not in paths:
+                        paths[target] = path + ('rotate',)
+                        queue.append(target)
+                    break
+        placements = [(rotation, x, path) for (rotation, x), path in paths.items()]
+        self.cache.put(key, placements)
+        return placements
+
+    def _profile(self, state: RotationState) -> tuple:
+        profile = self._profiles.get(state)
+        if profile is None:
+            profile = self._profiles[state] = _column_profile(state)
+        return profile
+
+    def evaluate(self, board: Board, state: RotationState, x: int, y: int) -> Evaluation:
+        """Оценка поля после того, как фигура в состоянии state упадёт из (x, y)"""
+        key = (board.rows, state, x, y)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._evaluate(board, state, x, y)
+            self.cache.put(key, result)
+        return result
+
+    def _evaluate(self, board: Board, state: RotationState, x: int, y: int) -> Evaluation:
+        self.placements_evaluated += 1
+        height = board.height
+        y, above_stack = board.landing_y(state, x, y)
+        if y + state.min_row < 0:
+            return Evaluation(LOSS_SCORE, y, 0, None)  # Часть фигуры осталась над полем
+
+        full = board.full
+        new_rows = list(board.rows)
+        lines = 0
+        for i, mask in state.mask_rows:
+            row = new_rows[y + i] = new_rows[y + i] | (mask << x if x >= 0 else mask >> -x)
+            if row == full:
+                lines += 1
+
+        if lines or not above_stack:
+            # Строки сдвигаются или фигура под навесом - пересчитываем поле целиком
+            if lines:
+                kept = [row for row in new_rows if row != full]
+                new_rows = [0] * (height - len(kept)) + kept
+            if new_rows[0]:
+                return Evaluation(LOSS_SCORE, y, lines, None)
+            result = Board(tuple(new_rows), board.width, height)
+        else:
+            heights = board.heights[:]
+            holes = board.holes
+            for j, top, bottom, gaps in self._profile(state):
+                column = x + j
+                # Пустые клетки между низом фигуры и прежней вершиной столбца становятся дырами
+                holes += height - heights[column] - 1 - (y + bottom) + gaps
+                heights[column] = height - (y + top)
+            if max(heights) >= height:
+                return Evaluation(LOSS_SCORE, y, lines, None)
+            result = Board(tuple(new_rows), board.width, height, heights, holes)
+
+        heights = result.heights
+        bumpiness = 0
+        previous = heights[0]
+        for h in heights:
+            bumpiness += h - previous if h > previous else previous - h
+            previous = h
+        weights = self.weights
+        score = (weights['lines'] * lines + weights['height'] * sum(heights)
+                 + weights['holes'] * result.holes + weights['bumpiness'] * bumpiness)
+        return Evaluation(score, y, lines, result)
@@ -1,7 +1,17 @@
 # controller.py
+import datetime
+import os
 import pygame
+from model import TICK_MS
+from persistence import PersistenceWriter
+from replay import ReplayRecorder
 from tetromino_factory import TetrominoFactory
-from utils import load_music, load_sound
+from utils import SoundManager, load_music, load_sound
+
+# Больше этого времени за один кадр симуляция не догоняет (защита от лавины тиков)
+MAX_FRAME_MS = 250
+# Удержанный мягкий сброс опускает фигуру на ряд раз в столько логических тиков
+SOFT_DROP_TICKS = 3
 
 
 class GameController:
@@ -14,18 +24,23 @@ class GameController:
         self.is_loaded_game = is_loaded_game  # Флаг для отслеживания, загружена ли игра
 
         self.running = True
-        self.last_drop_time = 0
         self.last_move_time = 0
         self.soft_drop_rows = 0
+        self.soft_drop_held = False
+        self._soft_drop_ticks = 0  # Тиков с последнего шага удержанного мягкого сброса
         self.show_leaderboard = False
         self.added_game_over_score = False
         self.score_added_to_leaderboard = False  # Флаг для отслеживания добавления рекорда
         
         # Используем session_id из модели (который был восстановлен или сгенерирован)
         self.session_id = model.session_id
+
+        # Запись на диск идёт в фоновом потоке, игровой цикл её не ждёт
+        self.writer = PersistenceWriter(save_manager, leaderboard)
+        self._pending_save = None  # (квитанция, аргументы рекорда или None)
         
         # Stop menu music and load game music
-        pygame.mixer.init()
+        SoundManager.get().init_mixer()
         pygame.mixer.music.stop()  # Останавливаем музыку меню
         self.game_music_loaded = load_music("game_music.mp3", volume=0.7, config=config)
         
@@ -42,6 +57,30 @@ class GameController:
         # Загружаем контролы из конфига
         self.controls = config.get_controls()
 
+        # Частота отрисовки не связана с симуляцией (0 - без ограничения)
+        self.render_fps = config.get('Graphics', 'fps', 60, int)
+        self.ticks = 0  # Логических тиков симуляции с начала игры
+        self._last_frame_state = None
+
+        # Запись повтора (действия игрока по тикам), включается в [Replay] конфига
+        self.record_replay = config.get('Replay', 'record', 'false', lambda x: x.lower() == 'true')
+        self.replay_dir = config.get('Replay', 'directory', 'data/replays')
+        self.recorder = None
+
+        # Подсказка лучшего положения ([Graphics] show_hint, переключается клавишей hint).
+        # Ищется в фоновом потоке, который создаётся при первом включении
+        self.show_hint = config.get('Graphics', 'show_hint', 'false', lambda x: x.lower() == 'true')
+        self.hint_worker = None
+        self.hint = None  # Последний ответ потока для текущей фигуры: (версия, поворот, x, y)
+        self._hint_key = None
+        self._hint_version = 0
+        self._hint_piece = None  # Переиспользуемый объект для отрисовки подсказки
+
+        # Профилировщик кадра ([Debug] profiler = true); выключенный ничего не оборачивает
+        self.profiler = None
+        if config.get('Debug', 'profiler', 'false', lambda x: x.lower() == 'true'):
+            self._setup_profiler(config)
+
     def handle_events(self):
         current_time = pygame.time.get_ticks()
         move_delay = 200  # 200 мс задержка между ходами
@@ -55,35 +94,34 @@ class GameController:
                 if not self.model.game_over and not self.model.paused:
                     if event.key == self.controls['move_left']:
                         if current_time - self.last_move_time >= move_delay:
-                            self.model.move(-1, 0)
+                            if self.model.move(-1, 0):
+                                self._record('left')
                             self.last_move_time = current_time
                     elif event.key == self.controls['move_right']:
                         if current_time - self.last_move_time >= move_delay:
-                            self.model.move(1, 0)
+                            if self.model.move(1, 0):
+                                self._record('right')
                             self.last_move_time = current_time
                     elif event.key == self.controls['rotate']:
                         self.model.rotate_piece()
+                        self._record('rotate')
                     elif event.key == self.controls['hard_drop']:
                         rows = self.model.hard_drop()
                         self.model.score += rows * 2
+                        self._record('hard_drop')
                         if self.drop_sound:
                             self.drop_sound.play()
                     elif event.key == self.controls['save_game']:
                         save_data = self.model.get_save_data()
-                        if self.save_manager.save_game(save_data, self.model.player_name):
+                        ticket = self.writer.submit_save(save_data, self.model.player_name)
+                        if ticket:
                             # Добавляем рекорд при сохранении только если это новая игра
-                            if not self.is_loaded_game and not self.score_added_to_leaderboard:
-                                self.leaderboard.add_score(
-                                    self.model.player_name, self.model.score, self.model.level,
-                                    self.model.lines_cleared, self.model.piece_size,
-                                    f"{self.model.width}x{self.model.height}",
-                                    session_id=self.session_id
-                                )
-                                self.score_added_to_leaderboard = True
-                            self.view.show_save_notification()
+                            add_score = not self.is_loaded_game and not self.score_added_to_leaderboard
+                            self._pending_save = (ticket, self._score_args() if add_score else None)
 
                 if event.key == self.controls['pause']:
                     self.model.paused = not self.model.paused
+                    self._record('pause')
                     if self.pause_sound:
                         self.pause_sound.play()
                     # Пауза/включение музыки
@@ -91,25 +129,26 @@ class GameController:
                         pygame.mixer.music.pause()
                     else:
                         pygame.mixer.music.unpause()
+                elif event.key == self.controls.get('hint'):
+                    self.show_hint = not self.show_hint
                 elif event.key == self.controls['new_game']:
                     self.model.reset_game()
                     self.soft_drop_rows = 0
+                    self._record('new_game')
                     self.added_game_over_score = False
                 elif event.key == self.controls['menu']:
                     # Сохраняем рекорд перед выходом
                     if self.model.score > 0 and not self.score_added_to_leaderboard:
-                        self.leaderboard.add_score(
-                            self.model.player_name, self.model.score, self.model.level,
-                            self.model.lines_cleared, self.model.piece_size,
-                            f"{self.model.width}x{self.model.height}",
-                            session_id=self.session_id
-                        )
-                        self.score_added_to_leaderboard = True
+                        if not self._submit_score(self._score_args()):
+                            # Очередь переполнена - дожидаемся её записи, второго шанса не будет
+                            self.writer.flush()
+                            self._submit_score(self._score_args())
                     return False
 
             elif event.type == pygame.KEYUP:
                 if event.key == self.controls['soft_drop'] and self.soft_drop_rows:
                     self.model.score += self.soft_drop_rows
+                    self._record('soft_drop_release')
                     if self.soft_drop_sound:
                         self.soft_drop_sound.play()
                     self.soft_drop_rows = 0
@@ -119,25 +158,35 @@ class GameController:
             keys = pygame.key.get_pressed()
             if current_time - self.last_move_time >= move_delay:
                 if keys[self.controls['move_left']]:
-                    self.model.move(-1, 0)
+                    if self.model.move(-1, 0):
+                        self._record('left')
                     self.last_move_time = current_time
                 elif keys[self.controls['move_right']]:
-                    self.model.move(1, 0)
+                    if self.model.move(1, 0):
+                        self._record('right')
                     self.last_move_time = current_time
-            if keys[self.controls['soft_drop']]:
-                if self.model.move(0, 1):
-                    self.soft_drop_rows += 1
+            # Сама фигура опускается в update(), с частотой тиков, а не кадров
+            self.soft_drop_held = bool(keys[self.controls['soft_drop']])
+        else:
+            self.soft_drop_held = False
 
         return True
 
     def update(self):
+        """Один логический тик симуляции длительностью TICK_MS"""
         if self.model.game_over or self.model.paused or self.show_leaderboard:
             self.handle_game_over()
             return
 
-        if pygame.time.get_ticks() - self.last_drop_time > self.model.speed:
-            self.model.drop()
-            self.last_drop_time = pygame.time.get_ticks()
+        if self.soft_drop_held:
+            if self._soft_drop_ticks == 0 and self.model.move(0, 1):
+                self.soft_drop_rows += 1
+                self._record('soft_drop')
+            self._soft_drop_ticks = (self._soft_drop_ticks + 1) % SOFT_DROP_TICKS
+        else:
+            self._soft_drop_ticks = 0
+
+        self.model.advance(TICK_MS)
 
         # Обновление музыки на основе скорости игры
         if self.model.lines_cleared_this_turn > 0:
@@ -153,35 +202,120 @@ class GameController:
 
     def handle_game_over(self):
         """Обработка Game Over"""
-        if self.model.game_over and not self.added_game_over_score:
+        if not self.model.game_over:
+            return
+        if not self.added_game_over_score:
             # Воспроизведение музыки конца игры
             if self.gameover_sound:
                 self.gameover_sound.play()
-            
-            # Добавляем рекорд при Game Over только если его еще не добавили
-            if not self.score_added_to_leaderboard:
-                self.leaderboard.add_score(
-                    self.model.player_name, self.model.score, self.model.level,
-                    self.model.lines_cleared, self.model.piece_size,
-                    f"{self.model.width}x{self.model.height}",
-                    session_id=self.session_id
-                )
-                self.score_added_to_leaderboard = True
             self.added_game_over_score = True
 
+        # Добавляем рекорд при Game Over только если его еще не добавили
+        # (если очередь записи была полна - повторяем в следующих кадрах)
+        if not self.score_added_to_leaderboard:
+            self._submit_score(self._score_args())
+
+    def _setup_profiler(self, config):
+        """Обернуть замерами этапы кадра"""
+        from profiler import FrameProfiler
+        self.profiler = FrameProfiler()
+        self.profiler_overlay = config.get('Debug', 'profiler_overlay', 'true', lambda x: x.lower() == 'true')
+        self.profiler_output = config.get('Debug', 'profiler_output', 'data/profile')
+        for owner, attr in ((self, 'handle_events'), (self, 'update'), (self, 'render'),
+                            (self.view, 'draw_board'), (self.view, 'draw_field'), (self.view, 'draw_piece'),
+                            (self.view, 'draw_right_panel'), (self.view.ui_manager, 'draw_ui'),
+                            (self.view, 'present')):
+            self.profiler.instrument(owner, attr)
+
+    def _record(self, action):
+        """Запомнить действие игрока для повтора"""
+        if self.recorder:
+            self.recorder.record(self.ticks, action)
+
+    def _save_replay(self):
+        """Отдать записанный повтор потоку записи"""
+        model = self.model
+        replay = self.recorder.finish({
+            'score': model.score, 'level': model.level, 'lines': model.lines_cleared,
+            'ticks': self.ticks, 'game_over': model.game_over,
+        })
+        self.recorder = None
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.replay_dir, f"{self.session_id}_{timestamp}.replay")
+        self.writer.submit(('replay', path), replay.save, path)
+
+    def _score_args(self):
+        """Аргументы Leaderboard.add_score для текущей игры"""
+        return (self.model.player_name, self.model.score, self.model.level,
+                self.model.lines_cleared, self.model.piece_size,
+                f"{self.model.width}x{self.model.height}", self.session_id)
+
+    def _submit_score(self, score_args) -> bool:
+        """Отдать рекорд потоку записи; флаг ставится, только если очередь его приняла"""
+        self.score_added_to_leaderboard = self.writer.submit_score(*score_args) is not None
+        return self.score_added_to_leaderboard
+
+    def _poll_persistence(self):
+        """Уведомление о сохранении - только после того, как файл действительно записан"""
+        if not self._pending_save or not self._pending_save[0].done.is_set():
+            return
+        ticket, score_args = self._pending_save
+        self._pending_save = None
+        if not ticket.ok:
+            return
+        if score_args and not self.score_added_to_leaderboard:
+            # Не принятый очередью рекорд будет отправлен при Game Over или выходе в меню
+            self._submit_score(score_args)
+        self.view.show_save_notification()
+
+    def _update_hint(self):
+        """
+        Отдать потоку подсказки новый снимок, если фигура сдвинулась, и забрать готовый ответ.
+
+        Ответ для устаревшего снимка result() не возвращает. Пока ответа для нового
+        снимка нет, рисуется прошлая подсказка той же фигуры: сдвиг или падение
+        на ряд не должны гасить её на кадр. Сбрасывается она только со сменой фигуры.
+        """
+        model = self.model
+        piece = model.current_piece
+        if not self.show_hint or piece is None or model.game_over or model.paused:
+            self.hint = None
+            self._hint_key = None
+            return
+        key = (piece, piece.rotation, piece.x, piece.y, model.pieces_placed)
+        if key != self._hint_key:
+            if self.hint_worker is None:
+                from hint import HintWorker
+                self.hint_worker = HintWorker()
+            if self._hint_key is None or self._hint_key[0] is not piece or self._hint_key[-1] != model.pieces_placed:
+                self.hint = None  # Подсказка для прежней фигуры к новой не относится
+            self._hint_key = key
+            self._hint_version += 1
+            self.hint_worker.submit(self._hint_version, model)
+        result = self.hint_worker.result(self._hint_version)
+        if result is not None:
+            self.hint = result
+
+    def _hint_tetromino(self):
+        """Фигура в положении подсказки (один объект на игру, как тень в модели)"""
+        if not self.hint:
+            return None
+        piece = self.model.current_piece
+        _, rotation, x, y = self.hint
+        hint = self._hint_piece
+        if hint is None or hint.states is not piece.states or hint.color != piece.color:
+            hint = self._hint_piece = piece.copy()
+        hint.set_rotation(rotation)
+        hint.x = x
+        hint.y = y
+        return hint
+
     def render(self):
-        self.view.screen.fill((30, 30, 40))
-        
-        # Рисуем цветное название игры
-        self.view.draw_title()
-        
-        self.view.draw_field(self.model.field)
+        # Полный кадр (фон и название) только при необходимости, иначе - изменённые области
+        self.view.begin_frame()
 
         ghost = self.model.get_ghost_position()
-        if ghost:
-            self.view.draw_ghost_piece(ghost)
-        if self.model.current_piece:
-            self.view.draw_piece(self.model.current_piece)
+        self.view.draw_board(self.model.field, self.model.current_piece, ghost, self._hint_tetromino())
 
         # Обновляем информацию для панели
         self.view.current_info = {
@@ -198,6 +332,7 @@ class GameController:
                 self.model.piece_size, f"{self.model.width}x{self.model.height}"
             )
             # Простая отрисовка лидерборда (можно улучшить)
+            self.view.invalidate()
             y = 100
             for i, entry in enumerate(leaders[:10]):
                 text = f"{i+1}. {entry['player_name']} — {entry['score']}"
@@ -213,17 +348,48 @@ class GameController:
         # Показываем уведомление о сохранении
         self.view.draw_notification()
 
+        if self.profiler and self.profiler_overlay:
+            self.view.mark_dirty(self.profiler.draw_overlay(self.view.screen, self.view.font_small))
+
         self.view.update_display()
 
+    def _frame_state(self):
+        """То, от чего зависит картинка; если не изменилось - кадр можно не рисовать"""
+        model = self.model
+        piece = model.current_piece
+        return (piece, piece.x if piece else 0, piece.y if piece else 0,
+                piece.rotation if piece else 0, model.field, model.pieces_placed,
+                model.score, model.level, model.lines_cleared, model.paused, model.game_over,
+                self.show_leaderboard, self.view.notification_active(), self.hint)
+
     def run(self):
-        self.last_drop_time = pygame.time.get_ticks()
+        # Фиксированный шаг: модель идёт тиками по TICK_MS, отрисовка - со своей частотой
+        accumulator = 0
+        if self.record_replay:
+            # Начальное состояние берём здесь: загруженная игра к этому моменту уже восстановлена
+            self.recorder = ReplayRecorder(self.model)
+        profiler = self.profiler
         while self.running:
-            dt = self.view.clock.tick(60) / 1000.0
+            frame_ms = self.view.clock.tick(self.render_fps)
+            if profiler:
+                profiler.begin_frame()
+            accumulator += min(frame_ms, MAX_FRAME_MS)
             if not self.handle_events():
                 break
-            self.update()
-            self.view.update(dt)
-            self.render()
+            self._poll_persistence()
+            while accumulator >= TICK_MS:
+                self.update()
+                accumulator -= TICK_MS
+                self.ticks += 1
+            self._update_hint()
+            self.view.update(frame_ms / 1000.0)
+
+            frame_state = self._frame_state()
+            if frame_state != self._last_frame_state or self.view.redraw_requested:
+                self._last_frame_state = frame_state
+                self.render()
+            if profiler:
+                profiler.end_frame()
         
         # Stop game music when exiting
         pygame.mixer.music.stop()
@@ -231,4 +397,16 @@ class GameController:
     def cleanup(self):
         """Clean up when exiting the game"""
         pygame.mixer.music.stop()
+        if self.recorder:
+            self._save_replay()
+        if self.profiler:
+            self.profiler.restore()
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = self.profiler.export(os.path.join(self.profiler_output, f"frames_{timestamp}"))
+            if path:
+                print(f"Замеры кадров записаны: {path}")
+        if self.hint_worker:
+            self.hint_worker.close()
+        # Дописываем всё, что ещё стоит в очереди записи
+        self.writer.close()
         return True
\ No newline at end of file
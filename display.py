@@ -0,0 +1,57 @@
+"""
+Общий контекст отображения: окно, часы, UIManager, шрифты и логотип.
+
+Создаётся один раз на процесс и передаётся и меню, и GameView, поэтому
+переход между меню и игрой не пересоздаёт окно и не перезагружает ресурсы.
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+import pygame
+import pygame_gui
+
+from utils import load_logo
+
+SCREEN_SIZE = (800, 600)
+LOGO_WIDTH = 250
+
+
+class DisplayContext:
+    """Ресурсы отображения, общие для всех экранов"""
+    _instance: Optional['DisplayContext'] = None
+
+    def __init__(self, size: Tuple[int, int] = SCREEN_SIZE):
+        pygame.init()
+        self.width, self.height = size
+        self.screen = pygame.display.set_mode(size)
+        self.clock = pygame.time.Clock()
+        self.ui_manager = pygame_gui.UIManager(size)
+        self._fonts: Dict[int, pygame.font.Font] = {}
+        self._logo: Optional[pygame.Surface] = None
+        self._logo_loaded = False
+        self._logo_lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> 'DisplayContext':
+        """Общий контекст (окно создаётся при первом обращении)"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def font(self, size: int) -> pygame.font.Font:
+        """Шрифт по умолчанию нужного размера (создаётся один раз)"""
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def set_caption(self, title: str):
+        pygame.display.set_caption(title)
+
+    def load_logo(self) -> Optional[pygame.Surface]:
+        """Логотип (файл читается один раз, можно вызывать из фонового потока)"""
+        with self._logo_lock:
+            if not self._logo_loaded:
+                self._logo = load_logo(max_width=LOGO_WIDTH)
+                self._logo_loaded = True
+            return self._logo
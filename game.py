@@ -7,12 +7,12 @@ from controller import GameController
 
 class TetrisGame:
     def __init__(self, width, height, piece_size, player_name,
-                 save_manager, leaderboard, config, save_data=None):
+                 save_manager, leaderboard, config, save_data=None, display=None):
         # Если загружаем игру, извлекаем session_id из сохранённых данных
         session_id = save_data.get("session_id") if save_data else None
         
         self.model = GameModel(width, height, piece_size, player_name, session_id=session_id)
-        self.view = GameView(width, height, config)
+        self.view = GameView(width, height, config, display)
         self.controller = GameController(self.model, self.view,
                                           save_manager, leaderboard, config,
                                           is_loaded_game=save_data is not None)
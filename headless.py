@@ -0,0 +1,242 @@
+"""
+Безоконный (headless) режим игры.
+
+Ведёт GameModel по логическим тикам без окна pygame и без звука,
+поэтому подходит для массовых симуляций на серверах без дисплея:
+балансировки, регрессионных прогонов и оценки ботов.
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import random
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from bot import HeuristicBot
+from model import GameModel, TICK_MS
+
+# Действия игрока - те же, что GameController выполняет по нажатиям клавиш
+ACTIONS = ('left', 'right', 'rotate', 'soft_drop', 'soft_drop_release', 'hard_drop', 'pause', 'new_game')
+
+# Политика получает игру и возвращает действия для текущего тика
+Policy = Callable[['HeadlessGame'], Iterable[str]]
+# Сценарий - пары (тик, действие)
+Script = Iterable[Tuple[int, str]]
+
+
+class HeadlessGame:
+    """
+    Игра без отрисовки и звука на логических часах.
+
+    Ввод задаётся либо сценарием - последовательностью пар (тик, действие),
+    либо политикой - функцией, которую вызывают на каждом тике.
+    Время не связано с pygame.time.get_ticks(), поэтому игра идёт
+    так быстро, как позволяет процессор, и полностью воспроизводима.
+    """
+
+    def __init__(self, width: int = 10, height: int = 20, piece_size: int = 4,
+                 player_name: str = "Бот", seed: Optional[int] = None,
+                 inputs: Union[Policy, Script, None] = None, tick_ms: int = TICK_MS,
+                 model: Optional[GameModel] = None):
+        """
+        Args:
+            width, height, piece_size: Параметры новой игры (если model не передана)
+            player_name: Имя игрока в результатах
+            seed: Зерно генератора фигур для воспроизводимых прогонов
+            inputs: Политика или сценарий ввода
+            tick_ms: Длительность логического тика, мс
+            model: Уже созданная модель (например, загруженная из сохранения)
+        """
+        self.model = model or GameModel(width, height, piece_size, player_name, seed=seed)
+        self.tick_ms = tick_ms
+        self.ticks = 0
+        self.soft_drop_rows = 0
+
+        self.policy: Optional[Policy] = None
+        self._script: Dict[int, List[str]] = {}
+        self._script_ticks: deque = deque()  # Тики сценария по возрастанию
+        self.set_inputs(inputs)
+
+    def set_inputs(self, inputs: Union[Policy, Script, None]):
+        """Установить политику или сценарий ввода"""
+        self.policy = None
+        self._script = {}
+        self._script_ticks = deque()
+        if inputs is None:
+            return
+        if callable(inputs):
+            self.policy = inputs
+            return
+        for tick, action in inputs:
+            if action not in ACTIONS:
+                raise ValueError(f"Неизвестное действие: {action}")
+            self._script.setdefault(tick, []).append(action)
+        self._script_ticks = deque(sorted(self._script))
+
+    def apply_action(self, action: str):
+        """Выполнить действие игрока с тем же начислением очков, что и в GameController"""
+        model = self.model
+        if action == 'pause':
+            model.paused = not model.paused
+            return
+        if action == 'soft_drop_release':
+            model.score += self.soft_drop_rows
+            self.soft_drop_rows = 0
+            return
+        if action == 'new_game':
+            model.reset_game()
+            self.soft_drop_rows = 0
+            return
+        if model.game_over or model.paused:
+            return
+
+        if action == 'left':
+            model.move(-1, 0)
+        elif action == 'right':
+            model.move(1, 0)
+        elif action == 'rotate':
+            model.rotate_piece()
+        elif action == 'soft_drop':
+            if model.move(0, 1):
+                self.soft_drop_rows += 1
+        elif action == 'hard_drop':
+            rows = model.hard_drop()
+            model.score += rows * 2
+        else:
+            raise ValueError(f"Неизвестное действие: {action}")
+
+    def tick(self):
+        """Один логический тик: ввод этого тика, затем гравитация"""
+        if self.policy:
+            for action in self.policy(self):
+                self.apply_action(action)
+        elif self.ticks in self._script:
+            for action in self._script.pop(self.ticks):
+                self.apply_action(action)
+            while self._script_ticks and self._script_ticks[0] <= self.ticks:
+                self._script_ticks.popleft()
+        self.model.advance(self.tick_ms)
+        self.ticks += 1
+
+    def _skip_idle_ticks(self, target: Optional[int], max_pieces: Optional[int]):
+        """
+        Промотать тики без ввода до target (или до Game Over, если target не задан).
+
+        Гравитация продвигается сразу до следующего шага падения,
+        поэтому цикл идёт по событиям падения, а не по каждому тику.
+        """
+        model = self.model
+        while target is None or self.ticks < target:
+            if model.game_over or model.paused:
+                break
+            if max_pieces is not None and model.pieces_placed >= max_pieces:
+                return
+            remaining = model.speed - model.gravity_time
+            step = max(1, -(-remaining // self.tick_ms))
+            if target is not None:
+                step = min(step, target - self.ticks)
+            model.advance(step * self.tick_ms)
+            self.ticks += step
+        if model.paused and target is not None:
+            self.ticks = target  # На паузе время идёт, но гравитации нет
+
+    def run(self, max_ticks: Optional[int] = None, max_pieces: Optional[int] = None,
+            stop_on_game_over: bool = True) -> Dict[str, Any]:
+        """
+        Прогнать игру до Game Over или до заданного предела.
+
+        Args:
+            max_ticks: Максимальное число логических тиков
+            max_pieces: Максимальное число зафиксированных фигур
+            stop_on_game_over: False - продолжать после Game Over (сценарий может начать новую игру)
+
+        Returns:
+            Итоги игры (см. result())
+        """
+        model = self.model
+        while not (model.game_over and stop_on_game_over):
+            if max_ticks is not None and self.ticks >= max_ticks:
+                break
+            if max_pieces is not None and model.pieces_placed >= max_pieces:
+                break
+            if self.policy is None and self.ticks not in self._script:
+                # До следующего события сценария ввода нет - промотаем гравитацию
+                target = self._script_ticks[0] if self._script_ticks else None
+                if max_ticks is not None:
+                    target = max_ticks if target is None else min(target, max_ticks)
+                if target is None and (model.paused or model.game_over):
+                    break  # Пауза или конец игры без дальнейшего ввода никогда не закончатся
+                if model.game_over:
+                    self.ticks = target  # После Game Over время идёт, но гравитации нет
+                    continue
+                self._skip_idle_ticks(target, max_pieces)
+                continue
+            self.tick()
+        return self.result()
+
+    def result(self) -> Dict[str, Any]:
+        """Итоги игры в тех же полях, что записывает Leaderboard.add_score"""
+        model = self.model
+        return {
+            'player_name': model.player_name,
+            'score': model.score,
+            'level': model.level,
+            'lines': model.lines_cleared,
+            'piece_size': model.piece_size,
+            'field_size': f"{model.width}x{model.height}",
+            'session_id': model.session_id,
+            'ticks': self.ticks,
+            'pieces': model.pieces_placed,
+            'game_over': model.game_over,
+        }
+
+
+class RandomPolicy:
+    """Случайные нажатия: одно действие раз в несколько тиков"""
+
+    def __init__(self, seed: Optional[int] = None, interval: int = 5):
+        self.rng = random.Random(seed)
+        self.interval = interval
+
+    def __call__(self, game: HeadlessGame) -> Iterable[str]:
+        if game.ticks % self.interval:
+            return ()
+        return (self.rng.choice(('left', 'right', 'rotate', 'soft_drop', 'hard_drop')),)
+
+
+def hard_drop_policy(game: HeadlessGame) -> Iterable[str]:
+    """Сразу бросать каждую фигуру вниз"""
+    return ('hard_drop',)
+
+
+# Встроенные политики по имени (для командной строки)
+POLICIES: Dict[str, Callable[[Optional[int]], Policy]] = {
+    'random': lambda seed: RandomPolicy(seed),
+    'hard_drop': lambda seed: hard_drop_policy,
+    'heuristic': lambda seed: HeuristicBot(),
+    'lookahead': lambda seed: HeuristicBot(lookahead=True),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Безоконная симуляция Тетриса")
+    parser.add_argument('--width', type=int, default=10)
+    parser.add_argument('--height', type=int, default=20)
+    parser.add_argument('--piece-size', type=int, default=4, choices=[4, 5, 6, 7])
+    parser.add_argument('--policy', default='random', choices=sorted(POLICIES))
+    parser.add_argument('--games', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-pieces', type=int, default=None)
+    args = parser.parse_args()
+
+    for i in range(args.games):
+        seed = args.seed + i
+        game = HeadlessGame(args.width, args.height, args.piece_size,
+                            seed=seed, inputs=POLICIES[args.policy](seed))
+        result = game.run(max_pieces=args.max_pieces)
+        print(f"seed={seed} score={result['score']} lines={result['lines']} "
+              f"level={result['level']} pieces={result['pieces']} ticks={result['ticks']}")
+
+
+if __name__ == "__main__":
+    main()
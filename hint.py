@@ -0,0 +1,65 @@
+"""
+Подсказка лучшего положения фигуры, которая ищется в фоновом потоке.
+
+Игровой цикл отдаёт снимок поля и фигуры с номером версии и сразу
+продолжает работу; поток считает лучшее положение ботом (bot.HeuristicBot).
+Ожидает всегда только последний снимок, а результат принимается, только
+если его версия совпадает с текущей: если фигура успела сдвинуться
+или зафиксироваться, устаревшая подсказка выбрасывается.
+"""
+import threading
+from typing import Optional, Tuple
+from bot import Board, HeuristicBot
+
+# Версия снимка, поворот, x и строка фигуры в лучшем положении
+Hint = Tuple[int, int, int, int]
+
+
+class HintWorker:
+    """Фоновый поиск подсказки по последнему снимку"""
+
+    def __init__(self, bot: Optional[HeuristicBot] = None):
+        self.bot = bot or HeuristicBot()  # Используется только потоком подсказки
+        self._request: Optional[tuple] = None
+        self._result: Optional[Hint] = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._worker, name="hint-search", daemon=True)
+        self._thread.start()
+
+    def submit(self, version: int, model):
+        """Поставить снимок модели в очередь вместо ещё не обработанного (не блокирует)"""
+        piece = model.current_piece
+        snapshot = (version, model.rows, model.width, model.height, model.piece_size,
+                    piece.states, piece.rotation, piece.x, piece.y)
+        with self._condition:
+            self._request = snapshot
+            self._condition.notify()
+
+    def result(self, version: int) -> Optional[Hint]:
+        """Подсказка для снимка version или None, если она ещё не готова или устарела"""
+        result = self._result
+        return result if result is not None and result[0] == version else None
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout=1.0)
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while self._request is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                version, rows, width, height, piece_size, states, rotation, x, y = self._request
+                self._request = None
+            try:
+                self.bot.select_weights(width, height, piece_size)
+                best = self.bot.best_placement(Board(rows, width, height), states, rotation, x, y)
+            except Exception as e:
+                print(f"Ошибка поиска подсказки: {e}")
+                continue
+            self._result = (version, best[1], best[2], best[3])
@@ -1,13 +1,19 @@
 """
 Главный файл игры Тетрис
 """
+from startup import StartupTimer
+
+timer = StartupTimer.from_args()
+
 import pygame
+timer.mark("import pygame")
 from menu import Menu
+timer.mark("import menu")
 
 def main():
     """Основная функция запуска"""
     try:
-        menu = Menu()
+        menu = Menu(timer=timer)
         menu.run()
     except Exception as e:
         print(f"Ошибка запуска: {e}")
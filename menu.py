@@ -1,19 +1,38 @@
+import importlib
 import pygame
 import pygame_gui
 import sys
-from utils import load_logo, load_music, load_sound
+from concurrent.futures import ThreadPoolExecutor
+from startup import StartupTimer
+from display import DisplayContext
+from utils import ConfigManager, Leaderboard, SaveManager, SoundManager, load_music, load_sound
 
 class Menu:
-    """Основной класс меню на pygame-gui"""
-    def __init__(self, screen_width=800, screen_height=600):
-        pygame.init()
-        pygame.mixer.init()
-        self.screen_width = 800
-        self.screen_height = 600
-        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
-        pygame.display.set_caption("Тетрис - Меню")
-        self.clock = pygame.time.Clock()
-        self.manager = pygame_gui.UIManager((self.screen_width, self.screen_height))
+    """
+    Основной класс меню на pygame-gui
+
+    Для первого кадра нужны только окно, UIManager и конфиг. Логотип,
+    лидерборд, индекс сохранений и модули игры загружаются в фоновом
+    потоке; обращение к ним до окончания загрузки просто её дожидается.
+
+    Окно и UIManager общие с игрой (DisplayContext). Каждый экран меню
+    живёт в своём UIContainer; неизменные экраны (STATIC_SCREENS) при
+    уходе только скрываются и при возврате показываются без пересоздания.
+    """
+    STATIC_SCREENS = ('main', 'new_game')
+
+    def __init__(self, screen_width=800, screen_height=600, timer: StartupTimer = None,
+                 display: DisplayContext = None):
+        self.timer = timer or StartupTimer()
+        SoundManager.get().init_mixer()
+        self.display = display or DisplayContext.get()
+        self.display.set_caption("Тетрис - Меню")
+        self.screen_width = self.display.width
+        self.screen_height = self.display.height
+        self.screen = self.display.screen
+        self.clock = self.display.clock
+        self.manager = self.display.ui_manager
+        self.timer.mark("window + UIManager")
         
         self.current_screen = "main"
         self.selected_piece_size = 4
@@ -21,43 +40,112 @@ class Menu:
         self.selected_field_height = 20
         self.player_name = "Игрок"
         
-        # Загрузка утилит
-        from utils import SaveManager, Leaderboard, ConfigManager
-        self.save_manager = SaveManager()
-        self.leaderboard = Leaderboard()
+        # Загрузка утилит: конфиг сразу, остальное - в фоне
         self.config = ConfigManager()
+        self._preloader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="menu-preload")
+        self._logo = self._preload("logo", self.display.load_logo)
+        self._leaderboard = self._preload("leaderboard", Leaderboard)
+        self._save_manager = self._preload("save index", SaveManager)
+        self._game_module = self._preload("game modules", importlib.import_module, "game")
         
         # Load menu sounds
         self.menu_select_sound = load_sound("menu_select.ogg", config=self.config)
         self.menu_hover_sound = load_sound("menu_hower.wav", config=self.config)
         
-        # UI элементы
+        # UI элементы текущего экрана
         self.buttons = {}
         self.text_inputs = {}
         self.labels = {}
         self.panels = {}
-        
-        # Load logo
-        self.logo = load_logo(max_width=250)
+        self._screens = {}  # имя экрана -> его контейнер и элементы
+        self.screen_container = None
         
         # Load menu music
         load_music("menu_music.mp3", volume=0.6, config=self.config)
         
         self.create_main_menu()
+        self.timer.mark("menu built")
     
-    def clear_ui(self):
-        """Очистка всех UI элементов"""
-        self.manager.clear_and_reset()
-        self.buttons = {}
-        self.text_inputs = {}
-        self.labels = {}
-        self.panels = {}
-        self.save_infos = []  # Очищаем информацию о сохранениях
+    def _preload(self, stage, func, *args, **kwargs):
+        """Поставить загрузку в фоновую очередь, с отметкой времени по окончании"""
+        def load():
+            result = func(*args, **kwargs)
+            self.timer.mark(f"preload: {stage}")
+            return result
+        return self._preloader.submit(load)
+
+    @property
+    def save_manager(self) -> SaveManager:
+        return self._save_manager.result()
+
+    @property
+    def leaderboard(self) -> Leaderboard:
+        return self._leaderboard.result()
+
+    @property
+    def logo(self):
+        """Логотип, если уже загружен (до этого меню рисуется без него)"""
+        return self._logo.result() if self._logo.done() else None
+
+    def preload_done(self) -> bool:
+        return all(f.done() for f in (self._logo, self._leaderboard, self._save_manager, self._game_module))
+
+    def hide_ui(self):
+        """Скрыть текущий экран (UIManager общий с игрой, меню не должно в ней рисоваться)"""
+        screen = self._screens.get(self.current_screen)
+        if screen is None:
+            return
+        self.manager.set_focus_set(None)  # Поле ввода имени не должно ловить клавиши в игре
+        if self.current_screen in self.STATIC_SCREENS:
+            screen['container'].hide()
+        else:
+            # Экраны с данными (сохранения, рекорды) строятся заново при каждом показе
+            screen['container'].kill()
+            del self._screens[self.current_screen]
+
+    def _switch_screen(self, name: str) -> bool:
+        """
+        Скрыть текущий экран и сделать name текущим.
+
+        Returns:
+            True, если экран взят из кэша и строить его не нужно
+        """
+        self.hide_ui()
+        self.current_screen = name
+        screen = self._screens.get(name)
+        cached = screen is not None
+        if cached:
+            screen['container'].show()
+        else:
+            container = pygame_gui.core.UIContainer(
+                relative_rect=pygame.Rect((0, 0), (self.screen_width, self.screen_height)),
+                manager=self.manager
+            )
+            screen = self._screens[name] = {
+                'container': container, 'buttons': {}, 'labels': {}, 'text_inputs': {}, 'panels': {}
+            }
+        self.screen_container = screen['container']
+        self.buttons = screen['buttons']
+        self.labels = screen['labels']
+        self.text_inputs = screen['text_inputs']
+        self.panels = screen['panels']
+        return cached
+
+    def _update_selection(self, prefix: str):
+        """Подсветить кнопки выбранного размера фигур и поля"""
+        selected = (f'{prefix}piece_{self.selected_piece_size}',
+                    f'{prefix}field_{self.selected_field_width}x{self.selected_field_height}')
+        for name, button in self.buttons.items():
+            if name.startswith((f'{prefix}piece_', f'{prefix}field_')):
+                if name in selected:
+                    button.select()
+                else:
+                    button.unselect()
     
     def create_main_menu(self):
         """Создание главного меню"""
-        self.clear_ui()
-        self.current_screen = "main"
+        if self._switch_screen("main"):
+            return
         
         # Заголовок - сейчас отрисовывается вручную как логотип
         # self.labels['title'] = pygame_gui.elements.UILabel(
@@ -75,37 +163,44 @@ class Menu:
         self.buttons['new_game'] = pygame_gui.elements.UIButton(
             relative_rect=pygame.Rect((start_x, 250), (button_width, button_height)),
             text='Новая игра',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         
         self.buttons['load_game'] = pygame_gui.elements.UIButton(
             relative_rect=pygame.Rect((start_x, 330), (button_width, button_height)),
             text='Загрузить игру',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         
         self.buttons['leaders'] = pygame_gui.elements.UIButton(
             relative_rect=pygame.Rect((start_x, 410), (button_width, button_height)),
             text='Таблица рекордов',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         
         self.buttons['quit'] = pygame_gui.elements.UIButton(
             relative_rect=pygame.Rect((start_x, 490), (button_width, button_height)),
             text='Выход',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
     
     def create_new_game_menu(self):
         """Создание меню новой игры"""
-        self.clear_ui()
-        self.current_screen = "new_game"
+        if self._switch_screen("new_game"):
+            self.text_inputs['player_name'].set_text(self.player_name)
+            self._update_selection('')
+            return
         
         # Заголовок - ЯРКИЙ ЖЕЛТЫЙ ЦВЕТ
         self.labels['title'] = pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((0, 20), (self.screen_width, 60)),
             text='НОВАЯ ИГРА',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         self.labels['title'].text_color = (255, 255, 0)
         
@@ -113,13 +208,15 @@ class Menu:
         self.labels['name'] = pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((50, 100), (200, 30)),
             text='Имя игрока:',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         self.labels['name'].text_color = (200, 200, 200)
         
         self.text_inputs['player_name'] = pygame_gui.elements.UITextEntryLine(
             relative_rect=pygame.Rect((250, 100), (400, 40)),
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         self.text_inputs['player_name'].set_text(self.player_name)
         
@@ -127,7 +224,8 @@ class Menu:
         self.labels['piece_size'] = pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((50, 160), (200, 30)),
             text='Размер фигур:',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         self.labels['piece_size'].text_color = (200, 200, 200)
         
@@ -139,7 +237,8 @@ class Menu:
             self.buttons[f'piece_{size}'] = pygame_gui.elements.UIButton(
                 relative_rect=pygame.Rect((start_x + i * 90, 160), (button_width, button_height)),
                 text=str(size),
-                manager=self.manager
+                manager=self.manager,
+                container=self.screen_container
             )
             if size == self.selected_piece_size:
                 self.buttons[f'piece_{size}'].select()
@@ -148,7 +247,8 @@ class Menu:
         self.labels['field_size'] = pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((50, 220), (200, 30)),
             text='Размер поля:',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         self.labels['field_size'].text_color = (200, 200, 200)
         
@@ -158,7 +258,8 @@ class Menu:
             self.buttons[f'field_{w}x{h}'] = pygame_gui.elements.UIButton(
                 relative_rect=pygame.Rect((start_x + i * 150, 220), (140, button_height)),
                 text=f'{w}x{h}',
-                manager=self.manager
+                manager=self.manager,
+                container=self.screen_container
             )
             if w == self.selected_field_width and h == self.selected_field_height:
                 self.buttons[f'field_{w}x{h}'].select()
@@ -167,25 +268,27 @@ class Menu:
         self.buttons['start'] = pygame_gui.elements.UIButton(
             relative_rect=pygame.Rect((150, 480), (200, 60)),
             text='Начать игру',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         
         self.buttons['back'] = pygame_gui.elements.UIButton(
             relative_rect=pygame.Rect((450, 480), (200, 60)),
             text='Назад',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
 
     def create_load_game_menu(self):
         """Создание меню загрузки игры"""
-        self.clear_ui()
-        self.current_screen = "load_game"
+        self._switch_screen("load_game")
         
         # Заголовок
         self.labels['title'] = pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((0, 20), (self.screen_width, 60)),
             text='ЗАГРУЗИТЬ ИГРУ',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         self.labels['title'].text_color = (255, 255, 0)
         
@@ -196,14 +299,16 @@ class Menu:
             self.labels['no_saves'] = pygame_gui.elements.UILabel(
                 relative_rect=pygame.Rect((0, 250), (self.screen_width, 50)),
                 text='Сохранения не найдены',
-                manager=self.manager
+                manager=self.manager,
+                container=self.screen_container
             )
             self.labels['no_saves'].text_color = (200, 100, 100)
         else:
             # Создаем прокручиваемый список сохранений
             self.panels['saves_panel'] = pygame_gui.elements.UIScrollingContainer(
                 relative_rect=pygame.Rect((30, 100), (740, 350)),
-                manager=self.manager
+                manager=self.manager,
+                container=self.screen_container
             )
             
             for i, save in enumerate(self.saves):
@@ -232,19 +337,20 @@ class Menu:
         self.buttons['back'] = pygame_gui.elements.UIButton(
             relative_rect=pygame.Rect((300, 480), (200, 60)),
             text='Назад',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
     
     def create_leaders_menu(self):
         """Создание меню таблицы рекордов с фильтрацией"""
-        self.clear_ui()
-        self.current_screen = "leaders"
+        self._switch_screen("leaders")
         
         # Заголовок
         self.labels['title'] = pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((0, 15), (self.screen_width, 50)),
             text=f'ТАБЛИЦА РЕКОРДОВ',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         self.labels['title'].text_color = (255, 255, 0)
         
@@ -252,7 +358,8 @@ class Menu:
         self.labels['filter_piece'] = pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((50, 75), (140, 25)),
             text='Фигуры:',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         self.labels['filter_piece'].text_color = (200, 200, 200)
         
@@ -260,7 +367,8 @@ class Menu:
             self.buttons[f'leaders_piece_{size}'] = pygame_gui.elements.UIButton(
                 relative_rect=pygame.Rect((190 + i * 90, 70), (80, 40)),
                 text=str(size),
-                manager=self.manager
+                manager=self.manager,
+                container=self.screen_container
             )
             if size == self.selected_piece_size:
                 self.buttons[f'leaders_piece_{size}'].select()
@@ -269,7 +377,8 @@ class Menu:
         self.labels['filter_field'] = pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((50, 120), (140, 25)),
             text='Поле:',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
         self.labels['filter_field'].text_color = (200, 200, 200)
         
@@ -277,7 +386,8 @@ class Menu:
             self.buttons[f'leaders_field_{w}x{h}'] = pygame_gui.elements.UIButton(
                 relative_rect=pygame.Rect((190 + i * 150, 120), (140, 40)),
                 text=f'{w}x{h}',
-                manager=self.manager
+                manager=self.manager,
+                container=self.screen_container
             )
             if w == self.selected_field_width and h == self.selected_field_height:
                 self.buttons[f'leaders_field_{w}x{h}'].select()
@@ -293,14 +403,16 @@ class Menu:
             self.labels['no_leaders'] = pygame_gui.elements.UILabel(
                 relative_rect=pygame.Rect((0, 250), (self.screen_width, 50)),
                 text='Нет рекордов для выбранных параметров',
-                manager=self.manager
+                manager=self.manager,
+                container=self.screen_container
             )
             self.labels['no_leaders'].text_color = (200, 100, 100)
         else:
             # Прокручиваемый контейнер
             self.panels['leaders_panel'] = pygame_gui.elements.UIScrollingContainer(
                 relative_rect=pygame.Rect((30, 175), (740, 270)),
-                manager=self.manager
+                manager=self.manager,
+                container=self.screen_container
             )
             
             # Заголовки (больший шрифт)
@@ -314,7 +426,7 @@ class Menu:
                     container=self.panels['leaders_panel']
                 )
                 h_label.text_color = (255, 200, 0)
-                h_label.text_font = pygame.font.Font(None, 24)
+                h_label.text_font = self.display.font(24)
             
             # Рекорды (больший размер строк)
             for idx, entry in enumerate(self.current_leaders[:20]):
@@ -325,7 +437,7 @@ class Menu:
                     manager=self.manager,
                     container=self.panels['leaders_panel']
                 )
-                label1.text_font = pygame.font.Font(None, 22)
+                label1.text_font = self.display.font(22)
                 
                 label2 = pygame_gui.elements.UILabel(
                     relative_rect=pygame.Rect((150, y), (130, 30)),
@@ -333,7 +445,7 @@ class Menu:
                     manager=self.manager,
                     container=self.panels['leaders_panel']
                 )
-                label2.text_font = pygame.font.Font(None, 22)
+                label2.text_font = self.display.font(22)
                 
                 label3 = pygame_gui.elements.UILabel(
                     relative_rect=pygame.Rect((280, y), (130, 30)),
@@ -341,7 +453,7 @@ class Menu:
                     manager=self.manager,
                     container=self.panels['leaders_panel']
                 )
-                label3.text_font = pygame.font.Font(None, 22)
+                label3.text_font = self.display.font(22)
                 
                 label4 = pygame_gui.elements.UILabel(
                     relative_rect=pygame.Rect((410, y), (130, 30)),
@@ -349,7 +461,7 @@ class Menu:
                     manager=self.manager,
                     container=self.panels['leaders_panel']
                 )
-                label4.text_font = pygame.font.Font(None, 22)
+                label4.text_font = self.display.font(22)
                 pygame_gui.elements.UILabel(
                     relative_rect=pygame.Rect((540, y), (130, 25)),
                     text=str(entry.get('lines', 0)),
@@ -360,7 +472,8 @@ class Menu:
         self.buttons['back'] = pygame_gui.elements.UIButton(
             relative_rect=pygame.Rect((300, 480), (200, 60)),
             text='Назад',
-            manager=self.manager
+            manager=self.manager,
+            container=self.screen_container
         )
     
     def handle_events(self):
@@ -436,7 +549,7 @@ class Menu:
     
     def start_new_game(self):
         """Запуск новой игры"""
-        from game import TetrisGame
+        TetrisGame = self._game_module.result().TetrisGame
         
         if 'player_name' in self.text_inputs:
             self.player_name = self.text_inputs['player_name'].get_text() or "Игрок"
@@ -448,16 +561,16 @@ class Menu:
             self.player_name,
             self.save_manager,
             self.leaderboard,
-            self.config
+            self.config,
+            display=self.display
         )
+        self.hide_ui()
         game.run()
-        # После завершения игры возвращаемся в меню
-        self.reload_menu_music()
-        self.create_main_menu()
+        self.return_from_game()
     
     def load_selected_game(self, save_info):
         """Загрузка выбранной игры"""
-        from game import TetrisGame
+        TetrisGame = self._game_module.result().TetrisGame
         
         save_data = self.save_manager.load_game(save_info['filename'])
         if save_data:
@@ -469,12 +582,12 @@ class Menu:
                 self.save_manager,
                 self.leaderboard,
                 self.config,
-                save_data
+                save_data,
+                display=self.display
             )
+            self.hide_ui()
             game.run()
-            # После завершения игры возвращаемся в меню
-            self.reload_menu_music()
-            self.create_main_menu()
+            self.return_from_game()
 
     def delete_save(self, save_info):
         """Удаление сохраненной игры"""
@@ -501,6 +614,12 @@ class Menu:
         self.manager.draw_ui(self.screen)
         pygame.display.flip()
     
+    def return_from_game(self):
+        """После завершения игры возвращаемся в меню (окно то же, экран из кэша)"""
+        self.display.set_caption("Тетрис - Меню")
+        self.reload_menu_music()
+        self.create_main_menu()
+
     def reload_menu_music(self):
         """Перезагрузить музыку меню после возврата из игры"""
         load_music("menu_music.mp3", volume=0.6, config=self.config)
@@ -508,6 +627,7 @@ class Menu:
     def run(self):
         """Запуск главного цикла меню"""
         running = True
+        first_frame = True
         
         while running:
             time_delta = self.clock.tick(60) / 1000.0
@@ -515,6 +635,15 @@ class Menu:
             running = self.handle_events()
             self.update(time_delta)
             self.draw()
-        
+            if first_frame:
+                self.timer.mark("first frame")
+                first_frame = False
+            # В режиме замера запуска выходим, как только всё загружено
+            if self.timer.enabled and self.preload_done():
+                self.timer.mark("preload complete")
+                self.timer.report()
+                running = False
+        
+        self._preloader.shutdown(wait=True)
         pygame.quit()
         sys.exit()
\ No newline at end of file
@@ -1,12 +1,14 @@
 # model.py
 import copy
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from tetromino_factory import TetrominoFactory, Tetromino
-from resources.game_resources import COLORS
+
+TICK_MS = 10  # Длительность логического тика симуляции, мс
 
 
 class GameModel:
-    def __init__(self, width: int, height: int, piece_size: int, player_name: str = "Игрок", session_id: str = None):
+    def __init__(self, width: int, height: int, piece_size: int, player_name: str = "Игрок", session_id: str = None,
+                 seed: Optional[int] = None):
         self.width = width
         self.height = height
         self.piece_size = piece_size
@@ -19,14 +21,29 @@ class GameModel:
             import uuid
             self.session_id = str(uuid.uuid4())
 
+        # Цветовая плоскость поля (только для отрисовки и сохранений)
         self.field: List[List[Optional[tuple]]] = [[0] * width for _ in range(height)]
-        self.factory = TetrominoFactory(piece_size)
+        # Битовое поле: строка - целое число, бит x = занятая клетка в столбце x
+        self._full_row_mask = (1 << width) - 1
+        self._rows: List[int] = [0] * height
+        # Карта высот: для каждого столбца строка самой верхней занятой клетки (height - пусто)
+        self._tops: List[int] = [height] * width
+        # Число занятых клеток в каждой строке и число дыр (пустых клеток под занятыми)
+        self._row_counts: List[int] = [0] * height
+        self._holes = 0
+        # Кэш тени: расстояние падения текущей фигуры и переиспользуемый объект тени
+        self._ghost_distance: Optional[int] = None
+        self._ghost_key: Optional[Tuple[int, int, int, int]] = None  # Для какого положения фигуры посчитано
+        self._ghost: Optional[Tetromino] = None
+        self.factory = TetrominoFactory(piece_size, seed)
 
         self.current_piece: Optional[Tetromino] = None
         self.score = 0
         self.level = 1
         self.lines_cleared = 0
         self.speed = 500
+        self.gravity_time = 0  # Накопленное логическое время гравитации, мс
+        self.pieces_placed = 0
 
         self.paused = False
         self.game_over = False
@@ -35,51 +52,113 @@ class GameModel:
 
         self._spawn_piece()
 
+    def _rebuild_bitboard(self):
+        """Пересобрать битовое поле по цветовой плоскости self.field"""
+        self._full_row_mask = (1 << self.width) - 1
+        self._rows = []
+        for row in self.field:
+            mask = 0
+            for x, cell in enumerate(row):
+                if cell != 0:
+                    mask |= 1 << x
+            self._rows.append(mask)
+        self._row_counts = [row.bit_count() for row in self._rows]
+        self._rebuild_tops()
+
+    def _rebuild_tops(self):
+        """Пересчитать карту высот и число дыр по битовому полю (один проход сверху вниз)"""
+        tops = [self.height] * self.width
+        covered = 0  # Столбцы, в которых выше уже есть занятая клетка
+        holes = 0
+        for y, row in enumerate(self._rows):
+            if covered:
+                holes += (covered & ~row).bit_count()
+            new = row & ~covered
+            while new:
+                low = new & -new
+                tops[low.bit_length() - 1] = y
+                new ^= low
+            covered |= row
+        self._tops = tops
+        self._holes = holes
+        self._ghost_distance = None
+
+    @property
+    def rows(self) -> Tuple[int, ...]:
+        """Снимок битового поля: маски строк сверху вниз, бит x - столбец x"""
+        return tuple(self._rows)
+
+    @property
+    def column_heights(self) -> Tuple[int, ...]:
+        """Высота каждого столбца (0 - пустой); ведётся при фиксации фигур и очистке линий"""
+        return tuple(self.height - top for top in self._tops)
+
+    @property
+    def row_fill_counts(self) -> Tuple[int, ...]:
+        """Число занятых клеток в каждой строке сверху вниз"""
+        return tuple(self._row_counts)
+
+    @property
+    def holes(self) -> int:
+        """Число пустых клеток, над которыми в том же столбце есть занятая"""
+        return self._holes
+
     def _check_game_over(self):
         """
         Check if the game is over: if a new piece cannot spawn in the visible field
         or if any cell reaches the top boundary.
         """
-        if not self.current_piece:
+        piece = self.current_piece
+        if not piece:
             return
 
-        for i, row in enumerate(self.current_piece.shape):
-            for j, cell in enumerate(row):
-                if cell:
-                    x = self.current_piece.x + j
-                    y = self.current_piece.y + i
-                    # Check if the piece overlaps with existing blocks in the visible field
-                    if y >= 0 and (x < 0 or x >= self.width or (y < self.height and self.field[y][x] != 0)):
-                        self.game_over = True
-                        return
+        out_of_bounds = piece.x + piece.min_col < 0 or piece.x + piece.max_col >= self.width
+        for i, mask in piece.mask_rows:
+            y = piece.y + i
+            if y < 0:
+                continue
+            # Check if the piece overlaps with existing blocks in the visible field
+            if out_of_bounds or (y < self.height and self._rows[y] & self._shift_mask(mask, piece.x)):
+                self.game_over = True
+                return
 
         # Additional check: if any block in the top row is occupied
-        if any(self.field[0][x] != 0 for x in range(self.width)):
+        if self._rows[0]:
             self.game_over = True
 
     def _spawn_piece(self):
         self.current_piece = self.factory.create_random()
         self.current_piece.x = (self.width - self.current_piece.get_width()) // 2
         self.current_piece.y = -self.current_piece.get_width()  # Фигура появляется за пределом сверху
+        self._ghost_distance = None
         self._check_game_over()
 
     @property
     def next_piece(self) -> Tetromino:
         return self.factory.get_next_preview()
 
+    @staticmethod
+    def _shift_mask(mask: int, x: int) -> int:
+        """Сдвиг маски строки фигуры в координаты поля"""
+        return mask << x if x >= 0 else mask >> -x
+
     def _check_collision(self, piece=None, dx=0, dy=0):
         piece = piece or self.current_piece
         if not piece:
             return True
-        for i in range(len(piece.shape)):
-            for j in range(len(piece.shape[i])):
-                if piece.shape[i][j]:
-                    x = piece.x + j + dx
-                    y = piece.y + i + dy
-                    if x < 0 or x >= self.width or y >= self.height:
-                        return True
-                    if y >= 0 and self.field[y][x] != 0:
-                        return True
+        if not piece.mask_rows:
+            return False
+        x = piece.x + dx
+        if x + piece.min_col < 0 or x + piece.max_col >= self.width:
+            return True
+        y0 = piece.y + dy
+        rows = self._rows
+        for i, mask in piece.mask_rows:
+            y = y0 + i
+            if y >= self.height:
+                return True
+            if y >= 0 and rows[y] & (mask << x if x >= 0 else mask >> -x):
+                return True
         return False
 
     def move(self, dx: int, dy: int) -> bool:
@@ -94,37 +173,42 @@ class GameModel:
     def rotate_piece(self):
         if self.game_over or self.paused or not self.current_piece:
             return
-        old_shape = copy.deepcopy(self.current_piece.shape)
-        old_x = self.current_piece.x
-        
-        # Try to rotate
-        self.current_piece.shape = self.current_piece.get_rotated()
-        
-        # If collision, try wall kick (shift left/right)
-        if self._check_collision():
-            # Try shifting right
-            self.current_piece.x = old_x + 1
-            if not self._check_collision():
-                return  # Success with right shift
-            
-            # Try shifting left
-            self.current_piece.x = old_x - 1
-            if not self._check_collision():
-                return  # Success with left shift
-            
-            # Try shifting right 2 cells
-            self.current_piece.x = old_x + 2
-            if not self._check_collision():
-                return  # Success with right shift 2
-            
-            # Try shifting left 2 cells
-            self.current_piece.x = old_x - 2
+        piece = self.current_piece
+        old_rotation = piece.rotation
+        old_x = piece.x
+
+        # Поворот - смена индекса предвычисленного состояния
+        piece.set_rotation(piece.next_rotation())
+
+        # Пробуем сдвиги из таблицы перехода (на месте, затем wall kick вправо/влево)
+        for dx in piece.states[old_rotation].kicks:
+            piece.x = old_x + dx
             if not self._check_collision():
-                return  # Success with left shift 2
-            
-            # Rotation failed, revert
-            self.current_piece.shape = old_shape
-            self.current_piece.x = old_x
+                return
+
+        # Rotation failed, revert
+        piece.set_rotation(old_rotation)
+        piece.x = old_x
+
+    def advance(self, elapsed_ms: int) -> int:
+        """
+        Продвинуть гравитацию на elapsed_ms миллисекунд логического времени.
+
+        Не зависит от pygame.time, поэтому одинаково работает в окне
+        и в безоконной симуляции.
+
+        Returns:
+            Количество выполненных шагов падения
+        """
+        if self.game_over or self.paused:
+            return 0
+        self.gravity_time += elapsed_ms
+        steps = 0
+        while self.gravity_time >= self.speed and not self.game_over:
+            self.gravity_time -= self.speed
+            self.drop()
+            steps += 1
+        return steps
 
     def drop(self) -> bool:
         if self.move(0, 1):
@@ -134,21 +218,39 @@ class GameModel:
 
     def hard_drop(self) -> int:
         rows = 0
-        while self.move(0, 1):
-            rows += 1
+        if not (self.game_over or self.paused) and self.current_piece:
+            rows = self.ghost_distance()
+            self.current_piece.y += rows
         self._lock_piece()
         return rows
 
     def _lock_piece(self):
-        if not self.current_piece:
+        piece = self.current_piece
+        if not piece:
             return
-        for i in range(len(self.current_piece.shape)):
-            for j in range(len(self.current_piece.shape[i])):
-                if self.current_piece.shape[i][j]:
-                    x = self.current_piece.x + j
-                    y = self.current_piece.y + i
-                    if y >= 0:
-                        self.field[y][x] = self.current_piece.color
+        for i, mask in piece.mask_rows:
+            y = piece.y + i
+            if y < 0:
+                continue
+            self._rows[y] |= self._shift_mask(mask, piece.x)
+            self._row_counts[y] += mask.bit_count()
+            row = self.field[y]
+            tops = self._tops
+            j = 0
+            # Строки фигуры идут сверху вниз, поэтому первая клетка в столбце - верхняя
+            while mask:
+                if mask & 1:
+                    x = piece.x + j
+                    row[x] = piece.color
+                    if y < tops[x]:
+                        # Новая вершина столбца: пустые клетки до прежней вершины становятся дырами
+                        self._holes += tops[x] - y - 1
+                        tops[x] = y
+                    else:
+                        self._holes -= 1  # Клетка ниже вершины закрыла дыру
+                mask >>= 1
+                j += 1
+        self.pieces_placed += 1
         self._clear_lines()
         self._spawn_piece()
         # Проверяем game_over после спауна новой фигуры
@@ -156,11 +258,16 @@ class GameModel:
 
     def _clear_lines(self):
         lines = 0
-        new_field = [row for row in self.field if not all(c != 0 for c in row)]
-        lines = self.height - len(new_field)
-        while len(new_field) < self.height:
-            new_field.insert(0, [0] * self.width)
-        self.field = new_field
+        full = self._full_row_mask
+        if full in self._rows:
+            # Заполненная строка - это просто row == full, клетки не перебираем
+            keep = [y for y, row in enumerate(self._rows) if row != full]
+            lines = self.height - len(keep)
+            self._rows = [0] * lines + [self._rows[y] for y in keep]
+            self._row_counts = [0] * lines + [self._row_counts[y] for y in keep]
+            self.field = [[0] * self.width for _ in range(lines)] + [self.field[y] for y in keep]
+            # Строки над очищенными сдвигаются вниз - высоты и дыры пересчитываются одним проходом
+            self._rebuild_tops()
 
         self.lines_cleared_this_turn = lines  # Сохраняем количество очищенных линий
 
@@ -182,18 +289,58 @@ class GameModel:
             # Увеличение скорости с каждым уровнем
             self.speed = max(50, 500 - (self.level - 1) * 50)
 
+    def ghost_distance(self) -> int:
+        """
+        На сколько строк может упасть текущая фигура.
+
+        Считается по карте высот: для каждого столбца фигуры расстояние от её
+        нижней клетки до верхней занятой клетки поля. Результат кэшируется
+        вместе с положением фигуры (id, поворот, x, y) и считается заново, если
+        оно другое - как бы фигуру ни двигали - или если изменилось поле.
+        """
+        piece = self.current_piece
+        if not piece:
+            return 0
+        key = (id(piece), piece.rotation, piece.x, piece.y)
+        if self._ghost_distance is not None and key == self._ghost_key:
+            return self._ghost_distance
+        distance = self.height - piece.y  # Больше быть не может: ниже только дно
+        tops = self._tops
+        for j, bottom in piece.state.col_bottoms:
+            x = piece.x + j
+            low = piece.y + bottom
+            if not 0 <= x < self.width or low >= tops[x]:
+                # Фигура под навесом - карта высот не помогает, идём по битовому полю
+                distance = 0
+                while not self._check_collision(piece, 0, distance + 1):
+                    distance += 1
+                break
+            distance = min(distance, tops[x] - 1 - low)
+        self._ghost_distance = distance
+        self._ghost_key = key
+        return distance
+
     def get_ghost_position(self):
         if not self.current_piece:
             return None
-        ghost = copy.deepcopy(self.current_piece)
-        while not self._check_collision(ghost, 0, 1):
-            ghost.y += 1
+        piece = self.current_piece
+        distance = self.ghost_distance()
+        ghost = self._ghost
+        if ghost is None or ghost.states is not piece.states or ghost.color != piece.color:
+            ghost = self._ghost = piece.copy()
+        elif ghost.rotation != piece.rotation:
+            ghost.set_rotation(piece.rotation)
+        ghost.x = piece.x
+        ghost.y = piece.y + distance
         return ghost
 
     def reset_game(self):
         self.field = [[0] * self.width for _ in range(self.height)]
+        self._rebuild_bitboard()
         self.score = self.level = self.lines_cleared = 0
         self.speed = 500
+        self.gravity_time = 0
+        self.pieces_placed = 0
         self.game_over = self.paused = False
         self.factory.reset_generation()
         self._spawn_piece()
@@ -208,6 +355,9 @@ class GameModel:
             "current_piece_pos": (self.current_piece.x, self.current_piece.y) if self.current_piece else (0, 0),
             "current_shape": shape,
             "session_id": self.session_id,  # Сохраняем session_id
+            # Зерно и позиция генератора фигур - загруженная игра продолжит ту же последовательность
+            "seed": self.factory.seed,
+            "bag_position": self.factory.position,
         }
 
     def load_from_save(self, data):
@@ -216,25 +366,29 @@ class GameModel:
         self.piece_size = data["piece_size"]
         self.player_name = data["player_name"]
         self.field = copy.deepcopy(data["field"])
+        self._rebuild_bitboard()
         self.score = data["score"]
         self.level = data["level"]
         self.lines_cleared = data["lines_cleared"]
         self.session_id = data.get("session_id", self.session_id)  # Восстанавливаем session_id
 
         self.factory = TetrominoFactory(self.piece_size)
-        self.factory.reset_generation()
+        if data.get("seed") is not None:
+            self.factory.restore_state(data["seed"], data.get("bag_position", 0))
 
         ctype = data.get("current_piece_type")
         cpos = data.get("current_piece_pos", (0, 0))
         cshape = data.get("current_shape")
 
         if ctype and cshape:
-            color = COLORS.get(ctype, (255, 255, 255))
-            self.current_piece = Tetromino(ctype, self.piece_size, cshape, color)
+            self.current_piece = self.factory.create_tetromino(ctype)
+            self.current_piece.shape = cshape
             self.current_piece.x, self.current_piece.y = cpos
         else:
             self.current_piece = None
+        self._ghost_distance = None
 
         self.speed = max(50, 500 - (self.level - 1) * 50)
+        self.gravity_time = 0
         self.game_over = False
         self.paused = True  # ← ВАЖНО: загруженная игра на паузе
\ No newline at end of file
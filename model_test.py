@@ -0,0 +1,159 @@
+"""
+Проверки модели: битовое поле, карта высот и дыры, очистка линий
+и сохранение состояния.
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import unittest
+
+from bot import HeuristicBot, board_features
+from headless import HeadlessGame, RandomPolicy
+from model import GameModel
+
+BLOCK = (200, 200, 200)
+
+
+def fill_rows(model: GameModel, rows):
+    """Заполнить строки поля: {y: столбцы, которые остаются пустыми}"""
+    for y, gaps in rows.items():
+        model.field[y] = [0 if x in gaps else BLOCK for x in range(model.width)]
+    model._rebuild_bitboard()
+
+
+def expected_bitboard(model: GameModel):
+    """Битовое поле, высоты, заполненность строк и дыры, посчитанные заново по model.field"""
+    rows = [sum(1 << x for x, cell in enumerate(row) if cell) for row in model.field]
+    heights, holes = board_features(rows, model.width, model.height)
+    counts = [sum(1 for cell in row if cell) for row in model.field]
+    return rows, heights, counts, holes
+
+
+class GameModelTest(unittest.TestCase):
+    def assertBitboardConsistent(self, model: GameModel):
+        """Битовое поле и поддерживаемые счётчики совпадают с пересчётом по model.field"""
+        rows, heights, counts, holes = expected_bitboard(model)
+        self.assertEqual(list(model.rows), rows)
+        self.assertEqual(list(model.column_heights), heights)
+        self.assertEqual(list(model.row_fill_counts), counts)
+        self.assertEqual(model.holes, holes)
+
+    def test_bitboard_follows_field(self):
+        for seed, (width, height, piece_size) in enumerate(((10, 20, 4), (12, 24, 6), (15, 30, 7))):
+            game = HeadlessGame(width, height, piece_size, seed=seed, inputs=RandomPolicy(seed, interval=2))
+            model = game.model
+            while not model.game_over and model.pieces_placed < 120:
+                game.run(max_pieces=model.pieces_placed + 1)
+                self.assertBitboardConsistent(model)
+
+    def test_incremental_counters_match_recount(self):
+        for seed, (width, height, piece_size) in enumerate(((10, 20, 4), (12, 24, 6), (15, 30, 7))):
+            # Случайные нажатия дают навесы и задвигания под них, бот - очистку линий
+            for inputs in (RandomPolicy(seed, interval=2), HeuristicBot()):
+                game = HeadlessGame(width, height, piece_size, seed=seed, inputs=inputs)
+                model = game.model
+                while not model.game_over and model.pieces_placed < 120:
+                    game.run(max_pieces=model.pieces_placed + 1)
+                    self.assertBitboardConsistent(model)
+
+    def test_hole_under_overhang(self):
+        model = GameModel(10, 20, 4, seed=1)
+        fill_rows(model, {19: set(range(1, 10))})  # Один блок в столбце 0
+        piece = model.current_piece = model.factory.create_tetromino('I')
+        piece.x = -piece.min_col
+        piece.y = 17 - piece.state.max_row  # Горизонтальная палка над пустой строкой 18
+        model._lock_piece()
+        self.assertEqual(model.column_heights[:5], (3, 3, 3, 3, 0))
+        self.assertEqual(model.holes, 1 + 3 * 2)  # Столбец 0 - строка 18, столбцы 1-3 - строки 18 и 19
+        self.assertEqual(model.row_fill_counts[17:], (4, 0, 1))
+        self.assertBitboardConsistent(model)
+
+    def test_multi_line_clear(self):
+        model = GameModel(10, 20, 4, seed=1)
+        # Пять строк с пустым столбцом 0; в строке 17 есть ещё одна дыра, её палка не закроет
+        fill_rows(model, {19: {0}, 18: {0}, 17: {0, 5}, 16: {0}, 15: {0}})
+        model.current_piece = model.factory.create_tetromino('I')
+        piece_color = model.current_piece.color
+        model.current_piece.set_rotation(1)  # Вертикальная палка
+        model.current_piece.x = -model.current_piece.min_col
+        model.current_piece.y = 0
+        model.hard_drop()
+
+        self.assertEqual(model.lines_cleared, 3)
+        self.assertEqual(model.score, 300)
+        # Строка 17 с дырой в столбце 5 и строка 15 опустились на три строки
+        self.assertEqual([bool(cell) for cell in model.field[19]], [True] * 5 + [False] + [True] * 4)
+        self.assertEqual(model.field[19][0], piece_color)
+        self.assertEqual(model.field[18], [0] + [BLOCK] * 9)
+        self.assertFalse(any(model.field[17]))
+        self.assertBitboardConsistent(model)
+
+    def test_tetris_and_level_bonus(self):
+        model = GameModel(10, 20, 4, seed=1)
+        model.lines_cleared = 3
+        fill_rows(model, {y: {9} for y in range(16, 20)})
+        model.current_piece = model.factory.create_tetromino('I')
+        model.current_piece.set_rotation(1)
+        model.current_piece.x = 9 - model.current_piece.max_col
+        model.current_piece.y = 0
+        model.hard_drop()
+
+        self.assertEqual(model.lines_cleared, 7)
+        # 1200 за четыре линии на первом уровне и бонус за переход на второй
+        self.assertEqual(model.score, 1200 + 500)
+        self.assertEqual(model.level, 2)
+        self.assertEqual(model.speed, 450)
+        self.assertEqual(model.rows, (0,) * 20)
+        self.assertBitboardConsistent(model)
+
+    def test_ghost_follows_direct_position_change(self):
+        model = GameModel(10, 20, 4, seed=1)
+        fill_rows(model, {19: {9}})
+        piece = model.current_piece = model.factory.create_tetromino('O')
+        piece.x = -piece.min_col
+        piece.y = 0
+        first = model.ghost_distance()
+        # Фигуру двигают мимо move(): кэш не должен вернуть прежнее расстояние
+        piece.y += 5
+        self.assertEqual(model.ghost_distance(), first - 5)
+        model.hard_drop()
+        self.assertEqual(model.column_heights[:2], (3, 3))
+        self.assertBitboardConsistent(model)
+
+    def test_collision_with_walls_floor_and_blocks(self):
+        model = GameModel(10, 20, 4, seed=1)
+        fill_rows(model, {19: {0, 1}})
+        piece = model.current_piece = model.factory.create_tetromino('O')
+        piece.y = 10
+        piece.x = -piece.min_col
+        self.assertTrue(model._check_collision(dx=-1))
+        piece.x = model.width - 1 - piece.max_col
+        self.assertTrue(model._check_collision(dx=1))
+        piece.x = -piece.min_col
+        piece.y = model.height - 1 - piece.state.max_row
+        self.assertFalse(model._check_collision())  # Столбцы 0 и 1 внизу пустые
+        self.assertTrue(model._check_collision(dy=1))  # Ниже - пол
+        piece.x += 1
+        self.assertTrue(model._check_collision())  # Задевает столбец 2 заполненной строки
+
+    def test_save_data_round_trip(self):
+        game = HeadlessGame(10, 20, 5, seed=3, inputs=RandomPolicy(3, interval=3))
+        game.run(max_pieces=30)
+        model = game.model
+        data = model.get_save_data()
+
+        restored = GameModel(10, 20, 5)
+        restored.load_from_save(data)
+        self.assertEqual(restored.field, model.field)
+        self.assertEqual(restored.rows, model.rows)
+        self.assertEqual(restored.column_heights, model.column_heights)
+        self.assertEqual(restored.holes, model.holes)
+        self.assertEqual((restored.current_piece.shape_type, restored.current_piece.x, restored.current_piece.y),
+                         (model.current_piece.shape_type, model.current_piece.x, model.current_piece.y))
+        # Генератор продолжает ту же последовательность
+        self.assertEqual([restored.factory.create_random().shape_type for _ in range(14)],
+                         [model.factory.create_random().shape_type for _ in range(14)])
+
+
+if __name__ == "__main__":
+    unittest.main()
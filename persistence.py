@@ -0,0 +1,107 @@
+"""
+Фоновая запись сохранений и рекордов.
+
+Игровой цикл только ставит задачу в очередь и сразу продолжает работу,
+а диск и SQLite трогает отдельный поток. Повторные задачи с тем же
+ключом, ещё не дошедшие до записи, схлопываются в одну.
+"""
+import queue
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class PendingWrite:
+    """Квитанция о фоновой записи: done выставляется после попытки записи, ok - её результат"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+
+
+class PersistenceWriter:
+    """
+    Поток записи с ограниченной очередью.
+
+    submit никогда не блокирует: если очередь заполнена, задача отклоняется
+    (возвращается None). Задача с ключом, который уже ждёт в очереди,
+    заменяет ожидающую и получает её квитанцию.
+    """
+
+    def __init__(self, save_manager, leaderboard, maxsize: int = 64):
+        self.save_manager = save_manager
+        self.leaderboard = leaderboard
+        self._queue: "queue.Queue[Optional[Hashable]]" = queue.Queue(maxsize)
+        self._pending: Dict[Hashable, tuple] = {}  # ключ -> (функция, аргументы, квитанция)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._worker, name="persistence-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, key: Hashable, func: Callable[..., Any], *args,
+               merge: Optional[Callable[[tuple, tuple], tuple]] = None) -> Optional[PendingWrite]:
+        """
+        Поставить запись в очередь.
+
+        Args:
+            key: Ключ схлопывания - из нескольких ожидающих задач с одним ключом выполнится одна
+            func, args: Что и с какими аргументами вызвать в потоке записи
+            merge: Выбор аргументов при схлопывании (старые, новые) -> итоговые;
+                   по умолчанию побеждают новые
+
+        Returns:
+            Квитанция или None, если очередь заполнена
+        """
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                old_func, old_args, ticket = pending
+                self._pending[key] = (func, merge(old_args, args) if merge else args, ticket)
+                return ticket
+            ticket = PendingWrite()
+            try:
+                self._queue.put_nowait(key)
+            except queue.Full:
+                print("Очередь записи переполнена, запись пропущена")
+                return None
+            self._pending[key] = (func, args, ticket)
+            return ticket
+
+    def submit_save(self, game_data: Dict[str, Any], player_name: str) -> Optional[PendingWrite]:
+        """Сохранение игры; новое сохранение игрока заменяет ещё не записанное"""
+        return self.submit(('save', player_name), self.save_manager.save_game, game_data, player_name)
+
+    def submit_score(self, player_name: str, score: int, level: int, lines: int,
+                     piece_size: int, field_size: str, session_id: Optional[str] = None) -> Optional[PendingWrite]:
+        """Результат в лидерборд; из ожидающих результатов одной сессии остаётся лучший"""
+        key = ('score', session_id) if session_id else ('score', object())
+        return self.submit(key, self.leaderboard.add_score,
+                           player_name, score, level, lines, piece_size, field_size, session_id,
+                           merge=lambda old, new: new if new[1] >= old[1] else old)
+
+    def _worker(self):
+        while True:
+            key = self._queue.get()
+            try:
+                if key is None:
+                    return
+                with self._lock:
+                    func, args, ticket = self._pending.pop(key)
+                try:
+                    result = func(*args)
+                    ticket.ok = result is not False
+                except Exception as e:
+                    print(f"Ошибка фоновой записи: {e}")
+                ticket.done.set()
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Дождаться записи всего, что уже в очереди"""
+        self._queue.join()
+
+    def close(self):
+        """Записать оставшееся и остановить поток"""
+        if not self._thread.is_alive():
+            return
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
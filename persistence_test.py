@@ -0,0 +1,87 @@
+"""
+Проверки фонового потока записи: квитанции, схлопывание и переполнение очереди.
+"""
+import threading
+import unittest
+from unittest import mock
+
+from persistence import PersistenceWriter
+
+
+class FakeSaveManager:
+    def __init__(self, result=True):
+        self.saved = []
+        self.result = result
+
+    def save_game(self, game_data, player_name):
+        self.saved.append((player_name, game_data['score']))
+        return self.result
+
+
+class FakeLeaderboard:
+    def __init__(self):
+        self.scores = []
+
+    def add_score(self, player_name, score, level, lines, piece_size, field_size, session_id):
+        self.scores.append((session_id, score))
+
+
+class PersistenceWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.saves = FakeSaveManager()
+        self.leaderboard = FakeLeaderboard()
+        self.writer = PersistenceWriter(self.saves, self.leaderboard, maxsize=4)
+        self.addCleanup(self.writer.close)
+
+    def block_worker(self) -> threading.Event:
+        """Занять поток записи, пока не будет выставлено возвращённое событие"""
+        started, release = threading.Event(), threading.Event()
+
+        def wait():
+            started.set()
+            release.wait(5)
+
+        self.writer.submit(('block', id(release)), wait)
+        started.wait(5)
+        return release
+
+    def test_ticket_reports_result(self):
+        ticket = self.writer.submit_save({'score': 10}, "Аня")
+        self.assertTrue(ticket.done.wait(5))
+        self.assertTrue(ticket.ok)
+        self.saves.result = False
+        ticket = self.writer.submit_save({'score': 20}, "Аня")
+        ticket.done.wait(5)
+        self.assertFalse(ticket.ok)
+
+    def test_pending_writes_with_same_key_collapse(self):
+        release = self.block_worker()
+        first = self.writer.submit_save({'score': 1}, "Аня")
+        second = self.writer.submit_save({'score': 2}, "Аня")
+        self.writer.submit_score("Аня", 300, 2, 6, 4, "10x20", "s1")
+        self.writer.submit_score("Аня", 100, 1, 2, 4, "10x20", "s1")  # Хуже ожидающего - не заменяет
+        release.set()
+        self.writer.flush()
+
+        self.assertIs(first, second)
+        self.assertEqual(self.saves.saved, [("Аня", 2)])
+        self.assertEqual(self.leaderboard.scores, [("s1", 300)])
+
+    def test_full_queue_rejects_without_blocking(self):
+        release = self.block_worker()
+        with mock.patch('builtins.print'):
+            tickets = [self.writer.submit_score("Аня", i, 1, 0, 4, "10x20", f"s{i}") for i in range(4)]
+            rejected = self.writer.submit_score("Аня", 99, 1, 0, 4, "10x20", "s99")
+        self.assertTrue(all(tickets))
+        self.assertIsNone(rejected)
+
+        release.set()
+        self.writer.flush()
+        # После освобождения очереди отклонённый результат можно отправить снова
+        self.assertIsNotNone(self.writer.submit_score("Аня", 99, 1, 0, 4, "10x20", "s99"))
+        self.writer.close()
+        self.assertEqual([score for _, score in self.leaderboard.scores], [0, 1, 2, 3, 99])
+
+
+if __name__ == "__main__":
+    unittest.main()
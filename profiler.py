@@ -0,0 +1,163 @@
+"""
+Профилировщик времени кадра.
+
+Оборачивает методы конкретных объектов (контроллера, вида, UIManager)
+замером perf_counter. Если профилировщик не включён, ничего не
+оборачивается и игра работает без накладных расходов.
+"""
+import csv
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import pygame
+
+PERCENTILES = (50, 95, 99)
+_MISSING = object()
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Перцентиль по ближайшему рангу (values должен быть отсортирован)"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, math.ceil(p / 100 * len(values)) - 1))
+    return values[index]
+
+
+class FrameProfiler:
+    """
+    Замеры этапов кадра.
+
+    Время вызовов одного этапа за кадр суммируется (update вызывается
+    на каждом тике симуляции, то есть несколько раз за кадр).
+    Этапы вложены: render включает draw_board, draw_right_panel и т.д.
+    Кадры, в которых этап не вызывался (например, render пропущен),
+    в его статистику не входят.
+    """
+
+    def __init__(self, window: int = 300):
+        """
+        Args:
+            window: Сколько последних кадров учитывать в оверлее
+        """
+        self.stages: List[str] = ['frame']
+        self.rows: List[List[Optional[float]]] = []  # По строке на кадр: время этапа, мс, или None
+        self.window = window
+        self._recent: deque = deque(maxlen=window)
+        self._current: Dict[str, float] = {}
+        self._frame_start = 0.0
+        self._overlay: Optional[pygame.Surface] = None
+        self._overlay_frame = -1
+        # (объект, метод, собственный атрибут объекта до обёртки или _MISSING)
+        self._instrumented: List[Tuple[Any, str, Any]] = []
+
+    def instrument(self, owner: Any, attr: str, stage: Optional[str] = None):
+        """Заменить метод owner.attr на замеряющую обёртку (только у этого объекта)"""
+        stage = stage or attr
+        func = getattr(owner, attr)
+        totals = self._current
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                totals[stage] = totals.get(stage, 0.0) + (perf_counter() - start) * 1000
+
+        self._instrumented.append((owner, attr, vars(owner).get(attr, _MISSING)))
+        setattr(owner, attr, timed)
+        if stage not in self.stages:
+            self.stages.append(stage)
+
+    def restore(self):
+        """
+        Снять все обёртки.
+
+        Нужно для общих объектов (UIManager из DisplayContext переживает
+        игру): иначе замеры остались бы в меню, а каждая новая игра
+        добавляла бы ещё один слой обёрток.
+        """
+        for owner, attr, original in reversed(self._instrumented):
+            if original is _MISSING:
+                delattr(owner, attr)
+            else:
+                setattr(owner, attr, original)
+        self._instrumented.clear()
+
+    def begin_frame(self):
+        self._current.clear()
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Закрыть кадр: время кадра - работа без ожидания в clock.tick"""
+        current = self._current
+        current['frame'] = (time.perf_counter() - self._frame_start) * 1000
+        row = [current.get(stage) for stage in self.stages]
+        self.rows.append(row)
+        self._recent.append(row)
+
+    def summary(self, rows: Optional[List[List[Optional[float]]]] = None) -> Dict[str, Dict[str, float]]:
+        """p50/p95/p99, среднее и максимум по каждому этапу"""
+        rows = self.rows if rows is None else rows
+        result = {}
+        for index, stage in enumerate(self.stages):
+            values = sorted(row[index] for row in rows if index < len(row) and row[index] is not None)
+            stats = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+            stats['mean'] = sum(values) / len(values) if values else 0.0
+            stats['max'] = values[-1] if values else 0.0
+            stats['frames'] = len(values)
+            result[stage] = stats
+        return result
+
+    def draw_overlay(self, surface: pygame.Surface, font, pos=(5, 5)) -> pygame.Rect:
+        """
+        Таблица p50/p95/p99 по последним кадрам.
+
+        Текст пересобирается раз в 30 кадров; фон непрозрачный,
+        поэтому при частичной перерисовке экрана старый текст не остаётся.
+        """
+        if self._overlay is None or len(self.rows) - self._overlay_frame >= 30:
+            self._overlay_frame = len(self.rows)
+            stats = self.summary(list(self._recent))
+            rows = [['этап'] + [f"p{p}" for p in PERCENTILES]]
+            for stage in self.stages:
+                rows.append([stage] + [f"{stats[stage][f'p{p}']:.2f}" for p in PERCENTILES])
+            rendered = [[font.render(cell, True, (220, 220, 120)) for cell in row] for row in rows]
+            # Шрифт не моноширинный - раскладываем ячейки по столбцам вручную
+            widths = [max(row[i].get_width() for row in rendered) + 10 for i in range(len(rows[0]))]
+            line_height = font.get_linesize()
+            self._overlay = pygame.Surface((sum(widths) + 8, line_height * len(rows) + 8))
+            self._overlay.fill((10, 10, 15))
+            for r, row in enumerate(rendered):
+                x = 4
+                for i, cell in enumerate(row):
+                    # Названия этапов - влево, числа - вправо
+                    cx = x if i == 0 else x + widths[i] - 10 - cell.get_width()
+                    self._overlay.blit(cell, (cx, 4 + r * line_height))
+                    x += widths[i]
+        return surface.blit(self._overlay, pos)
+
+    def export(self, path_base: str) -> Optional[str]:
+        """
+        Записать покадровые замеры в CSV и сводку в JSON.
+
+        Args:
+            path_base: Путь без расширения
+
+        Returns:
+            Путь к JSON-сводке или None, если кадров не было
+        """
+        if not self.rows:
+            return None
+        os.makedirs(os.path.dirname(path_base) or '.', exist_ok=True)
+        with open(path_base + '.csv', 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.stages)
+            writer.writerows(['' if value is None else f"{value:.3f}" for value in row] for row in self.rows)
+        with open(path_base + '.json', 'w', encoding='utf-8') as f:
+            json.dump({'frames': len(self.rows), 'stages_ms': self.summary()}, f, ensure_ascii=False, indent=2)
+        return path_base + '.json'
@@ -0,0 +1,291 @@
+"""
+Запись и воспроизведение повторов.
+
+Повтор - начальное состояние игры (в формате save_format, вместе с зерном
+генератора фигур) и список действий игрока с номерами логических тиков.
+Модель детерминирована, поэтому по ним игра восстанавливается точно:
+безоконно на максимальной скорости или в окне с любым множителем скорости.
+
+Файл:
+
+    магия b'TTRP' | версия (uint16) | длина метаданных (uint32) | метаданные JSON
+    | длина состояния (uint32) | начальное состояние (save_format)
+    | длина событий (uint32) | события, сжатые zlib
+
+Событие - разность тиков с предыдущим событием (varint) и номер действия
+в headless.ACTIONS (один байт).
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import copy
+import io
+import json
+import struct
+import zlib
+from typing import Any, Dict, List, Tuple
+import save_format
+from headless import ACTIONS, HeadlessGame
+from model import GameModel, TICK_MS
+
+MAGIC = b'TTRP'
+VERSION = 1
+KEYFRAME_INTERVAL = 1000  # Тиков между ключевыми кадрами (10 с игрового времени)
+
+_HEADER = struct.Struct('<4sHI')
+_LENGTH = struct.Struct('<I')
+_ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+
+def _pack_events(events: List[Tuple[int, str]]) -> bytes:
+    out = bytearray()
+    last_tick = 0
+    for tick, action in events:
+        delta = tick - last_tick
+        last_tick = tick
+        while delta >= 0x80:
+            out.append(delta & 0x7F | 0x80)
+            delta >>= 7
+        out.append(delta)
+        out.append(_ACTION_CODES[action])
+    return zlib.compress(bytes(out), 9)
+
+
+def _unpack_events(data: bytes) -> List[Tuple[int, str]]:
+    raw = zlib.decompress(data)
+    events = []
+    tick = pos = 0
+    while pos < len(raw):
+        delta = shift = 0
+        while True:
+            byte = raw[pos]
+            pos += 1
+            delta |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        tick += delta
+        events.append((tick, ACTIONS[raw[pos]]))
+        pos += 1
+    return events
+
+
+class Replay:
+    """Содержимое файла повтора: метаданные, начальное состояние и события"""
+
+    def __init__(self, meta: Dict[str, Any], initial_state: Dict[str, Any],
+                 events: List[Tuple[int, str]]):
+        self.meta = meta
+        self.initial_state = initial_state
+        self.events = events
+
+    def dumps(self) -> bytes:
+        meta_bytes = json.dumps(self.meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        state_bytes = save_format.dumps(self.initial_state)
+        event_bytes = _pack_events(self.events)
+        return b''.join((
+            _HEADER.pack(MAGIC, VERSION, len(meta_bytes)), meta_bytes,
+            _LENGTH.pack(len(state_bytes)), state_bytes,
+            _LENGTH.pack(len(event_bytes)), event_bytes,
+        ))
+
+    @classmethod
+    def loads(cls, data: bytes) -> 'Replay':
+        magic, version, meta_len = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise save_format.SaveFormatError("Не файл повтора")
+        if version > VERSION:
+            raise save_format.SaveFormatError(f"Неизвестная версия повтора: {version}")
+        pos = _HEADER.size
+        meta = json.loads(data[pos:pos + meta_len].decode('utf-8'))
+        pos += meta_len
+        (state_len,) = _LENGTH.unpack_from(data, pos)
+        pos += _LENGTH.size
+        initial_state = save_format.load(io.BytesIO(data[pos:pos + state_len]))
+        pos += state_len
+        (events_len,) = _LENGTH.unpack_from(data, pos)
+        pos += _LENGTH.size
+        return cls(meta, initial_state, _unpack_events(data[pos:pos + events_len]))
+
+    def save(self, path: str) -> bool:
+        """Запись через временный файл"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.dumps())
+        os.replace(tmp_path, path)
+        return True
+
+    @classmethod
+    def load(cls, path: str) -> 'Replay':
+        with open(path, 'rb') as f:
+            return cls.loads(f.read())
+
+
+class ReplayRecorder:
+    """Запись действий игрока по логическим тикам GameController"""
+
+    def __init__(self, model: GameModel, tick_ms: int = TICK_MS):
+        initial_state = model.get_save_data()
+        # Этого нет в сохранении, но без этого воспроизведение разойдётся с игрой
+        initial_state['paused'] = model.paused
+        initial_state['gravity_time'] = model.gravity_time
+        self.replay = Replay({'tick_ms': tick_ms, 'session_id': model.session_id}, initial_state, [])
+
+    def record(self, tick: int, action: str):
+        self.replay.events.append((tick, action))
+
+    def finish(self, game_result: Dict[str, Any]) -> Replay:
+        """Дописать итог игры (для проверки при воспроизведении) и вернуть повтор"""
+        self.replay.meta['result'] = game_result
+        return self.replay
+
+
+class ReplayPlayer:
+    """
+    Воспроизведение повтора через HeadlessGame.
+
+    Во время прохода каждые keyframe_interval тиков запоминается копия игры,
+    поэтому перемотка назад начинается с ближайшего ключевого кадра,
+    а не с начала партии.
+    """
+
+    def __init__(self, replay: Replay, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.replay = replay
+        self.keyframe_interval = keyframe_interval
+        self.total_ticks = replay.meta.get('result', {}).get('ticks') or (
+            replay.events[-1][0] + 1 if replay.events else 0)
+        self.game = self._new_game()
+        self.keyframes: Dict[int, HeadlessGame] = {0: copy.deepcopy(self.game)}
+
+    def _new_game(self) -> HeadlessGame:
+        state = self.replay.initial_state
+        model = GameModel(state['width'], state['height'], state['piece_size'],
+                          state['player_name'], session_id=state.get('session_id'))
+        model.load_from_save(state)
+        model.paused = state.get('paused', False)
+        model.gravity_time = state.get('gravity_time', 0)
+        return HeadlessGame(model=model, tick_ms=self.replay.meta.get('tick_ms', TICK_MS),
+                            inputs=self.replay.events)
+
+    @property
+    def ticks(self) -> int:
+        return self.game.ticks
+
+    def advance_to(self, tick: int):
+        """Проиграть вперёд до тика tick, попутно запоминая ключевые кадры"""
+        game = self.game
+        tick = min(tick, self.total_ticks)
+        while game.ticks < tick:
+            keyframe = (game.ticks // self.keyframe_interval + 1) * self.keyframe_interval
+            game.run(max_ticks=min(tick, keyframe), stop_on_game_over=False)
+            if game.ticks == keyframe and keyframe not in self.keyframes:
+                self.keyframes[keyframe] = copy.deepcopy(game)
+
+    def seek(self, tick: int):
+        """Перейти к тику tick (вперёд или назад)"""
+        tick = max(0, min(tick, self.total_ticks))
+        start = max(t for t in self.keyframes if t <= tick)
+        if not start <= self.game.ticks <= tick:
+            self.game = copy.deepcopy(self.keyframes[start])
+        self.advance_to(tick)
+
+    def play(self) -> Dict[str, Any]:
+        """Проиграть до конца на максимальной скорости"""
+        self.advance_to(self.total_ticks)
+        return self.game.result()
+
+    def verify(self) -> bool:
+        """Совпал ли итог воспроизведения с записанным"""
+        expected = self.replay.meta.get('result')
+        if not expected:
+            return True
+        result = self.play()
+        return all(result[key] == expected[key] for key in ('score', 'level', 'lines', 'game_over'))
+
+
+def play_rendered(player: ReplayPlayer, speed: float = 1.0):
+    """
+    Воспроизведение в окне.
+
+    Пробел - пауза, стрелки влево/вправо - перемотка на 5 с,
+    вверх/вниз - скорость x2 / x0.5, Esc - выход.
+    """
+    import pygame
+    from utils import ConfigManager
+    from view import GameView
+
+    pygame.init()
+    model = player.game.model
+    view = GameView(model.width, model.height, ConfigManager())
+    seek_ticks = 5000 // player.game.tick_ms
+    accumulator = 0.0
+    paused = False
+    running = True
+    while running:
+        frame_ms = view.clock.tick(60)
+        for event in pygame.event.get():
+            view.process_events(event)
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    player.seek(player.ticks + seek_ticks)
+                elif event.key == pygame.K_LEFT:
+                    player.seek(player.ticks - seek_ticks)
+                elif event.key == pygame.K_UP:
+                    speed *= 2
+                elif event.key == pygame.K_DOWN:
+                    speed /= 2
+        if not paused:
+            accumulator += frame_ms * speed
+            steps = int(accumulator // player.game.tick_ms)
+            accumulator -= steps * player.game.tick_ms
+            player.advance_to(player.ticks + steps)
+
+        model = player.game.model
+        view.begin_frame()
+        view.draw_board(model.field, model.current_piece, model.get_ghost_position())
+        view.current_info = {
+            'player_name': model.player_name,
+            'score': model.score,
+            'level': model.level,
+            'lines': model.lines_cleared
+        }
+        view.draw_right_panel(model.next_piece)
+        if model.game_over:
+            view.draw_game_over(model.player_name, model.score)
+        elif model.paused:
+            view.draw_pause()
+        view.update_display()
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Воспроизведение повтора Тетриса")
+    parser.add_argument('replay', help="Файл .replay")
+    parser.add_argument('--render', action='store_true', help="Показать в окне")
+    parser.add_argument('--speed', type=float, default=1.0, help="Множитель скорости в окне")
+    parser.add_argument('--seek', type=int, default=0, help="Начать с тика")
+    args = parser.parse_args()
+
+    player = ReplayPlayer(Replay.load(args.replay))
+    player.seek(args.seek)
+    if args.render:
+        play_rendered(player, args.speed)
+        return
+    expected = player.replay.meta.get('result')
+    result = player.play()
+    print(f"score={result['score']} lines={result['lines']} level={result['level']} "
+          f"ticks={result['ticks']} game_over={result['game_over']}")
+    if expected:
+        print("Совпадает с записью" if player.verify() else f"Расхождение с записью: {expected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Проверки повторов: запись действий, файл повтора, проверка итога и перемотка.
+"""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from headless import HeadlessGame
+from replay import Replay, ReplayPlayer, ReplayRecorder
+
+
+class RecordingPolicy:
+    """Случайные нажатия с записью в ReplayRecorder, как это делает GameController"""
+
+    ACTIONS = ('left', 'right', 'rotate', 'soft_drop', 'soft_drop_release', 'hard_drop')
+
+    def __init__(self, recorder: ReplayRecorder, seed: int):
+        self.recorder = recorder
+        self.rng = random.Random(seed)
+
+    def __call__(self, game: HeadlessGame):
+        if game.ticks % 3:
+            return ()
+        if game.model.game_over:
+            action = 'new_game'
+        elif self.rng.random() < 0.002:
+            action = 'pause'
+        else:
+            action = self.rng.choice(self.ACTIONS)
+        self.recorder.record(game.ticks, action)
+        return (action,)
+
+
+def record_game(seed: int, ticks: int, piece_size: int = 4, warmup_pieces: int = 0) -> Replay:
+    game = HeadlessGame(10, 20, piece_size, seed=seed)
+    if warmup_pieces:
+        # Запись начинается с середины партии, как после загрузки сохранения
+        game.set_inputs(lambda g: ('hard_drop',) if g.ticks % 7 == 0 else ())
+        game.run(max_pieces=warmup_pieces)
+    # Предпросмотр не должен влиять на последовательность фигур после новой игры
+    game.model.factory.peek(20 + seed)
+    recorder = ReplayRecorder(game.model)
+    game.set_inputs(RecordingPolicy(recorder, seed))
+    start = game.ticks
+    game.run(max_ticks=start + ticks, stop_on_game_over=False)
+    result = game.result()
+    # Повтор считает тики с начала записи
+    result['ticks'] = game.ticks - start
+    recorder.replay.events = [(tick - start, action) for tick, action in recorder.replay.events]
+    return recorder.finish(result)
+
+
+class ReplayTest(unittest.TestCase):
+    def test_record_then_verify(self):
+        for seed, piece_size, warmup in ((1, 4, 0), (2, 5, 12), (3, 7, 5)):
+            with self.subTest(seed=seed, piece_size=piece_size):
+                replay = record_game(seed, 30000, piece_size, warmup)
+                self.assertTrue(ReplayPlayer(replay).verify())
+                self.assertIn('new_game', [action for _, action in replay.events])
+
+    def test_file_round_trip(self):
+        replay = record_game(4, 5000)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "game.replay")
+        self.assertTrue(replay.save(path))
+
+        loaded = Replay.load(path)
+        self.assertEqual(loaded.events, replay.events)
+        self.assertEqual(loaded.meta, replay.meta)
+        self.assertTrue(ReplayPlayer(loaded).verify())
+
+    def test_tampered_result_fails_verify(self):
+        replay = record_game(5, 5000)
+        replay.meta['result']['score'] += 1
+        self.assertFalse(ReplayPlayer(replay).verify())
+
+    def test_seek_matches_linear_playback(self):
+        replay = record_game(6, 12000)
+        linear = ReplayPlayer(replay, keyframe_interval=500)
+        states = {}
+        for tick in (0, 700, 2500, 6000, 9999):
+            linear.advance_to(tick)
+            states[tick] = (linear.game.model.rows, linear.game.model.score, linear.ticks)
+
+        seeking = ReplayPlayer(replay, keyframe_interval=500)
+        seeking.seek(9999)
+        for tick in (2500, 0, 6000, 700, 9999):
+            seeking.seek(tick)
+            model = seeking.game.model
+            self.assertEqual((model.rows, model.score, seeking.ticks), states[tick])
+
+
+if __name__ == "__main__":
+    unittest.main()
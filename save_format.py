@@ -0,0 +1,134 @@
+"""
+Двоичный формат файлов сохранений.
+
+Файл состоит из заголовка и двух блоков:
+
+    магия b'TTRS' | версия (uint16) | длина метаданных (uint32) | метаданные JSON (UTF-8)
+    | длина поля (uint32) | поле, сжатое zlib
+
+Метаданные - все поля GameModel.get_save_data() кроме самого поля и
+палитра цветов. Поле хранится по байту на клетку: 0 - пусто, k - цвет
+palette[k - 1]. Формат не использует pickle, поэтому чтение чужого файла
+не может выполнить код, а метаданные читаются без распаковки поля.
+"""
+import json
+import pickle
+import struct
+import zlib
+from typing import Any, BinaryIO, Dict, List
+
+MAGIC = b'TTRS'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHI')
+_LENGTH = struct.Struct('<I')
+
+
+class SaveFormatError(ValueError):
+    """Файл не является сохранением поддерживаемой версии"""
+
+
+def _pack_field(field: List[list]) -> tuple:
+    """Поле -> (палитра, байты клеток)"""
+    palette: List[tuple] = []
+    indices: Dict[tuple, int] = {}
+    cells = bytearray()
+    for row in field:
+        for cell in row:
+            if not cell:
+                cells.append(0)
+                continue
+            color = tuple(cell)
+            index = indices.get(color)
+            if index is None:
+                if len(palette) == 255:
+                    raise SaveFormatError("Слишком много разных цветов на поле")
+                palette.append(color)
+                index = indices[color] = len(palette)
+            cells.append(index)
+    return palette, bytes(cells)
+
+
+def _unpack_field(cells: bytes, palette: List[tuple], width: int, height: int) -> List[list]:
+    """Байты клеток -> поле из кортежей цветов (как в GameModel.field)"""
+    if len(cells) != width * height:
+        raise SaveFormatError("Размер поля не совпадает с метаданными")
+    colors = [0] + palette
+    return [[colors[cell] for cell in cells[y * width:(y + 1) * width]] for y in range(height)]
+
+
+def dumps(data: Dict[str, Any]) -> bytes:
+    """Сохранение (словарь из GameModel.get_save_data) -> байты файла"""
+    meta = {key: value for key, value in data.items() if key != 'field'}
+    palette, cells = _pack_field(data.get('field') or [])
+    meta['palette'] = palette
+    meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    field_bytes = zlib.compress(cells, 6)
+    return b''.join((
+        _HEADER.pack(MAGIC, VERSION, len(meta_bytes)), meta_bytes,
+        _LENGTH.pack(len(field_bytes)), field_bytes,
+    ))
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    chunk = f.read(size)
+    if len(chunk) != size:
+        raise SaveFormatError("Файл сохранения обрезан")
+    return chunk
+
+
+def _read_meta(f: BinaryIO) -> Dict[str, Any]:
+    magic, version, meta_len = _HEADER.unpack(_read_exact(f, _HEADER.size))
+    if magic != MAGIC:
+        raise SaveFormatError("Не двоичное сохранение")
+    if version > VERSION:
+        raise SaveFormatError(f"Неизвестная версия формата: {version}")
+    meta = json.loads(_read_exact(f, meta_len).decode('utf-8'))
+    # JSON не различает кортежи и списки - возвращаем типы, которые ждёт модель
+    meta['palette'] = [tuple(color) for color in meta.get('palette', [])]
+    if meta.get('current_piece_pos') is not None:
+        meta['current_piece_pos'] = tuple(meta['current_piece_pos'])
+    return meta
+
+
+def read_metadata(f: BinaryIO) -> Dict[str, Any]:
+    """Только метаданные, без распаковки поля (для индекса сохранений)"""
+    meta = _read_meta(f)
+    del meta['palette']
+    return meta
+
+
+def load(f: BinaryIO) -> Dict[str, Any]:
+    """Прочитать сохранение из открытого двоичного файла"""
+    data = _read_meta(f)
+    palette = data.pop('palette')
+    (field_len,) = _LENGTH.unpack(_read_exact(f, _LENGTH.size))
+    try:
+        cells = zlib.decompress(_read_exact(f, field_len))
+    except zlib.error as e:
+        raise SaveFormatError(f"Повреждённое поле: {e}")
+    data['field'] = _unpack_field(cells, palette, data.get('width', 10), data.get('height', 20))
+    return data
+
+
+def is_binary(f: BinaryIO) -> bool:
+    """Файл начинается с магии двоичного формата (позиция в файле не меняется)"""
+    position = f.tell()
+    head = f.read(len(MAGIC))
+    f.seek(position)
+    return head == MAGIC
+
+
+class _LegacyUnpickler(pickle.Unpickler):
+    """Старые сохранения - только словари, списки, кортежи, строки и числа"""
+
+    def find_class(self, module, name):
+        raise SaveFormatError(f"Недопустимый объект в старом сохранении: {module}.{name}")
+
+
+def load_legacy(f: BinaryIO) -> Dict[str, Any]:
+    """Прочитать старое pickle-сохранение, не создавая произвольных объектов"""
+    data = _LegacyUnpickler(f).load()
+    if not isinstance(data, dict):
+        raise SaveFormatError("Старое сохранение не является словарём")
+    return data
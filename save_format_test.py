@@ -0,0 +1,71 @@
+"""
+Проверки двоичного формата сохранений и чтения старых pickle-файлов.
+"""
+import io
+import os
+import pickle
+import unittest
+
+import save_format
+from headless import HeadlessGame, RandomPolicy
+
+
+def sample_save_data():
+    game = HeadlessGame(12, 24, 6, player_name="Тест", seed=4, inputs=RandomPolicy(4, interval=3))
+    game.run(max_pieces=40)
+    return game.model.get_save_data()
+
+
+class Pickled:
+    """Класс, которого не должно быть в старом сохранении"""
+
+    def __reduce__(self):
+        return (os.getcwd, ())
+
+
+class SaveFormatTest(unittest.TestCase):
+    def test_round_trip(self):
+        data = sample_save_data()
+        loaded = save_format.load(io.BytesIO(save_format.dumps(data)))
+        self.assertEqual(loaded, data)
+        # Модель сравнивает клетки с цветами-кортежами и позицию - кортеж
+        self.assertIsInstance(loaded['current_piece_pos'], tuple)
+        self.assertTrue(all(isinstance(cell, tuple) for row in loaded['field'] for cell in row if cell))
+
+    def test_metadata_without_field(self):
+        data = sample_save_data()
+        f = io.BytesIO(save_format.dumps(data))
+        self.assertTrue(save_format.is_binary(f))
+        self.assertEqual(f.tell(), 0)
+        meta = save_format.read_metadata(f)
+        self.assertNotIn('field', meta)
+        self.assertEqual({key: meta[key] for key in ('player_name', 'score', 'seed', 'bag_position')},
+                         {key: data[key] for key in ('player_name', 'score', 'seed', 'bag_position')})
+
+    def test_truncated_and_foreign_files(self):
+        raw = save_format.dumps(sample_save_data())
+        with self.assertRaises(save_format.SaveFormatError):
+            save_format.load(io.BytesIO(raw[:-10]))
+        with self.assertRaises(save_format.SaveFormatError):
+            save_format.load(io.BytesIO(b'NOPE' + raw[4:]))
+        future = bytearray(raw)
+        future[4:6] = (save_format.VERSION + 1).to_bytes(2, 'little')
+        with self.assertRaises(save_format.SaveFormatError):
+            save_format.load(io.BytesIO(bytes(future)))
+
+    def test_legacy_pickle(self):
+        data = sample_save_data()
+        f = io.BytesIO(pickle.dumps(data))
+        self.assertFalse(save_format.is_binary(f))
+        self.assertEqual(save_format.load_legacy(f), data)
+
+    def test_legacy_pickle_rejects_objects(self):
+        payload = pickle.dumps({'score': 1, 'field': Pickled()})
+        with self.assertRaises(save_format.SaveFormatError):
+            save_format.load_legacy(io.BytesIO(payload))
+        with self.assertRaises(save_format.SaveFormatError):
+            save_format.load_legacy(io.BytesIO(pickle.dumps([1, 2, 3])))
+
+
+if __name__ == "__main__":
+    unittest.main()
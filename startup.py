@@ -0,0 +1,44 @@
+"""
+Замер времени запуска.
+
+    python main.py --startup-timing
+    TETRIS_STARTUP_TIMING=1 python main.py
+
+Отсчёт идёт от импорта этого модуля (первая строка main.py), время
+запуска самого интерпретатора не входит. В режиме замера меню
+закрывается, как только фоновая предзагрузка закончена, и печатает
+таблицу этапов.
+"""
+import os
+import sys
+import threading
+import time
+from typing import List, Tuple
+
+_START = time.perf_counter()
+
+
+class StartupTimer:
+    """Отметки этапов запуска (можно ставить из фоновых потоков)"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.marks: List[Tuple[str, str, float]] = []  # (этап, поток, мс от старта)
+
+    @classmethod
+    def from_args(cls, argv=None) -> 'StartupTimer':
+        argv = sys.argv[1:] if argv is None else argv
+        return cls('--startup-timing' in argv or os.environ.get('TETRIS_STARTUP_TIMING') == '1')
+
+    def mark(self, stage: str):
+        if self.enabled:
+            self.marks.append((stage, threading.current_thread().name,
+                               (time.perf_counter() - _START) * 1000))
+
+    def report(self):
+        """Напечатать этапы по порядку: время от старта и от предыдущей отметки"""
+        previous = 0.0
+        print(f"{'этап':<28}{'поток':<18}{'от старта, мс':>14}{'шаг, мс':>10}")
+        for stage, thread, ms in sorted(self.marks, key=lambda mark: mark[2]):
+            print(f"{stage:<28}{thread:<18}{ms:>14.1f}{ms - previous:>10.1f}")
+            previous = ms
@@ -3,29 +3,122 @@
 Включает интеллектуальную генерацию для избежания повторяющихся фигур.
 """
 import random
+from collections import deque
+from typing import List, Optional
 from resources.game_resources import SHAPES, COLORS
 
+# Сдвиги по x, которые пробуются при повороте (wall kick):
+# на месте, вправо, влево, вправо на 2, влево на 2
+WALL_KICKS = (0, 1, -1, 2, -2)
+
+
+def rotate_matrix(shape: list) -> list:
+    """Поворот квадратной матрицы фигуры по часовой стрелке"""
+    n = len(shape)
+    rotated = [[0 for _ in range(n)] for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            rotated[j][n-1-i] = shape[i][j]
+    return rotated
+
+
+class RotationState:
+    """
+    Предвычисленное состояние поворота фигуры.
+
+    Хранит матрицу, смещения занятых клеток, ограничивающий прямоугольник,
+    битовые маски строк (бит j = столбец j матрицы), нижние клетки столбцов
+    и таблицу сдвигов для перехода в следующее состояние.
+    """
+    __slots__ = ('shape', 'cells', 'row_masks', 'mask_rows', 'col_bottoms',
+                 'min_col', 'max_col', 'min_row', 'max_row', 'kicks')
+
+    def __init__(self, shape: list, kicks: tuple = WALL_KICKS):
+        self.shape = shape
+        self.cells = tuple((i, j) for i, row in enumerate(shape) for j, cell in enumerate(row) if cell)
+        self.row_masks = tuple(sum(1 << j for j, cell in enumerate(row) if cell) for row in shape)
+        # Пары (номер строки, маска) только для непустых строк
+        self.mask_rows = tuple((i, mask) for i, mask in enumerate(self.row_masks) if mask)
+        # Пары (столбец, нижняя занятая строка в нём) - по ним считается высота падения
+        bottoms = {}
+        for i, j in self.cells:
+            bottoms[j] = i
+        self.col_bottoms = tuple(sorted(bottoms.items()))
+        cols = 0
+        for mask in self.row_masks:
+            cols |= mask
+        # Крайние занятые столбцы и строки матрицы
+        self.min_col = (cols & -cols).bit_length() - 1 if cols else 0
+        self.max_col = cols.bit_length() - 1
+        self.min_row = self.mask_rows[0][0] if self.mask_rows else 0
+        self.max_row = self.mask_rows[-1][0] if self.mask_rows else -1
+        self.kicks = kicks
+
+
+def build_rotation_states(shape: list) -> tuple:
+    """
+    Построение всех различных состояний поворота фигуры.
+
+    Поворот идёт по кругу до совпадения с исходной матрицей,
+    поэтому симметричные фигуры получают 1 или 2 состояния вместо 4.
+    """
+    shapes = [shape]
+    rotated = rotate_matrix(shape)
+    while rotated != shape and len(shapes) < 4:
+        shapes.append(rotated)
+        rotated = rotate_matrix(rotated)
+    return tuple(RotationState(s) for s in shapes)
+
+
 class Tetromino:
     """Класс фигуры тетрамино"""
-    def __init__(self, shape_type: str, piece_size: int, shape: list, color: tuple):
+    def __init__(self, shape_type: str, piece_size: int, shape: list, color: tuple, states: tuple = None):
         self.shape_type = shape_type
         self.piece_size = piece_size
-        self.shape = shape 
+        self.states = states or build_rotation_states(shape)
+        self.rotation = 0
+        self.shape = shape
         self.color = color
         self.x = 0
         self.y = 0
-        
+
+    @property
+    def shape(self):
+        """Матрица фигуры"""
+        return self.state.shape
+
+    @shape.setter
+    def shape(self, shape):
+        for index, state in enumerate(self.states):
+            if state.shape == shape:
+                self.set_rotation(index)
+                return
+        # Матрицы нет среди предвычисленных (например, из старого сохранения)
+        self.states = build_rotation_states(shape)
+        self.set_rotation(0)
+
+    def set_rotation(self, rotation: int):
+        """Переключение на предвычисленное состояние поворота (без выделения памяти)"""
+        self.rotation = rotation
+        self.state = state = self.states[rotation]
+        self.mask_rows = state.mask_rows
+        self.min_col = state.min_col
+        self.max_col = state.max_col
+
+    def copy(self) -> 'Tetromino':
+        """Лёгкая копия: предвычисленные состояния общие, свои только положение и поворот"""
+        clone = Tetromino.__new__(Tetromino)
+        clone.__dict__.update(self.__dict__)
+        return clone
+
+    def next_rotation(self) -> int:
+        """Индекс следующего состояния поворота"""
+        return (self.rotation + 1) % len(self.states)
+
     def get_rotated(self):
         """Получение повернутой фигуры (без изменения оригинала)"""
-        n = len(self.shape)
-        rotated = [[0 for _ in range(n)] for _ in range(n)]
-        
-        for i in range(n):
-            for j in range(n):
-                rotated[j][n-1-i] = self.shape[i][j]
-        
-        return rotated
-    
+        return self.states[self.next_rotation()].shape
+
     def get_width(self):
         """Ширина фигуры"""
         return len(self.shape[0]) if self.shape else 0
@@ -44,20 +137,25 @@ class TetrominoFactory:
     - Избегает создания одинаковых фигур подряд
     - Использует циклическую очередь для равномерного распределения
     - Поддерживает разные размеры фигур (4, 5, 6, 7)
+
+    Генератор собственный (random.Random с зерном), поэтому последовательность
+    фигур полностью определяется зерном и номером позиции в ней.
     """
     
-    def __init__(self, piece_size: int = 4):
+    def __init__(self, piece_size: int = 4, seed: Optional[int] = None):
         """
         Инициализация фабрики.
         
         Args:
             piece_size: Размер фигур (4 = тетрамино, 5 = пентамино, 6 = гексамино, 7 = гептамино)
+            seed: Зерно генератора фигур (None - случайное)
         """
         self.piece_size = piece_size
         self._update_available_shapes()
-        self._generation_queue = []  # Очередь для генерации
+        self._generation_queue = deque()  # Очередь для генерации
         self._last_piece = None  # Последняя сгенерированная фигура
-        self._shuffle_queue()
+        self._previews = {}  # Кэш объектов предпросмотра по типу фигуры
+        self._reseed(seed if seed is not None else random.getrandbits(32))
     
     def _update_available_shapes(self):
         """Обновляет список доступных фигур для текущего размера и ниже"""
@@ -72,19 +170,38 @@ class TetrominoFactory:
             self.shapes_dict = SHAPES.get(4, {})
         
         self.available_shapes = list(self.shapes_dict.keys())
+
+        # Предвычисляем все состояния поворота, чтобы поворот был сменой индекса
+        self.rotations = {
+            shape_type: build_rotation_states(shape)
+            for shape_type, shape in self.shapes_dict.items()
+        }
     
     def set_piece_size(self, piece_size: int):
         """Изменить размер фигур и сбросить очередь генерации"""
         self.piece_size = piece_size
         self._update_available_shapes()
-        self._generation_queue = []
+        self._previews = {}
+        self._reseed(self.seed)
+
+    def _reseed(self, seed: int):
+        """Начать последовательность фигур заново с заданным зерном"""
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._generation_queue.clear()
         self._last_piece = None
-        self._shuffle_queue()
-    
+        self.position = 0  # Сколько фигур уже выдано из последовательности
+
     def _shuffle_queue(self):
-        """Перемешать и создать новую очередь всех фигур"""
-        self._generation_queue = self.available_shapes.copy()
-        random.shuffle(self._generation_queue)
+        """Добавить в конец очереди новый перемешанный набор всех фигур"""
+        bag = self.available_shapes.copy()
+        self._rng.shuffle(bag)
+        self._generation_queue.extend(bag)
+
+    def _fill_queue(self, count: int):
+        """Гарантировать, что в очереди есть хотя бы count фигур"""
+        while len(self._generation_queue) < count:
+            self._shuffle_queue()
     
     def create_tetromino(self, shape_type: str):
         """
@@ -96,9 +213,9 @@ class TetrominoFactory:
         Returns:
             Объект Tetromino
         """
-        shape = self.shapes_dict.get(shape_type, self.shapes_dict['I'])
+        states = self.rotations.get(shape_type, self.rotations['I'])
         color = COLORS.get(shape_type, (255, 255, 255))
-        return Tetromino(shape_type, self.piece_size, shape, color)
+        return Tetromino(shape_type, self.piece_size, states[0].shape, color, states)
     
     def create_random(self) -> Tetromino:
         """
@@ -111,25 +228,61 @@ class TetrominoFactory:
         Returns:
             Объект Tetromino
         """
-        # Если очередь пуста, перемешиваем снова
+        # Если очередь пуста, перемешиваем новый набор
         if not self._generation_queue:
             self._shuffle_queue()
         
         # Берём следующую фигуру из очереди
-        shape_type = self._generation_queue.pop(0)
-        
-        # Если это была последняя фигура, перемешиваем очередь для следующей
-        if not self._generation_queue:
-            self._shuffle_queue()
+        shape_type = self._generation_queue.popleft()
+        self.position += 1
+        # Следующий набор перемешиваем сразу, а не при первом предпросмотре:
+        # так состояние генератора зависит только от позиции, а не от того, рисовалось ли превью
+        self._fill_queue(1)
         
         self._last_piece = shape_type
         return self.create_tetromino(shape_type)
-    
+
+    def _get_preview(self, shape_type: str) -> Tetromino:
+        """Кэшированный объект предпросмотра (только для отображения, не изменять)"""
+        preview = self._previews.get(shape_type)
+        if preview is None:
+            preview = self._previews[shape_type] = self.create_tetromino(shape_type)
+        return preview
+
     def get_next_preview(self) -> Tetromino:
+        """Следующая фигура без извлечения из очереди"""
         if not self._generation_queue:
             self._shuffle_queue()
-        return self.create_tetromino(self._generation_queue[0])
-        
+        return self._get_preview(self._generation_queue[0])
+
+    def peek(self, count: int) -> List[Tetromino]:
+        """
+        Предпросмотр следующих count фигур без извлечения из очереди.
+
+        Возвращает кэшированные объекты, поэтому вызов каждый кадр ничего не создаёт.
+        """
+        self._fill_queue(count)
+        queue = self._generation_queue
+        return [self._get_preview(queue[i]) for i in range(count)]
+
+    def get_state(self) -> dict:
+        """Состояние генератора для сохранения: зерно и позиция в последовательности"""
+        return {"seed": self.seed, "position": self.position}
+
+    def restore_state(self, seed: int, position: int = 0):
+        """
+        Восстановить генератор: та же последовательность с той же позиции.
+
+        Args:
+            seed: Зерно из get_state()
+            position: Сколько фигур уже было выдано
+        """
+        self._reseed(seed)
+        self._fill_queue(position)
+        for _ in range(position):
+            self._last_piece = self._generation_queue.popleft()
+        self._fill_queue(1)
+        self.position = position
     
     def get_available_shapes(self) -> list:
         """Получить список доступных типов фигур"""
@@ -140,7 +293,10 @@ class TetrominoFactory:
         return self.piece_size
     
     def reset_generation(self):
-        """Сбросить историю генерации и перемешать очередь"""
-        self._generation_queue = []
-        self._last_piece = None
-        self._shuffle_queue()
\ No newline at end of file
+        """
+        Сбросить историю генерации: новая последовательность с зерном, выведенным из текущего.
+
+        Зерно зависит только от self.seed, а не от состояния self._rng,
+        которое сдвигается предпросмотром (peek) на разное число наборов.
+        """
+        self._reseed(random.Random(f"{self.seed}:next").getrandbits(32))
\ No newline at end of file
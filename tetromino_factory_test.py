@@ -0,0 +1,104 @@
+"""
+Проверки фабрики фигур: таблицы поворотов, воспроизводимость по зерну
+и независимость последовательности от предпросмотра.
+"""
+import unittest
+
+from tetromino_factory import TetrominoFactory, build_rotation_states, rotate_matrix
+
+
+def take(factory: TetrominoFactory, count: int):
+    return [factory.create_random().shape_type for _ in range(count)]
+
+
+class RotationTablesTest(unittest.TestCase):
+    def test_states_follow_matrix_rotation(self):
+        for piece_size in (4, 5, 6, 7):
+            factory = TetrominoFactory(piece_size, seed=0)
+            for shape_type, states in factory.rotations.items():
+                with self.subTest(piece_size=piece_size, shape=shape_type):
+                    self.assertIn(len(states), (1, 2, 4))
+                    for index, state in enumerate(states):
+                        following = states[(index + 1) % len(states)]
+                        self.assertEqual(rotate_matrix(state.shape), following.shape)
+
+    def test_state_tables_match_matrix(self):
+        factory = TetrominoFactory(7, seed=0)
+        for shape_type, states in factory.rotations.items():
+            for state in states:
+                cells = {(i, j) for i, row in enumerate(state.shape) for j, cell in enumerate(row) if cell}
+                self.assertEqual(set(state.cells), cells)
+                self.assertEqual({(i, j) for i, mask in state.mask_rows
+                                  for j in range(mask.bit_length()) if mask >> j & 1}, cells)
+                self.assertEqual(state.min_col, min(j for _, j in cells))
+                self.assertEqual(state.max_col, max(j for _, j in cells))
+                self.assertEqual(dict(state.col_bottoms),
+                                 {j: max(i for i, jj in cells if jj == j) for _, j in cells})
+
+    def test_symmetric_shape_has_single_state(self):
+        square = [[1, 1], [1, 1]]
+        self.assertEqual(len(build_rotation_states(square)), 1)
+
+    def test_rotation_switches_precomputed_state(self):
+        factory = TetrominoFactory(5, seed=0)
+        for shape_type in factory.get_available_shapes():
+            piece = factory.create_tetromino(shape_type)
+            for _ in range(len(piece.states)):
+                rotated = piece.get_rotated()
+                piece.set_rotation(piece.next_rotation())
+                self.assertIs(piece.shape, rotated)
+                self.assertIs(piece.mask_rows, piece.states[piece.rotation].mask_rows)
+            self.assertEqual(piece.rotation, 0)
+
+
+class TetrominoFactoryTest(unittest.TestCase):
+    def test_same_seed_same_sequence(self):
+        for piece_size in (4, 5, 6, 7):
+            with self.subTest(piece_size=piece_size):
+                self.assertEqual(take(TetrominoFactory(piece_size, seed=11), 100),
+                                 take(TetrominoFactory(piece_size, seed=11), 100))
+
+    def test_every_bag_holds_each_shape_once(self):
+        factory = TetrominoFactory(5, seed=3)
+        shapes = sorted(factory.get_available_shapes())
+        sequence = take(factory, len(shapes) * 10)
+        for start in range(0, len(sequence), len(shapes)):
+            self.assertEqual(sorted(sequence[start:start + len(shapes)]), shapes)
+
+    def test_peek_does_not_change_sequence(self):
+        plain = TetrominoFactory(4, seed=8)
+        peeking = TetrominoFactory(4, seed=8)
+        expected = take(plain, 50)
+        sequence = []
+        for count in range(50):
+            preview = [piece.shape_type for piece in peeking.peek(count % 12 + 1)]
+            self.assertEqual(peeking.get_next_preview().shape_type, preview[0])
+            sequence.append(peeking.create_random().shape_type)
+            self.assertEqual(sequence[-1], preview[0])
+        self.assertEqual(sequence, expected)
+
+    def test_restore_state_continues_sequence(self):
+        factory = TetrominoFactory(6, seed=21)
+        take(factory, 17)
+        state = factory.get_state()
+        expected = take(factory, 40)
+
+        restored = TetrominoFactory(6)
+        restored.restore_state(state['seed'], state['position'])
+        self.assertEqual(take(restored, 40), expected)
+
+    def test_reset_generation_ignores_previews(self):
+        plain = TetrominoFactory(4, seed=5)
+        peeking = TetrominoFactory(4, seed=5)
+        take(plain, 3)
+        take(peeking, 3)
+        peeking.peek(30)
+
+        plain.reset_generation()
+        peeking.reset_generation()
+        self.assertEqual(plain.seed, peeking.seed)
+        self.assertEqual(take(plain, 20), take(peeking, 20))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Турнир автоматических игроков.
+
+Запускает много безоконных игр на всех ядрах через ProcessPoolExecutor
+и собирает распределения очков, линий и уровней по каждой комбинации
+размера поля, размера фигур и политики.
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import importlib
+import json
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from headless import HeadlessGame, POLICIES
+
+# Размеры поля и фигур, доступные в меню новой игры
+FIELD_SIZES = ['10x20', '12x24', '15x30']
+PIECE_SIZES = [4, 5, 6, 7]
+
+
+def resolve_policy(spec: str) -> Callable[[Optional[int]], Any]:
+    """
+    Найти фабрику политики по имени.
+
+    Args:
+        spec: Имя встроенной политики (см. headless.POLICIES)
+              или путь вида "модуль:атрибут"; атрибут вызывается с зерном игры
+
+    Returns:
+        Функция seed -> политика
+    """
+    if spec in POLICIES:
+        return POLICIES[spec]
+    if ':' not in spec:
+        raise ValueError(f"Неизвестная политика: {spec}")
+    module_name, attr = spec.split(':', 1)
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def play_game(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Сыграть одну игру в процессе-исполнителе.
+
+    Args:
+        task: Словарь с ключами seed, field_size, piece_size, policy, max_pieces
+
+    Returns:
+        Итоги игры (поля как в Leaderboard.add_score) плюс policy и seed
+    """
+    width, height = (int(v) for v in task['field_size'].split('x'))
+    policy = resolve_policy(task['policy'])(task['seed'])
+    game = HeadlessGame(width, height, task['piece_size'], player_name=task['policy'],
+                        seed=task['seed'], inputs=policy)
+    result = game.run(max_pieces=task.get('max_pieces'))
+    result['policy'] = task['policy']
+    result['seed'] = task['seed']
+    return result
+
+
+def make_tasks(policies: Iterable[str], field_sizes: Iterable[str], piece_sizes: Iterable[int],
+               games: int, seed: int = 0, max_pieces: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Список игр: одинаковые зёрна для всех комбинаций, чтобы сравнение было честным"""
+    return [
+        {'policy': policy, 'field_size': field_size, 'piece_size': piece_size,
+         'seed': seed + i, 'max_pieces': max_pieces}
+        for policy in policies
+        for field_size in field_sizes
+        for piece_size in piece_sizes
+        for i in range(games)
+    ]
+
+
+def describe(values: List[int]) -> Dict[str, float]:
+    """Сводка распределения: среднее, разброс и квантили"""
+    ordered = sorted(values)
+    count = len(ordered)
+
+    def quantile(q: float) -> float:
+        return ordered[min(count - 1, int(q * count))]
+
+    return {
+        'count': count,
+        'mean': statistics.fmean(ordered),
+        'stdev': statistics.pstdev(ordered),
+        'min': ordered[0],
+        'p25': quantile(0.25),
+        'median': statistics.median(ordered),
+        'p75': quantile(0.75),
+        'p90': quantile(0.90),
+        'max': ordered[-1],
+    }
+
+
+def aggregate(results: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Распределения score/lines/level по (policy, field_size, piece_size)"""
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for result in results:
+        key = (result['policy'], result['field_size'], result['piece_size'])
+        groups.setdefault(key, []).append(result)
+
+    summary = []
+    for (policy, field_size, piece_size), group in sorted(groups.items()):
+        summary.append({
+            'policy': policy,
+            'field_size': field_size,
+            'piece_size': piece_size,
+            'games': len(group),
+            'score': describe([r['score'] for r in group]),
+            'lines': describe([r['lines'] for r in group]),
+            'level': describe([r['level'] for r in group]),
+            'pieces': describe([r['pieces'] for r in group]),
+        })
+    return summary
+
+
+def run_tournament(tasks: List[Dict[str, Any]], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Сыграть все игры параллельно; возвращает результаты в порядке задач"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [play_game(task) for task in tasks]
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(play_game, tasks, chunksize=chunksize))
+
+
+def _parse_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Турнир автоматических игроков Тетриса")
+    parser.add_argument('--policy', default='random',
+                        help="Политики через запятую: имена из headless.POLICIES или модуль:атрибут")
+    parser.add_argument('--fields', default=','.join(FIELD_SIZES), help="Размеры поля через запятую")
+    parser.add_argument('--pieces', default=','.join(map(str, PIECE_SIZES)), help="Размеры фигур через запятую")
+    parser.add_argument('--games', type=int, default=20, help="Игр на каждую комбинацию")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-pieces', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=None, help="Файл JSON для результатов и сводки")
+    args = parser.parse_args()
+
+    tasks = make_tasks(_parse_list(args.policy), _parse_list(args.fields),
+                       [int(p) for p in _parse_list(args.pieces)],
+                       args.games, args.seed, args.max_pieces)
+    results = run_tournament(tasks, args.workers)
+    summary = aggregate(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'results': results}, f, ensure_ascii=False, indent=2)
+
+    for row in summary:
+        score = row['score']
+        print(f"{row['policy']:>12} {row['field_size']:>6} {row['piece_size']}: "
+              f"score mean={score['mean']:.0f} median={score['median']:.0f} max={score['max']} | "
+              f"lines mean={row['lines']['mean']:.1f} | level mean={row['level']['mean']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
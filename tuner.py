@@ -0,0 +1,218 @@
+"""
+Подбор весов эвристики бота эволюционной стратегией.
+
+Для каждой комбинации размера поля и размера фигур (как в меню новой игры)
+отдельно ищутся веса признаков bot.HeuristicBot. Используется метод
+перекрёстной энтропии с диагональной ковариацией: поколение сэмплируется
+вокруг текущего среднего, лучшая четверть задаёт новое среднее и разброс.
+Оценка кандидата - среднее число линий в безоконных играх на одних и тех
+же зёрнах для всех кандидатов, игры идут на всех ядрах.
+
+После каждого поколения состояние поиска пишется в файл контрольной точки,
+поэтому прерванный подбор продолжается с последнего законченного поколения.
+Лучшие веса сохраняются в bot.WEIGHTS_FILE, откуда их берёт бот.
+
+    python tuner.py --fields 10x20 --pieces 5,6,7 --generations 30
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import math
+import random
+import statistics
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from bot import DEFAULT_WEIGHTS, FEATURES, WEIGHTS_FILE, HeuristicBot, load_tuned_weights, weights_key
+from headless import HeadlessGame
+from tournament import FIELD_SIZES, PIECE_SIZES
+
+CHECKPOINT_DIR = "data/tuning"
+INITIAL_SIGMA = 0.5
+MIN_SIGMA = 0.02  # Нижняя граница разброса, чтобы поиск не схлопнулся раньше времени
+
+
+def normalize(vector: List[float]) -> List[float]:
+    """
+    Вектор единичной длины.
+
+    Бот выбирает положение с максимальной оценкой, поэтому веса,
+    отличающиеся только множителем, играют одинаково.
+    """
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def rollout(task: Tuple[int, int, int, List[float], int, int]) -> int:
+    """Одна игра бота с заданными весами в процессе-исполнителе; возвращает число линий"""
+    width, height, piece_size, vector, seed, max_pieces = task
+    bot = HeuristicBot(dict(zip(FEATURES, vector)))
+    game = HeadlessGame(width, height, piece_size, player_name="tuner", seed=seed, inputs=bot)
+    return game.run(max_pieces=max_pieces)['lines']
+
+
+class WeightTuner:
+    """Поиск весов для одной комбинации поля и фигур с контрольными точками"""
+
+    def __init__(self, field_size: str, piece_size: int, population: int = 16, games: int = 8,
+                 max_pieces: int = 300, seed: int = 0, checkpoint_dir: str = CHECKPOINT_DIR):
+        self.field_size = field_size
+        self.width, self.height = (int(v) for v in field_size.split('x'))
+        self.piece_size = piece_size
+        self.population = population
+        self.games = games
+        self.max_pieces = max_pieces
+        self.seed = seed
+        self.checkpoint_path = os.path.join(
+            checkpoint_dir, f"{field_size}_{piece_size}.json")
+        self.state = self._load_checkpoint() or {
+            'field_size': field_size,
+            'piece_size': piece_size,
+            'generation': 0,
+            'mean': normalize([DEFAULT_WEIGHTS[name] for name in FEATURES]),
+            'sigma': [INITIAL_SIGMA] * len(FEATURES),
+            'best': None,
+            'history': [],
+        }
+
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                state = json.load(f)
+            print(f"{self.key}: продолжение с поколения {state['generation']}")
+            return state
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ошибка чтения контрольной точки {self.checkpoint_path}: {e}")
+            return None
+
+    def save_checkpoint(self):
+        """Запись через временный файл: прерывание не оставит половину файла"""
+        os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    @property
+    def key(self) -> str:
+        return weights_key(self.width, self.height, self.piece_size)
+
+    @property
+    def best_weights(self) -> Optional[Dict[str, float]]:
+        best = self.state['best']
+        return dict(zip(FEATURES, best['vector'])) if best else None
+
+    def sample(self) -> List[List[float]]:
+        """
+        Кандидаты поколения: текущее среднее и population - 1 случайных векторов.
+
+        Генератор зависит только от зерна, комбинации и номера поколения,
+        поэтому после возобновления поколение будет тем же самым.
+        """
+        state = self.state
+        rng = random.Random(f"{self.seed}:{self.key}:{state['generation']}")
+        candidates = [state['mean']]
+        while len(candidates) < self.population:
+            candidates.append(normalize([m + s * rng.gauss(0.0, 1.0)
+                                         for m, s in zip(state['mean'], state['sigma'])]))
+        return candidates
+
+    def evaluate(self, candidates: List[List[float]], executor: Optional[Executor]) -> List[float]:
+        """Средние линии каждого кандидата на одних и тех же зёрнах"""
+        seeds = range(self.seed, self.seed + self.games)
+        tasks = [(self.width, self.height, self.piece_size, vector, seed, self.max_pieces)
+                 for vector in candidates for seed in seeds]
+        if executor is None:
+            lines = [rollout(task) for task in tasks]
+        else:
+            lines = list(executor.map(rollout, tasks, chunksize=max(1, self.games // 2)))
+        return [statistics.fmean(lines[i:i + self.games]) for i in range(0, len(lines), self.games)]
+
+    def step(self, executor: Optional[Executor] = None) -> Dict[str, Any]:
+        """Одно поколение: оценка, новое среднее и разброс по лучшей четверти, контрольная точка"""
+        state = self.state
+        candidates = self.sample()
+        fitness = self.evaluate(candidates, executor)
+        ranked = sorted(zip(fitness, candidates), key=lambda item: -item[0])
+        elite = [vector for _, vector in ranked[:max(2, self.population // 4)]]
+
+        state['mean'] = normalize([statistics.fmean(column) for column in zip(*elite)])
+        state['sigma'] = [max(MIN_SIGMA, statistics.pstdev(column)) for column in zip(*elite)]
+        best_fitness, best_vector = ranked[0]
+        if state['best'] is None or best_fitness > state['best']['fitness']:
+            state['best'] = {'fitness': best_fitness, 'vector': best_vector}
+        record = {
+            'generation': state['generation'],
+            'best_fitness': best_fitness,
+            'mean_fitness': statistics.fmean(fitness),
+        }
+        state['history'].append(record)
+        state['generation'] += 1
+        self.save_checkpoint()
+        return record
+
+
+def save_weights(tuners: List[WeightTuner], path: str = WEIGHTS_FILE):
+    """Дописать лучшие веса в файл весов бота, не трогая другие комбинации"""
+    weights = load_tuned_weights(path)
+    for tuner in tuners:
+        if tuner.best_weights:
+            weights[tuner.key] = tuner.best_weights
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(weights, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _parse_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Подбор весов бота Тетриса")
+    parser.add_argument('--fields', default=','.join(FIELD_SIZES), help="Размеры поля через запятую")
+    parser.add_argument('--pieces', default=','.join(map(str, PIECE_SIZES)), help="Размеры фигур через запятую")
+    parser.add_argument('--generations', type=int, default=20, help="До какого поколения вести поиск")
+    parser.add_argument('--population', type=int, default=16)
+    parser.add_argument('--games', type=int, default=8, help="Игр (зёрен) на оценку кандидата")
+    parser.add_argument('--max-pieces', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--checkpoint-dir', default=CHECKPOINT_DIR)
+    parser.add_argument('--output', default=WEIGHTS_FILE, help="Файл весов бота")
+    args = parser.parse_args()
+
+    tuners = [
+        WeightTuner(field_size, int(piece_size), args.population, args.games,
+                    args.max_pieces, args.seed, args.checkpoint_dir)
+        for field_size in _parse_list(args.fields)
+        for piece_size in _parse_list(args.pieces)
+    ]
+    workers = args.workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for tuner in tuners:
+            while tuner.state['generation'] < args.generations:
+                record = tuner.step(executor)
+                print(f"{tuner.key} поколение {record['generation']}: "
+                      f"лучший {record['best_fitness']:.1f} линий, средний {record['mean_fitness']:.1f}")
+                save_weights([tuner], args.output)
+    except KeyboardInterrupt:
+        print("Прервано; подбор продолжится с последней контрольной точки")
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    for tuner in tuners:
+        best = tuner.state['best']
+        if best:
+            weights = ", ".join(f"{name}={value:.3f}" for name, value in tuner.best_weights.items())
+            print(f"{tuner.key}: {best['fitness']:.1f} линий | {weights}")
+
+
+if __name__ == "__main__":
+    main()
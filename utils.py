@@ -1,70 +1,295 @@
-import pickle
 import os
 import datetime
-from typing import List, Dict, Any, Optional
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from typing import List, Dict, Any, Optional, Tuple
 import configparser
 import pygame
+import save_format
+
+class LazySound:
+    """
+    Звуковой эффект, который ещё может декодироваться в фоне.
+
+    play() ждёт окончания декодирования только если звук понадобился
+    раньше, чем фоновый поток до него дошёл.
+    """
+
+    def __init__(self, future: Future):
+        self._future = future
+
+    def play(self):
+        sound = self._future.result()
+        if sound:
+            sound.play()
+
+
+class SoundManager:
+    """
+    Звуки и музыка с общим жизненным циклом микшера.
+
+    Микшер инициализируется один раз на процесс. Эффекты декодируются
+    в фоновом потоке сразу после запроса и хранятся в ограниченном
+    LRU-кэше по ключу (файл, громкость), поэтому повторный запрос
+    того же звука (например, при новой игре) ничего не декодирует.
+    """
+    _instance: Optional['SoundManager'] = None
+
+    def __init__(self, max_sounds: int = 16):
+        self.max_sounds = max_sounds
+        self._sounds: 'OrderedDict[tuple, Future]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._mixer_ready: Optional[bool] = None  # None - инициализацию ещё не пробовали
+        self.current_music: Optional[str] = None  # Имя текущей загруженной музыки
+
+    @classmethod
+    def get(cls) -> 'SoundManager':
+        """Общий для всего процесса менеджер"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def init_mixer(self) -> bool:
+        """Инициализация микшера (только при первом вызове)"""
+        if self._mixer_ready is None:
+            try:
+                if not pygame.mixer.get_init():
+                    pygame.mixer.init()
+                self._mixer_ready = True
+            except pygame.error as e:
+                print(f"Звук недоступен: {e}")
+                self._mixer_ready = False
+        return self._mixer_ready
+
+    @staticmethod
+    def _decode(sound_path: str, volume: float):
+        try:
+            sound = pygame.mixer.Sound(sound_path)
+            sound.set_volume(volume)
+            print(f"Sound '{os.path.basename(sound_path)}' loaded from: {sound_path}")
+            return sound
+        except Exception as e:
+            print(f"Could not load sound '{os.path.basename(sound_path)}': {e}")
+            return None
+
+    def sound(self, sound_filename: str, config: 'ConfigManager' = None) -> Optional[LazySound]:
+        """
+        Звуковой эффект из ресурсов; декодирование ставится в фоновую очередь.
+
+        Returns:
+            LazySound или None, если звуки выключены или файла нет
+        """
+        if config:
+            enable_sound = config.get('Sound', 'enable_sound', 'true', lambda x: x.lower() == 'true')
+            if not enable_sound:
+                return None
+        sound_path = os.path.join(os.path.dirname(__file__), "resources", sound_filename)
+        if not os.path.exists(sound_path):
+            print(f"Sound not found at: {sound_path}")
+            return None
+        if not self.init_mixer():
+            return None
+
+        volume = config.get('Sound', 'sound_volume', 1.0, float) if config else 1.0
+        key = (sound_filename, volume)
+        with self._lock:
+            future = self._sounds.get(key)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sound-decoder")
+                future = self._sounds[key] = self._executor.submit(self._decode, sound_path, volume)
+                while len(self._sounds) > self.max_sounds:
+                    self._sounds.popitem(last=False)
+            else:
+                self._sounds.move_to_end(key)
+        return LazySound(future)
+
+    def play_music(self, music_filename: str, volume: float = 0.6, config: 'ConfigManager' = None) -> bool:
+        """Потоковое воспроизведение музыки по кругу (см. load_music)"""
+        # Проверяем, включена ли музыка в конфиге
+        if config:
+            enable_music = config.get('Sound', 'enable_music', 'true', lambda x: x.lower() == 'true')
+            if not enable_music:
+                return False
+        if not self.init_mixer():
+            return False
+
+        # Если эта же музыка уже загружена, просто воспроизводим
+        if self.current_music == music_filename:
+            try:
+                pygame.mixer.music.play(-1)
+            except pygame.error:
+                pass
+            return True
+
+        try:
+            music_path = os.path.join(os.path.dirname(__file__), "resources", music_filename)
+            if os.path.exists(music_path):
+                pygame.mixer.music.load(music_path)
+                music_volume = config.get('Sound', 'music_volume', volume, float) if config else volume
+                pygame.mixer.music.set_volume(music_volume)
+                pygame.mixer.music.play(-1)  # -1 = infinite loop
+                self.current_music = music_filename  # Запоминаем, какая музыка загружена
+                print(f"Music '{music_filename}' loaded from: {music_path}")
+                return True
+            else:
+                print(f"Music not found at: {music_path}")
+                return False
+        except Exception as e:
+            print(f"Could not load music '{music_filename}': {e}")
+            return False
 
-class SoundCache:
-    """Кэш для звуков и музыки"""
-    _sounds: Dict[str, Any] = {}
-    _music_loaded = False
-    _current_music = None  # Имя текущей загруженной музыки
 
 class SaveManager:
-    """Менеджер сохранений игр"""
-    
+    """
+    Менеджер сохранений игр.
+
+    Рядом с файлами сохранений лежит индекс SQLite с их метаданными,
+    поэтому список сохранений строится без чтения самих файлов.
+    Индекс обновляется при записи и удалении, а при запуске сверяется
+    с каталогом: читаются только новые или изменённые файлы.
+
+    Файлы пишутся в двоичном формате save_format; старые pickle-сохранения
+    переводятся в него при первом чтении.
+    """
+
+    INDEX_FILE = "index.db"
+    # Поля строки списка сохранений (порядок как в таблице индекса)
+    INDEX_FIELDS = ('filename', 'player_name', 'score', 'level', 'lines', 'save_time', 'save_date',
+                    'field_size', 'piece_size', 'current_piece_type', 'piece_x', 'piece_y', 'mtime')
+
     def __init__(self, save_dir: str = "data/saves"):
         self.save_dir = save_dir
+        self.index_path = os.path.join(save_dir, self.INDEX_FILE)
         self.ensure_directories()
+        self._init_index()
+        self.sync_index()
     
     def ensure_directories(self):
         """Создание необходимых директорий"""
         os.makedirs(self.save_dir, exist_ok=True)
-    
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.index_path)
+
+    def _init_index(self):
+        """Создание таблицы индекса (повреждённый индекс пересоздаётся)"""
+        schema = """
+            CREATE TABLE IF NOT EXISTS saves (
+                filename TEXT PRIMARY KEY, player_name TEXT, score INTEGER, level INTEGER,
+                lines INTEGER, save_time TEXT, save_date TEXT, field_size TEXT, piece_size INTEGER,
+                current_piece_type TEXT, piece_x INTEGER, piece_y INTEGER, mtime REAL);
+            CREATE INDEX IF NOT EXISTS saves_player ON saves (player_name);
+            CREATE INDEX IF NOT EXISTS saves_time ON saves (save_time);
+        """
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executescript(schema)
+        except sqlite3.DatabaseError as e:
+            print(f"Индекс сохранений повреждён, пересоздаём: {e}")
+            os.remove(self.index_path)
+            with closing(self._connect()) as conn, conn:
+                conn.executescript(schema)
+
+    @staticmethod
+    def _save_info(filename: str, save_data: Dict[str, Any], mtime: float) -> tuple:
+        """Строка индекса по данным сохранения"""
+        x, y = save_data.get('current_piece_pos', (0, 0))
+        return (
+            filename,
+            save_data.get('player_name', 'Неизвестный'),
+            save_data.get('score', 0),
+            save_data.get('level', 1),
+            save_data.get('lines_cleared', 0),
+            save_data.get('save_time', ''),
+            save_data.get('save_date', ''),
+            f"{save_data.get('width', 10)}x{save_data.get('height', 20)}",
+            save_data.get('piece_size', 4),
+            save_data.get('current_piece_type', ''),
+            x, y, mtime,
+        )
+
+    def _index_file(self, conn: sqlite3.Connection, filename: str, save_data: Dict[str, Any]):
+        mtime = os.path.getmtime(os.path.join(self.save_dir, filename))
+        conn.execute(f"INSERT OR REPLACE INTO saves VALUES ({', '.join('?' * len(self.INDEX_FIELDS))})",
+                     self._save_info(filename, save_data, mtime))
+
+    def sync_index(self):
+        """
+        Сверка индекса с каталогом сохранений.
+
+        Читает только файлы, которых нет в индексе или которые изменились
+        (например, скопированы вручную), и убирает записи удалённых файлов.
+        """
+        on_disk = {}
+        with os.scandir(self.save_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.save') and entry.is_file():
+                    on_disk[entry.name] = entry.stat().st_mtime
+
+        with closing(self._connect()) as conn, conn:
+            indexed = dict(conn.execute("SELECT filename, mtime FROM saves"))
+            gone = [(name,) for name in indexed if name not in on_disk]
+            if gone:
+                conn.executemany("DELETE FROM saves WHERE filename = ?", gone)
+            for filename, mtime in on_disk.items():
+                if indexed.get(filename) == mtime:
+                    continue
+                save_data = self._read_metadata(filename)
+                if save_data is not None:
+                    self._index_file(conn, filename, save_data)
+
+    def _read_metadata(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Метаданные сохранения; старый файл при этом переводится в новый формат"""
+        try:
+            with open(os.path.join(self.save_dir, filename), 'rb') as f:
+                if save_format.is_binary(f):
+                    return save_format.read_metadata(f)
+        except Exception as e:
+            print(f"Ошибка чтения сохранения {filename}: {e}")
+            return None
+        # Запись в индекс делает вызывающий в своей транзакции
+        save_data, _ = self._load_file(filename)
+        return save_data
+
     def get_save_files(self) -> List[Dict[str, Any]]:
-        """Получение списка всех сохранений"""
+        """Получение списка всех сохранений (только из индекса, без чтения файлов)"""
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(f"SELECT {', '.join(self.INDEX_FIELDS)} FROM saves "
+                                    "ORDER BY save_time DESC").fetchall()
+        except sqlite3.Error as e:
+            print(f"Ошибка чтения индекса сохранений: {e}")
+            return []
+
         saves = []
-        if os.path.exists(self.save_dir):
-            for filename in os.listdir(self.save_dir):
-                if filename.endswith('.save'):
-                    filepath = os.path.join(self.save_dir, filename)
-                    try:
-                        with open(filepath, 'rb') as f:
-                            save_data = pickle.load(f)
-                            save_info = {
-                                'filename': filename,
-                                'player_name': save_data.get('player_name', 'Неизвестный'),
-                                'score': save_data.get('score', 0),
-                                'level': save_data.get('level', 1),
-                                'lines': save_data.get('lines_cleared', 0),
-                                'save_time': save_data.get('save_time', ''),
-                                'save_date': save_data.get('save_date', ''),
-                                'field_size': f"{save_data.get('width', 10)}x{save_data.get('height', 20)}",
-                                'piece_size': save_data.get('piece_size', 4),
-                                'field': save_data.get('field', []),  # ДОБАВЛЯЕМ ПОЛЕ ДЛЯ МИНИАТЮРЫ
-                                'current_piece_type': save_data.get('current_piece_type', ''),
-                                'current_piece_pos': save_data.get('current_piece_pos', (0, 0))
-                            }
-                            saves.append(save_info)
-                    except Exception as e:
-                        print(f"Ошибка загрузки сохранения {filename}: {e}")
-        
-        saves.sort(key=lambda x: x.get('save_time', ''), reverse=True)
+        for row in rows:
+            save_info = dict(zip(self.INDEX_FIELDS, row))
+            save_info['current_piece_pos'] = (save_info.pop('piece_x'), save_info.pop('piece_y'))
+            del save_info['mtime']
+            saves.append(save_info)
         return saves
     
     def save_game(self, game_data: Dict[str, Any], player_name: str = "Игрок"):
-        """Сохранение игры — удаляет старые сохранения того же игрока"""
-        # Удаляем старые сохранения для этого игрока
-        if os.path.exists(self.save_dir):
-            for filename in os.listdir(self.save_dir):
-                if filename.startswith(player_name) and filename.endswith('.save'):
-                    old_filepath = os.path.join(self.save_dir, filename)
-                    try:
-                        os.remove(old_filepath)
-                    except Exception as e:
-                        print(f"Ошибка удаления старого сохранения {filename}: {e}")
-        
+        """
+        Сохранение игры — заменяет старые сохранения того же игрока.
+
+        Старые файлы удаляются только после того, как новый записан
+        и внесён в индекс: при сбое записи у игрока остаётся прежнее сохранение.
+        """
+        # Старые сохранения этого игрока берём из индекса, каталог не перебираем
+        try:
+            with closing(self._connect()) as conn:
+                old_files = [row[0] for row in conn.execute(
+                    "SELECT filename FROM saves WHERE player_name = ?", (player_name,))]
+        except sqlite3.Error as e:
+            print(f"Ошибка чтения индекса сохранений: {e}")
+            old_files = []
+
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{player_name}_{timestamp}.save"
         filepath = os.path.join(self.save_dir, filename)
@@ -74,168 +299,205 @@ class SaveManager:
         game_data['save_date'] = datetime.datetime.now().strftime("%d.%m.%Y %H:%M")
         
         try:
-            with open(filepath, 'wb') as f:
-                pickle.dump(game_data, f)
-            return True
+            self._write_file(filepath, game_data)
+            with closing(self._connect()) as conn, conn:
+                self._index_file(conn, filename, game_data)
         except Exception as e:
             print(f"Ошибка сохранения: {e}")
             return False
-    
-    def load_game(self, filename: str) -> Optional[Dict[str, Any]]:
-        """Загрузка игры из файла"""
+
+        for old_filename in old_files:
+            # Сохранение в ту же секунду перезаписывает файл с тем же именем
+            if old_filename != filename:
+                self.delete_save(old_filename)
+        return True
+
+    @staticmethod
+    def _write_file(filepath: str, game_data: Dict[str, Any]):
+        """Запись через временный файл, чтобы сбой не оставил обрезанное сохранение"""
+        tmp_path = filepath + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(save_format.dumps(game_data))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _load_file(self, filename: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Чтение сохранения и флаг, что старый pickle-файл переписан в двоичном формате.
+
+        Индекс здесь не обновляется: sync_index вызывает это внутри своей
+        транзакции, и второе соединение ждало бы её блокировку.
+        """
         filepath = os.path.join(self.save_dir, filename)
         try:
             with open(filepath, 'rb') as f:
-                return pickle.load(f)
+                if save_format.is_binary(f):
+                    return save_format.load(f), False
+                save_data = save_format.load_legacy(f)
         except Exception as e:
             print(f"Ошибка загрузки {filename}: {e}")
-            return None
+            return None, False
+
+        try:
+            self._write_file(filepath, save_data)
+        except Exception as e:
+            print(f"Ошибка преобразования сохранения {filename}: {e}")
+            return save_data, False
+        return save_data, True
+
+    def load_game(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Загрузка игры из файла"""
+        save_data, migrated = self._load_file(filename)
+        if migrated:
+            try:
+                with closing(self._connect()) as conn, conn:
+                    self._index_file(conn, filename, save_data)
+            except sqlite3.Error as e:
+                print(f"Ошибка обновления индекса сохранений: {e}")
+        return save_data
     
     def delete_save(self, filename: str) -> bool:
         """Удаление сохранения"""
         filepath = os.path.join(self.save_dir, filename)
+        removed = True
         try:
             os.remove(filepath)
-            return True
         except Exception as e:
             print(f"Ошибка удаления {filename}: {e}")
-            return False
+            removed = False
+        if not os.path.exists(filepath):
+            try:
+                with closing(self._connect()) as conn, conn:
+                    conn.execute("DELETE FROM saves WHERE filename = ?", (filename,))
+            except sqlite3.Error as e:
+                print(f"Ошибка обновления индекса сохранений: {e}")
+        return removed
+
+
 class Leaderboard:
-    """Управление лидербордом"""
-    
-    def __init__(self, leaders_file: str = "data/leaders.dat"):
-        self.leaders_file = leaders_file
+    """
+    Управление лидербордом.
+
+    Результаты хранятся в SQLite: одна строка на игровую сессию
+    (уникальный session_id), индекс по (field_size, piece_size, score)
+    отдаёт топ без сортировки в Python. История не обрезается до топ-10.
+    Соединение открывается на каждый вызов, поэтому объект можно
+    использовать из разных потоков.
+    """
+
+    FIELDS = ('player_name', 'score', 'level', 'lines', 'date', 'session_id')
+
+    # Одна запись на сессию: повторный результат заменяет старый, только если он выше
+    _UPSERT = """
+        INSERT INTO leaders (session_id, player_name, score, level, lines, piece_size, field_size, date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (session_id) DO UPDATE SET
+            player_name = excluded.player_name, score = excluded.score, level = excluded.level,
+            lines = excluded.lines, piece_size = excluded.piece_size,
+            field_size = excluded.field_size, date = excluded.date
+        WHERE excluded.score > leaders.score
+    """
+
+    def __init__(self, db_file: str = "data/leaders.db", legacy_file: str = "data/leaders.dat"):
+        self.db_file = db_file
+        self.legacy_file = legacy_file
         self.ensure_directories()
-        # Проверяем, что файл лидерборда не повреждён
-        self._validate_leaders_file()
-    
-    def _validate_leaders_file(self):
-        """Проверка целостности файла лидерборда"""
-        if os.path.exists(self.leaders_file):
-            if os.path.getsize(self.leaders_file) == 0:
-                # Если файл пустой, удаляем его
-                try:
-                    os.remove(self.leaders_file)
-                except:
-                    pass
-            else:
-                # Проверяем, можно ли загрузить файл
-                try:
-                    with open(self.leaders_file, 'rb') as f:
-                        pickle.load(f)
-                except:
-                    # Если файл повреждён, удаляем его
-                    try:
-                        os.remove(self.leaders_file)
-                    except:
-                        pass
+        is_new = not os.path.exists(self.db_file)
+        self._init_db()
+        if is_new:
+            self._migrate_legacy()
     
     def ensure_directories(self):
         """Создание необходимых директорий"""
-        os.makedirs(os.path.dirname(self.leaders_file), exist_ok=True)
+        os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_file, timeout=10)
+
+    def _init_db(self):
+        """Создание таблицы и индексов"""
+        with closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS leaders (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT UNIQUE,
+                    player_name TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    level INTEGER,
+                    lines INTEGER,
+                    piece_size INTEGER NOT NULL,
+                    field_size TEXT NOT NULL,
+                    date TEXT);
+                CREATE INDEX IF NOT EXISTS leaders_top ON leaders (field_size, piece_size, score);
+            """)
+
+    def _migrate_legacy(self):
+        """Однократный перенос рекордов из старого pickle-файла leaders.dat"""
+        if not os.path.exists(self.legacy_file) or os.path.getsize(self.legacy_file) == 0:
+            return
+        try:
+            with open(self.legacy_file, 'rb') as f:
+                all_leaders = save_format.load_legacy(f)
+        except Exception as e:
+            print(f"Ошибка загрузки старого лидерборда: {e}")
+            return
+
+        rows = []
+        for key, entries in all_leaders.items():
+            field_size, _, piece_size = str(key).rpartition('_')
+            for entry in entries:
+                # Битая запись пропускается, остальные переносятся
+                try:
+                    rows.append((entry.get('session_id'), entry.get('player_name', 'Игрок'),
+                                 int(entry.get('score', 0)), entry.get('level', 1), entry.get('lines', 0),
+                                 int(piece_size), field_size, entry.get('date', '')))
+                except (AttributeError, TypeError, ValueError) as e:
+                    print(f"Пропущена запись старого лидерборда {key}: {e}")
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(self._UPSERT, rows)
+        except sqlite3.Error as e:
+            print(f"Ошибка переноса лидерборда: {e}")
+
     
-    def get_leaders(self, piece_size: int = 4, field_size: str = "10x20") -> List[Dict[str, Any]]:
-        """Получение лидерборда для конкретных настроек (исключая записи со score=0 и дубли по session_id)"""
-        all_leaders = self._load_all_leaders()
-        key = f"{field_size}_{piece_size}"
-        leaders = all_leaders.get(key, [])
-        
-        # Фильтруем записи со score=0 и оставляем только последнюю запись для каждого session_id
-        seen_sessions = {}
-        filtered = []
-        
-        for entry in leaders:
-            score = entry.get('score', 0)
-            session_id = entry.get('session_id')
-            
-            # Пропускаем записи со score=0
-            if score <= 0:
-                continue
-            
-            # Если есть session_id, оставляем только последнюю запись для этой сессии
-            if session_id:
-                if session_id not in seen_sessions:
-                    seen_sessions[session_id] = entry
-                    filtered.append(entry)
-                else:
-                    # Заменяем старую запись на новую (более свежую)
-                    if score > seen_sessions[session_id].get('score', 0):
-                        filtered.remove(seen_sessions[session_id])
-                        seen_sessions[session_id] = entry
-                        filtered.append(entry)
-            else:
-                # Для записей без session_id просто добавляем
-                filtered.append(entry)
-        
-        return filtered
+    def get_leaders(self, piece_size: int = 4, field_size: str = "10x20",
+                    limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+        """
+        Получение лидерборда для конкретных настроек (исключая записи со score=0).
+
+        Args:
+            limit: Сколько лучших результатов вернуть (None - вся история)
+        """
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    f"SELECT {', '.join(self.FIELDS)} FROM leaders "
+                    "WHERE field_size = ? AND piece_size = ? AND score > 0 "
+                    "ORDER BY score DESC LIMIT ?",
+                    (field_size, piece_size, -1 if limit is None else limit)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Ошибка загрузки лидерборда: {e}")
+            return []
+        return [dict(zip(self.FIELDS, row)) for row in rows]
     
     def add_score(self, player_name: str, score: int, level: int, lines: int, 
               piece_size: int = 4, field_size: str = "10x20", session_id: str = None):
         """Добавление или обновление результата в лидерборд"""
         if not player_name.strip():
             player_name = "Игрок"
-        
-        all_leaders = self._load_all_leaders()
-        key = f"{field_size}_{piece_size}"
-        
-        if key not in all_leaders:
-            all_leaders[key] = []
-        
-        new_entry = {
-            'player_name': player_name,
-            'score': score,
-            'level': level,
-            'lines': lines,
-            'date': datetime.datetime.now().strftime("%d.%m.%Y %H:%M"),
-            'session_id': session_id
-        }
-        
-        # Если есть session_id, ищем существующий рекорд для этой сессии
-        if session_id:
-            for i, entry in enumerate(all_leaders[key]):
-                if entry.get('session_id') == session_id:
-                    # Обновляем только если новый рекорд выше старого
-                    if score > entry.get('score', 0):
-                        all_leaders[key][i] = new_entry
-                    # Сортируем и сохраняем
-                    all_leaders[key].sort(key=lambda x: x['score'], reverse=True)
-                    all_leaders[key] = all_leaders[key][:10]  # Только топ-10
-                    self._save_all_leaders(all_leaders)
-                    return
-        
-        # Если рекорда для этой сессии нет, добавляем новый
-        all_leaders[key].append(new_entry)
-        all_leaders[key].sort(key=lambda x: x['score'], reverse=True)
-        all_leaders[key] = all_leaders[key][:10]  # Только топ-10
-        
-        self._save_all_leaders(all_leaders)  # Не забываем сохранить!
-    
-    def _load_all_leaders(self) -> Dict[str, List[Dict[str, Any]]]:
-        """
-        Восстановление старой версии загрузки лидерборда с поддержкой pickle.
-        """
-        if not os.path.exists(self.leaders_file):
-            return {}
-        
-        # Проверяем, что файл не пустой
-        if os.path.getsize(self.leaders_file) == 0:
-            return {}
 
+        date = datetime.datetime.now().strftime("%d.%m.%Y %H:%M")
         try:
-            with open(self.leaders_file, 'rb') as f:
-                return pickle.load(f)
-        except Exception as e:
-            print(f"Ошибка загрузки лидерборда: {e}")
-            return {}
-
-    def _save_all_leaders(self, leaders: Dict[str, List[Dict[str, Any]]]):
-        """
-        Восстановление старой версии сохранения лидерборда с использованием pickle.
-        """
-        try:
-            with open(self.leaders_file, 'wb') as f:
-                pickle.dump(leaders, f)
-        except Exception as e:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(self._UPSERT, (session_id, player_name, score, level, lines,
+                                            piece_size, field_size, date))
+        except sqlite3.Error as e:
             print(f"Ошибка сохранения лидерборда: {e}")
 
 class ConfigManager:
@@ -274,12 +536,15 @@ class ConfigManager:
             'pause': 'p',
             'new_game': 'n',
             'save_game': 's',
-            'menu': 'escape'
+            'menu': 'escape',
+            'hint': 'h'
         }
         config['Graphics'] = {
             'cell_size': '30',
             'show_grid': 'true',
-            'show_ghost': 'true'
+            'show_ghost': 'true',
+            'show_hint': 'false',
+            'fps': '60'
         }
         config['Sound'] = {
             'music_volume': '0.7',
@@ -287,6 +552,15 @@ class ConfigManager:
             'enable_music': 'true',
             'enable_sound': 'true'
         }
+        config['Replay'] = {
+            'record': 'false',
+            'directory': 'data/replays'
+        }
+        config['Debug'] = {
+            'profiler': 'false',
+            'profiler_overlay': 'true',
+            'profiler_output': 'data/profile'
+        }
         self.save_config(config)
     
     def save_config(self, config=None):
@@ -365,7 +639,8 @@ class ConfigManager:
                 'pause': pygame.K_p,
                 'new_game': pygame.K_n,
                 'save_game': pygame.K_s,
-                'menu': pygame.K_ESCAPE
+                'menu': pygame.K_ESCAPE,
+                'hint': pygame.K_h
             }
         return controls
 
@@ -414,77 +689,18 @@ def load_music(music_filename: str, volume: float = 0.6, config: 'ConfigManager'
     Returns:
         True если музыка загружена успешно
     """
-    import pygame
-    
-    # Проверяем, включена ли музыка в конфиге
-    if config:
-        enable_music = config.get('Sound', 'enable_music', 'true', lambda x: x.lower() == 'true')
-        if not enable_music:
-            return False
-    
-    # Если эта же музыка уже загружена, просто воспроизводим
-    if SoundCache._current_music == music_filename and SoundCache._music_loaded:
-        try:
-            pygame.mixer.music.play(-1)
-        except:
-            pass
-        return True
-    
-    try:
-        music_path = os.path.join(os.path.dirname(__file__), "resources", music_filename)
-        if os.path.exists(music_path):
-            pygame.mixer.music.load(music_path)
-            music_volume = config.get('Sound', 'music_volume', volume, float) if config else volume
-            pygame.mixer.music.set_volume(music_volume)
-            pygame.mixer.music.play(-1)  # -1 = infinite loop
-            SoundCache._music_loaded = True
-            SoundCache._current_music = music_filename  # Запоминаем, какая музыка загружена
-            print(f"Music '{music_filename}' loaded from: {music_path}")
-            return True
-        else:
-            print(f"Music not found at: {music_path}")
-            return False
-    except Exception as e:
-        print(f"Could not load music '{music_filename}': {e}")
-        return False
+    return SoundManager.get().play_music(music_filename, volume, config)
 
 
-def load_sound(sound_filename: str, config: 'ConfigManager' = None) -> Optional[Any]:
+def load_sound(sound_filename: str, config: 'ConfigManager' = None) -> Optional[LazySound]:
     """
-    Загружает звуковой эффект из ресурсов с кэшированием.
+    Загружает звуковой эффект из ресурсов с кэшированием (декодирование - в фоне).
     
     Args:
         sound_filename: Имя файла звука (например, "gameover.wav")
         config: ConfigManager для проверки enable_sound
     
     Returns:
-        pygame.mixer.Sound объект или None если не найден
+        Звук с методом play() или None если не найден
     """
-    import pygame
-    
-    # Проверяем, включены ли звуки в конфиге
-    if config:
-        enable_sound = config.get('Sound', 'enable_sound', 'true', lambda x: x.lower() == 'true')
-        if not enable_sound:
-            return None
-    
-    # Проверяем, есть ли звук в кэше
-    if sound_filename in SoundCache._sounds:
-        return SoundCache._sounds[sound_filename]
-    
-    sound = None
-    try:
-        sound_path = os.path.join(os.path.dirname(__file__), "resources", sound_filename)
-        if os.path.exists(sound_path):
-            sound = pygame.mixer.Sound(sound_path)
-            sound_volume = config.get('Sound', 'sound_volume', 1.0, float) if config else 1.0
-            sound.set_volume(sound_volume)
-            SoundCache._sounds[sound_filename] = sound  # Кэшируем звук
-            # Выводим сообщение только при первой загрузке
-            print(f"Sound '{sound_filename}' loaded from: {sound_path}")
-        else:
-            print(f"Sound not found at: {sound_path}")
-    except Exception as e:
-        print(f"Could not load sound '{sound_filename}': {e}")
-    
-    return sound
\ No newline at end of file
+    return SoundManager.get().sound(sound_filename, config)
@@ -0,0 +1,145 @@
+"""
+Проверки SaveManager (индекс, замена сохранений, перевод старых файлов)
+и Leaderboard (одна запись на сессию, перенос leaders.dat).
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pickle
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import save_format
+from model import GameModel
+from utils import Leaderboard, SaveManager
+
+
+class TempDirTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+
+class SaveManagerTest(TempDirTest):
+    def save_data(self, player_name: str, seed: int = 1):
+        model = GameModel(10, 20, 4, player_name, seed=seed)
+        model.hard_drop()
+        return model.get_save_data()
+
+    def files(self):
+        return sorted(name for name in os.listdir(self.dir) if name != SaveManager.INDEX_FILE)
+
+    def test_save_list_and_load(self):
+        manager = SaveManager(self.dir)
+        data = self.save_data("Аня")
+        self.assertTrue(manager.save_game(data, "Аня"))
+
+        saves = manager.get_save_files()
+        self.assertEqual([save['player_name'] for save in saves], ["Аня"])
+        loaded = manager.load_game(saves[0]['filename'])
+        self.assertEqual(loaded['field'], data['field'])
+        self.assertEqual(loaded['seed'], data['seed'])
+
+        # Новый менеджер видит то же без перечитывания
+        self.assertEqual(SaveManager(self.dir).get_save_files(), saves)
+
+    def test_new_save_replaces_old_one(self):
+        manager = SaveManager(self.dir)
+        manager.save_game(self.save_data("Аня"), "Аня")
+        manager.save_game(self.save_data("Боря"), "Боря")
+        old = next(name for name in self.files() if name.startswith("Аня"))
+        os.rename(os.path.join(self.dir, old), os.path.join(self.dir, "Аня_20000101_000000.save"))
+        manager.sync_index()
+
+        self.assertTrue(manager.save_game(self.save_data("Аня", seed=2), "Аня"))
+        names = self.files()
+        self.assertNotIn("Аня_20000101_000000.save", names)
+        self.assertEqual(sorted(save['filename'] for save in manager.get_save_files()), names)
+        self.assertEqual(sum(name.startswith("Аня") for name in names), 1)
+        self.assertEqual(sum(name.startswith("Боря") for name in names), 1)
+
+    def test_failed_write_keeps_old_save(self):
+        manager = SaveManager(self.dir)
+        manager.save_game(self.save_data("Аня"), "Аня")
+        before = self.files()
+
+        with mock.patch('os.replace', side_effect=OSError("нет места")), \
+                mock.patch('builtins.print'):
+            self.assertFalse(manager.save_game(self.save_data("Аня", seed=2), "Аня"))
+        self.assertEqual(self.files(), before)  # Старый файл на месте, временный удалён
+        self.assertEqual([save['filename'] for save in manager.get_save_files()], before)
+
+    def test_legacy_saves_are_migrated_into_index(self):
+        for i in range(3):
+            data = self.save_data(f"Игрок{i}")
+            data['save_time'] = f"2020010{i}_000000"
+            with open(os.path.join(self.dir, f"Игрок{i}_2020010{i}_000000.save"), 'wb') as f:
+                pickle.dump(data, f)
+
+        start = time.perf_counter()
+        with mock.patch('builtins.print') as printed:
+            manager = SaveManager(self.dir)
+        # Перевод идёт в транзакции sync_index, без ожидания блокировки индекса
+        self.assertLess(time.perf_counter() - start, 2.0)
+        printed.assert_not_called()
+
+        self.assertEqual(len(manager.get_save_files()), 3)
+        for name in self.files():
+            with open(os.path.join(self.dir, name), 'rb') as f:
+                self.assertTrue(save_format.is_binary(f))
+        loaded = manager.load_game("Игрок1_20200101_000000.save")
+        self.assertEqual(loaded['player_name'], "Игрок1")
+
+    def test_deleted_file_leaves_index(self):
+        manager = SaveManager(self.dir)
+        manager.save_game(self.save_data("Аня"), "Аня")
+        os.remove(os.path.join(self.dir, self.files()[0]))
+        manager.sync_index()
+        self.assertEqual(manager.get_save_files(), [])
+
+
+class LeaderboardTest(TempDirTest):
+    def leaderboard(self, legacy=None):
+        legacy_file = os.path.join(self.dir, "leaders.dat")
+        if legacy is not None:
+            with open(legacy_file, 'wb') as f:
+                pickle.dump(legacy, f)
+        return Leaderboard(os.path.join(self.dir, "leaders.db"), legacy_file)
+
+    def test_one_row_per_session_keeps_best(self):
+        board = self.leaderboard()
+        board.add_score("Аня", 100, 1, 2, session_id="s1")
+        board.add_score("Аня", 300, 2, 6, session_id="s1")
+        board.add_score("Аня", 200, 2, 5, session_id="s1")
+        board.add_score("Боря", 250, 2, 5, session_id="s2")
+        board.add_score("Вера", 0, 1, 0, session_id="s3")
+
+        leaders = board.get_leaders()
+        self.assertEqual([(row['player_name'], row['score']) for row in leaders], [("Аня", 300), ("Боря", 250)])
+        self.assertEqual(board.get_leaders(limit=1)[0]['session_id'], "s1")
+        self.assertEqual(board.get_leaders(piece_size=5), [])
+
+    def test_settings_are_separate(self):
+        board = self.leaderboard()
+        board.add_score("Аня", 100, 1, 2, piece_size=5, field_size="12x24", session_id="s1")
+        self.assertEqual(board.get_leaders(), [])
+        self.assertEqual(len(board.get_leaders(piece_size=5, field_size="12x24")), 1)
+
+    def test_legacy_migration_skips_bad_rows(self):
+        legacy = {
+            '10x20_4': [{'player_name': "Аня", 'score': 500, 'session_id': "s1"}, "мусор"],
+            '10x20_x': [{'player_name': "Боря", 'score': 50}],
+            '12x24_6': [{'player_name': "Вера", 'score': "много"},
+                        {'player_name': "Гоша", 'score': 70, 'session_id': "s2"}],
+        }
+        with mock.patch('builtins.print'):
+            board = self.leaderboard(legacy)
+        self.assertEqual([row['player_name'] for row in board.get_leaders()], ["Аня"])
+        self.assertEqual([row['player_name'] for row in board.get_leaders(6, "12x24")], ["Гоша"])
+
+
+if __name__ == "__main__":
+    unittest.main()
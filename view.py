@@ -1,28 +1,36 @@
 # view.py
 import pygame
-import pygame_gui
 from typing import Optional
+from display import DisplayContext
 from tetromino_factory import Tetromino
-from utils import load_logo
 
 
 class GameView:
-    def __init__(self, width: int, height: int, config):
-        pygame.init()
+    def __init__(self, width: int, height: int, config, display: Optional[DisplayContext] = None):
         self.width = width
         self.height = height
         self.config = config
 
-        self.screen = pygame.display.set_mode((800, 600))
-        pygame.display.set_caption("Тетрис")
-        self.screen_width = 800
-        self.screen_height = 600
-        self.clock = pygame.time.Clock()
+        # Окно, UIManager, шрифты и логотип общие с меню
+        self.display = display or DisplayContext.get()
+        self.display.set_caption("Тетрис")
+        self.screen = self.display.screen
+        self.screen_width = self.display.width
+        self.screen_height = self.display.height
+        self.clock = self.display.clock
 
-        self.ui_manager = pygame_gui.UIManager((800, 600))
-        self.font_big = pygame.font.Font(None, 42)
-        self.font = pygame.font.Font(None, 28)
-        self.font_small = pygame.font.Font(None, 22)
+        self.ui_manager = self.display.ui_manager
+        self.font_big = self.display.font(42)
+        self.font = self.display.font(28)
+        self.font_small = self.display.font(22)
+        self.font_large = self.display.font(32)
+        self.font_medium = self.display.font(28)
+
+        # Кэш заранее отрисованных поверхностей: плитки клеток, фигуры, текст
+        self._tiles = {}  # (color, alpha, cell_size) -> Surface
+        self._piece_surfaces = {}  # (RotationState, color, alpha, cell_size) -> Surface
+        self._text_cache = {}  # слот -> (текст, Surface)
+        self._static_surfaces = {}  # неизменные надписи и оверлеи
 
         # Ключевой фикс: поле всегда помещается
         # Ограничение размера клетки для предотвращения выхода за границы экрана
@@ -42,20 +50,95 @@ class GameView:
             'lines': 0
         }
         
-        # Load logo once
-        self.logo = load_logo(max_width=250)
+        self.logo = self.display.load_logo()
+
+        # Состояние частичной перерисовки (dirty rectangles)
+        self._full_redraw = True  # Следующий кадр рисуется целиком
+        self._dirty_rects = None  # Прямоугольники кадра; None - обновить весь экран
+        self._field_snapshot = None  # Копия поля, нарисованного в прошлом кадре
+        self._overlay_cells = {}  # Клетки фигуры, призрака и подсказки прошлого кадра
+        self._panel_key = None  # Что было нарисовано на правой панели
+        self.redraw_requested = True  # Окно нужно перерисовать независимо от состояния игры
+
+    def invalidate(self):
+        """
+        Пометить экран как полностью изменённый.
+
+        Текущий кадр будет выведен целиком, а следующий перерисован с нуля
+        (используется оверлеями паузы, Game Over и уведомлений).
+        """
+        self._dirty_rects = None
+        self._full_redraw = True
+
+    def begin_frame(self) -> bool:
+        """
+        Начать кадр.
+
+        Returns:
+            True, если кадр рисуется целиком (первый кадр или после оверлея)
+        """
+        full = self._full_redraw
+        self._full_redraw = False
+        self.redraw_requested = False
+        if full:
+            self._dirty_rects = None
+            self.screen.fill((30, 30, 40))
+            self.draw_title()
+        else:
+            self._dirty_rects = []
+        return full
 
     def show_save_notification(self):
         self.save_notification_time = pygame.time.get_ticks()
 
+    def notification_active(self) -> bool:
+        return pygame.time.get_ticks() - self.save_notification_time < 2000
+
     def draw_notification(self):
-        if pygame.time.get_ticks() - self.save_notification_time < 2000:
-            text = self.font_big.render("Игра сохранена!", True, (0, 255, 100))
-            bg = pygame.Surface((text.get_width() + 40, 60))
-            bg.fill((0, 0, 0))
-            bg.blit(text, (20, 10))
+        if self.notification_active():
+            self.invalidate()
+            bg = self._static_surfaces.get('notification')
+            if bg is None:
+                text = self.font_big.render("Игра сохранена!", True, (0, 255, 100))
+                bg = pygame.Surface((text.get_width() + 40, 60))
+                bg.fill((0, 0, 0))
+                bg.blit(text, (20, 10))
+                self._static_surfaces['notification'] = bg
             self.screen.blit(bg, (400 - bg.get_width() // 2, 20))
 
+    def _get_tile(self, color, alpha=255) -> pygame.Surface:
+        """Плитка клетки нужного цвета и прозрачности (создаётся один раз)"""
+        key = (color, alpha, self.cell_size)
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = pygame.Surface((self.cell_size - 1, self.cell_size - 1), pygame.SRCALPHA)
+            tile.fill(color if alpha == 255 else (*color, alpha))
+            self._tiles[key] = tile
+        return tile
+
+    def _get_piece_surface(self, piece: Tetromino, alpha=255, cell_size=None) -> pygame.Surface:
+        """Фигура в текущем повороте, заранее собранная из плиток"""
+        cell_size = cell_size or self.cell_size
+        key = (piece.state, piece.color, alpha, cell_size)
+        surface = self._piece_surfaces.get(key)
+        if surface is None:
+            n = len(piece.shape)
+            surface = pygame.Surface((n * cell_size, n * cell_size), pygame.SRCALPHA)
+            tile = pygame.Surface((cell_size - 1, cell_size - 1), pygame.SRCALPHA)
+            tile.fill(piece.color if alpha == 255 else (*piece.color, alpha))
+            for i, j in piece.state.cells:
+                surface.blit(tile, (j * cell_size, i * cell_size))
+            self._piece_surfaces[key] = surface
+        return surface
+
+    def _render_text(self, slot: str, font, text: str, color) -> pygame.Surface:
+        """Текст, который перерисовывается только при изменении значения"""
+        cached = self._text_cache.get(slot)
+        if cached is None or cached[0] != text:
+            cached = (text, font.render(text, True, color))
+            self._text_cache[slot] = cached
+        return cached[1]
+
     def draw_cell(self, x: int, y: int, color):
         rect = pygame.Rect(
             self.field_offset_x + x * self.cell_size,
@@ -64,134 +147,260 @@ class GameView:
         )
         pygame.draw.rect(self.screen, color, rect)
 
-    def draw_field(self, field):
+    def draw_empty_cell(self, x: int, y: int):
+        pygame.draw.rect(self.screen, (45, 45, 60),
+                         (self.field_offset_x + x * self.cell_size,
+                          self.field_offset_y + y * self.cell_size,
+                          self.cell_size - 1, self.cell_size - 1), 1)
+
+    def draw_piece_cell(self, x: int, y: int, color, alpha=255):
+        self.screen.blit(self._get_tile(color, alpha),
+                         (self.field_offset_x + x * self.cell_size,
+                          self.field_offset_y + y * self.cell_size))
+
+    def _draw_background(self):
+        """Фон игрового экрана и рамка поля"""
         self.screen.fill((20, 20, 40))
         pygame.draw.rect(self.screen, (100, 100, 100),
                          (self.field_offset_x - 2, self.field_offset_y - 2,
                           self.width * self.cell_size + 4, self.height * self.cell_size + 4), 3)
 
+    def _restore_background(self, rect: pygame.Rect):
+        """Восстановить фон и рамку поля внутри прямоугольника"""
+        self.screen.set_clip(rect)
+        self._draw_background()
+        self.screen.set_clip(None)
+        self._dirty_rects.append(rect)
+
+    def draw_field(self, field):
+        self._draw_background()
+
         for y, row in enumerate(field):
             for x, cell in enumerate(row):
                 if cell:
                     self.draw_cell(x, y, cell)
                 else:
-                    pygame.draw.rect(self.screen, (45, 45, 60),
-                                     (self.field_offset_x + x * self.cell_size,
-                                      self.field_offset_y + y * self.cell_size,
-                                      self.cell_size - 1, self.cell_size - 1), 1)
+                    self.draw_empty_cell(x, y)
 
     def draw_piece(self, piece: Optional[Tetromino], alpha=255):
         if not piece: return
-        for i, row in enumerate(piece.shape):
-            for j, cell in enumerate(row):
-                if cell:
-                    color = piece.color if alpha == 255 else (*piece.color, alpha)
-                    rect = pygame.Rect(
-                        self.field_offset_x + (piece.x + j) * self.cell_size,
-                        self.field_offset_y + (piece.y + i) * self.cell_size,
-                        self.cell_size - 1, self.cell_size - 1
-                    )
-                    s = pygame.Surface(rect.size, pygame.SRCALPHA)
-                    s.fill(color)
-                    self.screen.blit(s, rect.topleft)
+        self.screen.blit(self._get_piece_surface(piece, alpha),
+                         (self.field_offset_x + piece.x * self.cell_size,
+                          self.field_offset_y + piece.y * self.cell_size))
+
+    def draw_board(self, field, piece: Optional[Tetromino], ghost: Optional[Tetromino],
+                   hint: Optional[Tetromino] = None):
+        """
+        Отрисовка поля с призраком, подсказкой и текущей фигурой.
+
+        В полном кадре рисует всё; иначе перерисовывает только клетки,
+        которые изменились с прошлого кадра (поле, фигура, призрак, подсказка),
+        и добавляет их в список прямоугольников для pygame.display.update.
+        Клетки над полем (y < 0) не рисуются ни в одном из режимов.
+        """
+        # Клетка -> (цвет призрака, цвет подсказки, цвет фигуры)
+        overlay = {}
+        for layer, shape in enumerate((ghost, hint, piece)):
+            if not shape:
+                continue
+            for i, j in shape.state.cells:
+                y = shape.y + i
+                if 0 <= y < self.height:
+                    pos = (shape.x + j, y)
+                    colors = overlay.get(pos, (None, None, None))
+                    overlay[pos] = colors[:layer] + (shape.color,) + colors[layer + 1:]
+
+        if self._dirty_rects is None or self._field_snapshot is None:
+            self.draw_field(field)
+            # Фигуры целиком, но с обрезкой по полю - как и при поклеточной перерисовке
+            self.screen.set_clip(self._field_rect())
+            if ghost:
+                self.draw_ghost_piece(ghost)
+            if hint:
+                self.draw_hint_piece(hint)
+            if piece:
+                self.draw_piece(piece)
+            self.screen.set_clip(None)
+            self._field_snapshot = [row[:] for row in field]
+        else:
+            changed = set()
+            snapshot = self._field_snapshot
+            for y, row in enumerate(field):
+                old_row = snapshot[y]
+                if old_row != row:
+                    changed.update((x, y) for x, cell in enumerate(row) if old_row[x] != cell)
+                    snapshot[y] = row[:]
+            old_overlay = self._overlay_cells
+            for pos in old_overlay.keys() | overlay.keys():
+                if old_overlay.get(pos) != overlay.get(pos):
+                    changed.add(pos)
+            for x, y in changed:
+                self._redraw_board_cell(x, y, field, overlay.get((x, y)))
+
+        self._overlay_cells = overlay
+
+    def _field_rect(self) -> pygame.Rect:
+        return pygame.Rect(self.field_offset_x, self.field_offset_y,
+                           self.width * self.cell_size, self.height * self.cell_size)
+
+    def _redraw_board_cell(self, x: int, y: int, field, overlay):
+        """Перерисовать одну клетку поля со всеми слоями"""
+        self._restore_background(pygame.Rect(
+            self.field_offset_x + x * self.cell_size,
+            self.field_offset_y + y * self.cell_size,
+            self.cell_size, self.cell_size
+        ))
+        if 0 <= y < self.height:
+            cell = field[y][x]
+            if cell:
+                self.draw_cell(x, y, cell)
+            else:
+                self.draw_empty_cell(x, y)
+        if overlay:
+            ghost_color, hint_color, piece_color = overlay
+            if ghost_color:
+                self.draw_piece_cell(x, y, ghost_color, alpha=80)
+            if hint_color:
+                self._draw_hint_cell(x, y, hint_color)
+            if piece_color:
+                self.draw_piece_cell(x, y, piece_color)
 
     def draw_ghost_piece(self, ghost):
         if ghost:
             self.draw_piece(ghost, alpha=80)
 
+    def _get_hint_tile(self, color) -> pygame.Surface:
+        """Контур клетки подсказки (создаётся один раз на цвет)"""
+        key = ('hint', color, self.cell_size)
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = pygame.Surface((self.cell_size - 1, self.cell_size - 1), pygame.SRCALPHA)
+            pygame.draw.rect(tile, color, tile.get_rect(), 2)
+            self._tiles[key] = tile
+        return tile
+
+    def _draw_hint_cell(self, x: int, y: int, color):
+        self.screen.blit(self._get_hint_tile(color),
+                         (self.field_offset_x + x * self.cell_size,
+                          self.field_offset_y + y * self.cell_size))
+
+    def draw_hint_piece(self, hint: Optional[Tetromino]):
+        """Подсказка - контур фигуры в лучшем положении"""
+        if hint:
+            for i, j in hint.state.cells:
+                self._draw_hint_cell(hint.x + j, hint.y + i, hint.color)
+
     def draw_right_panel(self, piece: Optional[Tetromino]):
         """Renders the right panel with player info and next piece."""
         x = self.field_offset_x + self.width * self.cell_size + 40
         y = 20
-        
-        # Larger font for panel
-        font_large = pygame.font.Font(None, 32)
-        font_medium = pygame.font.Font(None, 28)
 
+        # Panel is redrawn only when its content changes
+        key = (tuple(self.current_info.values()),
+               (piece.shape_type, piece.rotation) if piece else None)
+        if self._dirty_rects is not None:
+            if key == self._panel_key:
+                return
+            self._restore_background(pygame.Rect(x - 20, 0, self.screen_width - x + 20, self.screen_height))
+        self._panel_key = key
+        
         # Player name
-        surf = font_large.render(f"Игрок: {self.current_info['player_name']}", True, (200, 200, 200))
+        surf = self._render_text('player_name', self.font_large,
+                                 f"Игрок: {self.current_info['player_name']}", (200, 200, 200))
         self.screen.blit(surf, (x, y))
         y += 40
         
         # Score - highlighted in yellow
-        score_text = f"Счёт: {self.current_info['score']}"
-        surf = font_large.render(score_text, True, (255, 255, 100))
+        surf = self._render_text('score', self.font_large,
+                                 f"Счёт: {self.current_info['score']}", (255, 255, 100))
         self.screen.blit(surf, (x, y))
         y += 40
         
         # Level - highlighted in cyan
-        level_text = f"Уровень: {self.current_info['level']}"
-        surf = font_large.render(level_text, True, (100, 255, 255))
+        surf = self._render_text('level', self.font_large,
+                                 f"Уровень: {self.current_info['level']}", (100, 255, 255))
         self.screen.blit(surf, (x, y))
         y += 40
         
         # Lines - normal color
-        lines_text = f"Линии: {self.current_info['lines']}"
-        surf = font_medium.render(lines_text, True, (200, 200, 200))
+        surf = self._render_text('lines', self.font_medium,
+                                 f"Линии: {self.current_info['lines']}", (200, 200, 200))
         self.screen.blit(surf, (x, y))
         y += 35
 
-        # Controls
+        # Controls and next piece title never change - rendered once
         y += 10
-        self.screen.blit(font_medium.render("УПРАВЛЕНИЕ:", True, (255, 200, 0)), (x, y))
-        y += 30
-        controls = [
-            "влево: сдвиг влево",
-            "вправо: сдвиг вправо",
-            "вверх: Rotate",
-            "вниз: медленное опускание",
-            "Space: мгновенное опускание",
-            "P: Пауза",
-            "S: Соханить игру",
-            "N: Новая игра",
-            "ESC: Выйти в меню"
-        ]
-        for c in controls:
-            surf = self.font_small.render(c, True, (180, 180, 180))
-            self.screen.blit(surf, (x, y))
-            y += 22
-
-        # Next piece
-        y += 20
-        next_title = font_medium.render("СЛЕДУЮЩАЯ:", True, (255, 200, 0))
-        self.screen.blit(next_title, (x, y))
-        y += 30
+        items, block_height = self._get_panel_static()
+        for surf, dy in items:
+            self.screen.blit(surf, (x, y + dy))
+        y += block_height
 
         if piece:
             size = piece.get_width()
             cell = 20
             offset_x = x + (120 - size * cell) // 2
-            for i in range(size):
-                for j in range(size):
-                    if piece.shape[i][j]:
-                        pygame.draw.rect(
-                            self.screen, piece.color,
-                            (offset_x + j * cell, y + i * cell, cell - 1, cell - 1)
-                        )
+            self.screen.blit(self._get_piece_surface(piece, cell_size=cell), (offset_x, y))
+
+    def _get_panel_static(self):
+        """Неизменные надписи правой панели: ([(поверхность, смещение по y)], высота блока)"""
+        panel = self._static_surfaces.get('panel')
+        if panel is None:
+            items = []
+            y = 0
+            items.append((self.font_medium.render("УПРАВЛЕНИЕ:", True, (255, 200, 0)), y))
+            y += 30
+            controls = [
+                "влево: сдвиг влево",
+                "вправо: сдвиг вправо",
+                "вверх: Rotate",
+                "вниз: медленное опускание",
+                "Space: мгновенное опускание",
+                "P: Пауза",
+                "S: Соханить игру",
+                "N: Новая игра",
+                "ESC: Выйти в меню"
+            ]
+            for c in controls:
+                items.append((self.font_small.render(c, True, (180, 180, 180)), y))
+                y += 22
+
+            # Next piece
+            y += 20
+            items.append((self.font_medium.render("СЛЕДУЮЩАЯ:", True, (255, 200, 0)), y))
+            y += 30
+            panel = self._static_surfaces['panel'] = (items, y)
+        return panel
 
     def draw_game_over(self, player_name, score):
-        overlay = pygame.Surface((800, 600))
-        overlay.set_alpha(200)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.invalidate()
+        self.screen.blit(self._get_overlay(200), (0, 0))
 
         lines = ["ИГРА ОКОНЧЕНА", f"{player_name}: {score} очков",
                  "N — новая игра", "ESC — в меню"]
         y = 200
-        for line in lines:
+        for i, line in enumerate(lines):
             color = (255, 50, 50) if "ОКОНЧЕНА" in line else (255, 255, 255)
-            surf = self.font_big.render(line, True, color)
+            surf = self._render_text(f'game_over_{i}', self.font_big, line, color)
             self.screen.blit(surf, (400 - surf.get_width() // 2, y))
             y += 55
 
+    def _get_overlay(self, alpha: int) -> pygame.Surface:
+        """Полупрозрачное затемнение всего экрана"""
+        key = ('overlay', alpha)
+        overlay = self._static_surfaces.get(key)
+        if overlay is None:
+            overlay = pygame.Surface((800, 600))
+            overlay.set_alpha(alpha)
+            overlay.fill((0, 0, 0))
+            self._static_surfaces[key] = overlay
+        return overlay
+
     def draw_pause(self):
-        overlay = pygame.Surface((800, 600))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.invalidate()
+        self.screen.blit(self._get_overlay(180), (0, 0))
 
-        pause = self.font_big.render("ПАУЗА", True, (255, 255, 0))
-        cont = self.font.render("Нажмите P для продолжения", True, (255, 255, 255))
+        pause = self._render_text('pause', self.font_big, "ПАУЗА", (255, 255, 0))
+        cont = self._render_text('pause_hint', self.font, "Нажмите P для продолжения", (255, 255, 255))
         self.screen.blit(pause, (400 - pause.get_width() // 2, 250))
         self.screen.blit(cont, (400 - cont.get_width() // 2, 310))
 
@@ -203,9 +412,25 @@ class GameView:
         Обновление экрана - просто отображаем UI
         """
         self.ui_manager.draw_ui(self.screen)
-        pygame.display.flip()
+        self.present()
+
+    def present(self):
+        """Вывод кадра: весь экран или только изменённые области"""
+        if self._dirty_rects is None:
+            pygame.display.flip()
+        elif self._dirty_rects:
+            pygame.display.update(self._dirty_rects)
+
+    def mark_dirty(self, rect: pygame.Rect):
+        """Добавить область, нарисованную поверх кадра извне (например, оверлей профилировщика)"""
+        if self._dirty_rects is not None:
+            self._dirty_rects.append(rect)
 
     def process_events(self, event):
+        # Окно перекрыли или восстановили - содержимое экрана надо нарисовать заново
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+            self._full_redraw = True
+            self.redraw_requested = True
         self.ui_manager.process_events(event)
 
     def draw_title(self):
@@ -216,7 +441,7 @@ class GameView:
             self.screen.blit(self.logo, (x, y))
         else:
             # Fallback to text if logo is not available
-            title_font = pygame.font.Font(None, 100)
+            title_font = self.display.font(100)
             text = "ТЕТРИС"
             text_surface = title_font.render(text, True, (255, 255, 0))
             self.screen.blit(text_surface, (400 - text_surface.get_width() // 2, 50))
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Проверка частичной перерисовки GameView: кадр, собранный из изменённых
+клеток, должен совпадать с кадром, нарисованным целиком.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import unittest
+
+import pygame
+
+from bot import Board, HeuristicBot
+from display import DisplayContext
+from headless import HeadlessGame, RandomPolicy
+from view import GameView
+
+
+class IncrementalRenderTest(unittest.TestCase):
+    FRAME_TICKS = 3  # Кадр на каждые несколько тиков, как при 30-100 FPS
+
+    @classmethod
+    def setUpClass(cls):
+        cls.display = DisplayContext.get()
+
+    def render_game(self, width: int, height: int, piece_size: int, seed: int, frames: int):
+        """Играет случайно и сравнивает кадры; возвращает число кадров с фигурой над полем"""
+        game = HeadlessGame(width, height, piece_size, seed=seed, inputs=RandomPolicy(seed, interval=4))
+        model = game.model
+        bot = HeuristicBot()
+        bot.select_weights(width, height, piece_size)
+
+        incremental = GameView(width, height, None, self.display)
+        full = GameView(width, height, None, self.display)
+        full.screen = self.display.screen.copy()
+
+        hint = None
+        hint_piece = -1
+        above_field = 0
+        for frame in range(frames):
+            if model.game_over:
+                break
+            for _ in range(self.FRAME_TICKS):
+                game.tick()
+            piece = model.current_piece
+            if hint_piece != model.pieces_placed:
+                # Подсказка как у HintWorker - лучшее положение от точки появления
+                hint_piece = model.pieces_placed
+                _, rotation, x, y, _ = bot.best_placement(Board.from_model(model), piece.states,
+                                                          piece.rotation, piece.x, piece.y)
+                hint = piece.copy()
+                hint.set_rotation(rotation)
+                hint.x, hint.y = x, y
+            if piece.y < 0:
+                above_field += 1
+                # Подсказка над полем тоже должна обрезаться одинаково
+                hint = piece.copy()
+                hint.y = piece.y - 1
+            ghost = model.get_ghost_position()
+
+            incremental.begin_frame()
+            incremental.draw_board(model.field, piece, ghost, hint)
+            full.invalidate()
+            full.begin_frame()
+            full.draw_board(model.field, piece, ghost, hint)
+
+            self.assertEqual(pygame.image.tobytes(incremental.screen, 'RGB'),
+                             pygame.image.tobytes(full.screen, 'RGB'),
+                             f"{width}x{height}/{piece_size}, кадр {frame}, y={piece.y}")
+        return above_field
+
+    def test_incremental_matches_full_redraw(self):
+        above_field = 0
+        for width, height, piece_size, seed in ((10, 20, 4, 1), (12, 24, 6, 2), (15, 30, 7, 3)):
+            with self.subTest(field=f"{width}x{height}", piece_size=piece_size):
+                above_field += self.render_game(width, height, piece_size, seed, frames=600)
+        # Тест имеет смысл, только если фигура побывала над полем
+        self.assertGreater(above_field, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()